@@ -3,13 +3,24 @@ Aplicação Flask para Gerador de Dados Pessoais Brasileiros
 Interface Web Interativa
 """
 
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Flask, render_template, jsonify, request, send_file, Response, stream_with_context, g
 from flask_cors import CORS
+import cep_disjuntor
 import gerador
-import io
-import pandas as pd
+import gerador_lote
+import esquema
+import exportacao
+import jobs
+import lotes
+import metricas
+import reserva
+import unicidade
 from datetime import datetime
+from pathlib import Path
+import json
 import os
+import tempfile
+import time
 from dotenv import load_dotenv
 
 
@@ -18,10 +29,143 @@ load_dotenv()
 
 
 
+# Limite de linhas dos downloads em fluxo (CSV)
+MAX_LINHAS_STREAM = int(os.getenv('MAX_LINHAS_STREAM', '10000000'))
+# Limite de linhas da exportação Excel (pode ocupar várias planilhas)
+MAX_LINHAS_EXCEL = int(os.getenv('MAX_LINHAS_EXCEL', '2000000'))
+# Linhas geradas por bloco nos downloads em fluxo
+TAMANHO_BLOCO_STREAM = int(os.getenv('TAMANHO_BLOCO_STREAM', '10000'))
+# Pessoas por bloco no fluxo NDJSON/SSE (blocos menores = primeira pessoa mais cedo)
+TAMANHO_BLOCO_NDJSON = int(os.getenv('TAMANHO_BLOCO_NDJSON', '1000'))
+# Limite de linhas de um job em segundo plano
+MAX_LINHAS_JOB = int(os.getenv('MAX_LINHAS_JOB', '100000000'))
+# Máximo de pessoas por página em /api/pessoas
+MAX_LIMITE_PAGINA = int(os.getenv('MAX_LIMITE_PAGINA', '1000'))
+# Limite de CPFs por requisição na validação em lote
+MAX_CPFS_VALIDACAO = int(os.getenv('MAX_CPFS_VALIDACAO', '1000000'))
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
 CORS(app)
 
+@app.before_request
+def _iniciar_cronometro():
+    g.inicio_requisicao = time.perf_counter()
+
+@app.after_request
+def _registrar_requisicao(response):
+    """Registra duração e status de cada requisição (em fluxo: até o início do envio)."""
+    endpoint = request.url_rule.rule if request.url_rule else 'desconhecido'
+    metricas.HTTP_SEGUNDOS.observar(time.perf_counter() - g.inicio_requisicao, endpoint)
+    metricas.HTTP_REQUISICOES.inc(endpoint, str(response.status_code))
+    if metricas.METRICAS_DIR:
+        metricas.REGISTRO.gravar(Path(metricas.METRICAS_DIR))
+    return response
+
+def _obter_seed(data):
+    """
+    Lê a semente opcional do corpo da requisição.
+    
+    Returns:
+        int ou None: Semente (inteiro não negativo) ou None se ausente
+        
+    Raises:
+        ValueError: Se a semente não for um inteiro não negativo
+    """
+    seed = (data or {}).get('seed')
+    if seed is None:
+        return None
+    if isinstance(seed, bool) or int(seed) != seed or int(seed) < 0:
+        raise ValueError('seed deve ser um inteiro não negativo')
+    return int(seed)
+
+def _erro_seed(erro):
+    """Resposta 400 para semente inválida."""
+    return jsonify({
+        'success': False,
+        'error': str(erro)
+    }), 400
+
+def _obter_campos(data):
+    """
+    Lê a projeção opcional de campos (lista ou texto separado por vírgulas).
+    
+    Returns:
+        list ou None: Colunas pedidas, na ordem dada, ou None para todas
+        
+    Raises:
+        ValueError: Se algum campo não for uma coluna de gerador.COLUNAS_ORDEM
+    """
+    campos = (data or {}).get('campos')
+    if not campos:
+        return None
+    if not isinstance(campos, (str, list)):
+        raise ValueError('campos deve ser uma lista ou texto separado por vírgulas')
+    return gerador.normalizar_campos(campos)
+
+def _obter_esquema(data):
+    """
+    Lê o esquema declarativo opcional (objeto JSON, ou texto JSON na query string).
+    
+    Returns:
+        esquema.Esquema ou None: Esquema compilado ou None se ausente
+        
+    Raises:
+        ValueError: Se o esquema for inválido ou vier junto com campos
+    """
+    definicao = (data or {}).get('esquema')
+    if definicao is None:
+        return None
+    if data.get('campos'):
+        raise ValueError('Use campos ou esquema, não ambos')
+    if isinstance(definicao, str):
+        try:
+            definicao = json.loads(definicao)
+        except ValueError:
+            raise ValueError('esquema deve ser um objeto JSON com a lista de campos')
+    if not isinstance(definicao, dict):
+        raise ValueError('esquema deve ser um objeto JSON com a lista de campos')
+    return esquema.Esquema(definicao)
+
+def _iterar_blocos(quantidade, tamanho_lote, seed, unico, campos, compilado):
+    """Blocos de pessoas com as colunas pedidas (projeção de campos ou esquema)."""
+    if compilado is not None:
+        return compilado.iterar_lotes(quantidade, tamanho_lote, seed=seed, unico=unico)
+    return gerador_lote.iterar_lotes(quantidade, tamanho_lote, seed=seed, unico=unico, campos=campos)
+
+def _guardar_lote(pessoas, colunas, tipos=None, adiado=False):
+    """Guarda as pessoas devolvidas (dicionários planos) para exportação posterior e retorna o id do lote."""
+    return lotes.obter_armazem().guardar(pessoas, colunas, tipos, adiado=adiado).id
+
+def _obter_lote(data, formato, opcoes):
+    """
+    Busca o lote indicado por ``lote_id`` e ajusta as opções do escritor às suas colunas.
+    
+    Returns:
+        list ou None: Blocos do lote, ou None se o lote não existir ou tiver expirado
+    """
+    lote = lotes.obter_armazem().obter(data.get('lote_id'))
+    if lote is None:
+        return None
+    opcoes['campos'] = lote.colunas
+    if lote.tipos is not None and formato in ('parquet', 'arrow', 'feather'):
+        opcoes['tipos'] = lote.tipos
+    return [lote.dataframe()]
+
+def _erro_lote():
+    """Resposta 404 para lote inexistente ou expirado."""
+    return jsonify({
+        'success': False,
+        'error': 'Lote não encontrado ou expirado; gere os dados novamente'
+    }), 404
+
+def _erro_campos(erro):
+    """Resposta 400 para projeção de campos ou esquema inválidos."""
+    return jsonify({
+        'success': False,
+        'error': str(erro)
+    }), 400
+
 @app.route('/')
 def index():
     """Rota principal - renderiza a interface web"""
@@ -31,15 +175,38 @@ def index():
 def gerar_pessoa():
     """
     Endpoint para gerar dados de uma única pessoa.
+    Sem seed, a pessoa sai da reserva pré-gerada (ver reserva.py).
+    
+    Request Body (opcional):
+        seed (int): Semente para gerar sempre a mesma pessoa
+        campos (list ou str): Só estas colunas (p.ex. "Nome Completo,CPF")
     
     Returns:
-        JSON: Dados da pessoa gerada
+        JSON: Dados da pessoa gerada e lote_id (para exportar a mesma pessoa)
     """
     try:
-        dados = gerador.gerar_dados_pessoa()
+        data = request.get_json(silent=True)
+        try:
+            seed = _obter_seed(data)
+        except (TypeError, ValueError) as e:
+            return _erro_seed(e)
+        try:
+            campos = _obter_campos(data)
+        except ValueError as e:
+            return _erro_campos(e)
+        
+        if seed is None:
+            pessoa = reserva.obter_pessoas(1, campos)[0]
+        else:
+            # A pessoa 0 do conjunto da semente, a mesma de /api/gerar-multiplas e /api/pessoas
+            pessoa = gerador.gerar_multiplas_pessoas(1, verbose=False, seed=seed, campos=campos,
+                                                     compacto=True)[0]
+        dados = pessoa.aninhado(campos)
+        lote_id = _guardar_lote([pessoa.plano(campos)], campos or gerador.COLUNAS_ORDEM, adiado=True)
         return jsonify({
             'success': True,
-            'data': dados
+            'data': dados,
+            'lote_id': lote_id
         })
     except Exception as e:
         return jsonify({
@@ -51,12 +218,19 @@ def gerar_pessoa():
 def gerar_multiplas():
     """
     Endpoint para gerar dados de múltiplas pessoas.
+    Sem seed e sem unico/esquema, as pessoas saem da reserva pré-gerada.
     
     Request Body:
         quantidade (int): Número de pessoas a gerar (1-100)
+        seed (int, opcional): Semente para geração reprodutível
+        unico (bool, opcional): CPF, e-mail e celular sem repetição
+        campos (list ou str, opcional): Só estas colunas (p.ex. "Nome Completo,CPF")
+        esquema (object, opcional): Esquema declarativo (ver esquema.py); os
+            registros seguem o caminho de cada campo
     
     Returns:
-        JSON: Lista com dados das pessoas geradas
+        JSON: Lista com dados das pessoas geradas e lote_id (para exportar as
+        mesmas pessoas pelos endpoints de exportação)
     """
     try:
         data = request.get_json()
@@ -69,17 +243,34 @@ def gerar_multiplas():
                 'error': 'Quantidade deve estar entre 1 e 100'
             }), 400
         
+        try:
+            seed = _obter_seed(data)
+        except (TypeError, ValueError) as e:
+            return _erro_seed(e)
+        try:
+            campos = _obter_campos(data)
+            compilado = _obter_esquema(data)
+        except ValueError as e:
+            return _erro_campos(e)
+        
         # Gera as pessoas
-        pessoas = []
-        for _ in range(quantidade):
-            pessoa = gerador.gerar_dados_pessoa()
-            pessoa_achatada = gerador.achatar_dicionario(pessoa)
-            pessoas.append(pessoa_achatada)
+        if compilado is not None:
+            df = next(compilado.iterar_lotes(quantidade, quantidade, seed=seed, unico=bool(data.get('unico'))))
+            pessoas = compilado.registros(df)
+            lote_id = _guardar_lote(df.to_dict('records'), compilado.colunas, compilado.tipos)
+        elif seed is None and not data.get('unico'):
+            pessoas = [pessoa.plano(campos) for pessoa in reserva.obter_pessoas(quantidade, campos)]
+            lote_id = _guardar_lote(pessoas, campos or gerador.COLUNAS_ORDEM)
+        else:
+            pessoas = gerador.gerar_multiplas_pessoas(quantidade, verbose=False, seed=seed,
+                                                      unico=bool(data.get('unico')), campos=campos)
+            lote_id = _guardar_lote(pessoas, campos or gerador.COLUNAS_ORDEM)
         
         return jsonify({
             'success': True,
             'data': pessoas,
-            'count': len(pessoas)
+            'count': len(pessoas),
+            'lote_id': lote_id
         })
     except Exception as e:
         return jsonify({
@@ -87,53 +278,158 @@ def gerar_multiplas():
             'error': str(e)
         }), 500
 
+MIMETYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+    'feather': 'application/vnd.apache.arrow.file',
+}
+
+def _exportar_arquivo(formato, limite, **opcoes):
+    """
+    Gera as pessoas pedidas no corpo da requisição em blocos, grava num
+    arquivo temporário no formato indicado e o envia para download. Com
+    ``lote_id`` no corpo, grava o lote já gerado em vez de gerar de novo.
+    
+    Args:
+        formato: Formato de exportacao.FORMATOS
+        limite: Quantidade máxima aceita
+        **opcoes: Repassadas ao escritor
+    
+    Returns:
+        Response: Arquivo para download ou JSON de erro
+    """
+    data = request.get_json()
+    if 'lote_id' in data:
+        blocos = _obter_lote(data, formato, opcoes)
+        if blocos is None:
+            return _erro_lote()
+    else:
+        quantidade = int(data.get('quantidade', 1))
+        
+        if quantidade < 1 or quantidade > limite:
+            return jsonify({
+                'success': False,
+                'error': f'Quantidade deve estar entre 1 e {limite}'
+            }), 400
+        
+        try:
+            seed = _obter_seed(data)
+        except (TypeError, ValueError) as e:
+            return _erro_seed(e)
+        try:
+            campos = _obter_campos(data)
+            compilado = _obter_esquema(data)
+        except ValueError as e:
+            return _erro_campos(e)
+        opcoes.update(compilado.opcoes_exportacao(formato) if compilado is not None else {'campos': campos})
+        blocos = _iterar_blocos(quantidade, TAMANHO_BLOCO_STREAM, seed, bool(data.get('unico')), campos, compilado)
+    
+    # Grava as pessoas em blocos num arquivo temporário
+    temporario = tempfile.NamedTemporaryFile(suffix=f'.{formato}', delete=False)
+    temporario.close()
+    try:
+        exportacao.escrever(formato, blocos, temporario.name, **opcoes)
+    except Exception:
+        os.remove(temporario.name)
+        raise
+    
+    # Nome do arquivo com timestamp
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f'dados_pessoais_{timestamp}.{formato}'
+    
+    response = send_file(
+        temporario.name,
+        mimetype=MIMETYPES[formato],
+        as_attachment=True,
+        download_name=filename
+    )
+    response.call_on_close(lambda: os.remove(temporario.name))
+    return response
+
 @app.route('/api/exportar-excel', methods=['POST'])
 def exportar_excel():
     """
     Endpoint para exportar dados para Excel.
+    As linhas são gravadas em blocos num arquivo temporário (openpyxl
+    write-only), sem montar a planilha inteira em memória.
     
     Request Body:
-        quantidade (int): Número de pessoas a gerar
+        quantidade (int): Número de pessoas a gerar (1-MAX_LINHAS_EXCEL)
+        seed (int, opcional): Semente para geração reprodutível
+        unico (bool, opcional): CPF, e-mail e celular sem repetição
+        campos (list ou str, opcional): Só estas colunas (p.ex. "Nome Completo,CPF")
+        esquema (object, opcional): Esquema declarativo das colunas (ver esquema.py)
+        lote_id (str, opcional): Exporta um lote já devolvido por /api/gerar-multiplas
+            ou /api/gerar-pessoa, sem gerar de novo (dispensa os demais parâmetros)
     
     Returns:
         File: Arquivo Excel para download
     """
+    try:
+        return _exportar_arquivo('xlsx', MAX_LINHAS_EXCEL)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/exportar-parquet', methods=['POST'])
+def exportar_parquet():
+    """
+    Endpoint para exportar dados para Parquet (estado, cidade, bairro e
+    logradouro com codificação de dicionário).
+    
+    Request Body:
+        quantidade (int): Número de pessoas a gerar (1-MAX_LINHAS_STREAM)
+        seed (int, opcional): Semente para geração reprodutível
+        unico (bool, opcional): CPF, e-mail e celular sem repetição
+        tamanho_row_group (int, opcional): Linhas por row group
+        campos (list ou str, opcional): Só estas colunas (p.ex. "Nome Completo,CPF")
+        esquema (object, opcional): Esquema declarativo das colunas (ver esquema.py)
+        lote_id (str, opcional): Exporta um lote já devolvido por /api/gerar-multiplas
+            ou /api/gerar-pessoa, sem gerar de novo (dispensa os demais parâmetros)
+    
+    Returns:
+        File: Arquivo Parquet para download
+    """
     try:
         data = request.get_json()
-        quantidade = int(data.get('quantidade', 1))
-        
-        if quantidade < 1 or quantidade > 100:
+        tamanho_row_group = int(data.get('tamanho_row_group', exportacao.TAMANHO_ROW_GROUP_PADRAO))
+        if tamanho_row_group < 1:
             return jsonify({
                 'success': False,
-                'error': 'Quantidade deve estar entre 1 e 100'
+                'error': 'tamanho_row_group deve ser maior que zero'
             }), 400
-        
-        # Gera as pessoas
-        pessoas = []
-        for _ in range(quantidade):
-            pessoa = gerador.gerar_dados_pessoa()
-            pessoa_achatada = gerador.achatar_dicionario(pessoa)
-            pessoas.append(pessoa_achatada)
-        
-        # Cria DataFrame
-        df = pd.DataFrame(pessoas)
-        
-        # Cria arquivo em memória
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Dados Pessoais')
-        output.seek(0)
-        
-        # Nome do arquivo com timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'dados_pessoais_{timestamp}.xlsx'
-        
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        return _exportar_arquivo('parquet', MAX_LINHAS_STREAM, tamanho_row_group=tamanho_row_group)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/exportar-arrow', methods=['POST'])
+def exportar_arrow():
+    """
+    Endpoint para exportar dados no formato Arrow IPC / Feather.
+    
+    Request Body:
+        quantidade (int): Número de pessoas a gerar (1-MAX_LINHAS_STREAM)
+        seed (int, opcional): Semente para geração reprodutível
+        unico (bool, opcional): CPF, e-mail e celular sem repetição
+        feather (bool, opcional): Comprime com zstd e usa extensão .feather
+        campos (list ou str, opcional): Só estas colunas (p.ex. "Nome Completo,CPF")
+        esquema (object, opcional): Esquema declarativo das colunas (ver esquema.py)
+        lote_id (str, opcional): Exporta um lote já devolvido por /api/gerar-multiplas
+            ou /api/gerar-pessoa, sem gerar de novo (dispensa os demais parâmetros)
+    
+    Returns:
+        File: Arquivo Arrow/Feather para download
+    """
+    try:
+        data = request.get_json()
+        formato = 'feather' if data.get('feather') else 'arrow'
+        return _exportar_arquivo(formato, MAX_LINHAS_STREAM)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -144,52 +440,141 @@ def exportar_excel():
 def exportar_csv():
     """
     Endpoint para exportar dados para CSV.
+    O arquivo é enviado em fluxo, bloco a bloco, à medida que as pessoas
+    são geradas; a memória usada não depende da quantidade.
     
     Request Body:
-        quantidade (int): Número de pessoas a gerar
+        quantidade (int): Número de pessoas a gerar (1-MAX_LINHAS_STREAM)
+        seed (int, opcional): Semente para geração reprodutível
+        unico (bool, opcional): CPF, e-mail e celular sem repetição
+        campos (list ou str, opcional): Só estas colunas (p.ex. "Nome Completo,CPF")
+        esquema (object, opcional): Esquema declarativo das colunas (ver esquema.py)
+        lote_id (str, opcional): Exporta um lote já devolvido por /api/gerar-multiplas
+            ou /api/gerar-pessoa, sem gerar de novo (dispensa os demais parâmetros)
     
     Returns:
         File: Arquivo CSV para download
     """
     try:
         data = request.get_json()
-        quantidade = int(data.get('quantidade', 1))
+        if 'lote_id' in data:
+            opcoes = {}
+            blocos = _obter_lote(data, 'csv', opcoes)
+            if blocos is None:
+                return _erro_lote()
+            colunas = opcoes['campos']
+        else:
+            quantidade = int(data.get('quantidade', 1))
+            
+            if quantidade < 1 or quantidade > MAX_LINHAS_STREAM:
+                return jsonify({
+                    'success': False,
+                    'error': f'Quantidade deve estar entre 1 e {MAX_LINHAS_STREAM}'
+                }), 400
+            
+            try:
+                seed = _obter_seed(data)
+            except (TypeError, ValueError) as e:
+                return _erro_seed(e)
+            try:
+                campos = _obter_campos(data)
+                compilado = _obter_esquema(data)
+            except ValueError as e:
+                return _erro_campos(e)
+            
+            blocos = _iterar_blocos(quantidade, TAMANHO_BLOCO_STREAM, seed, bool(data.get('unico')), campos,
+                                    compilado)
+            colunas = compilado.colunas if compilado is not None else campos
+        conteudo = (trecho.encode('utf-8') for trecho in exportacao.iterar_csv(blocos, colunas))
         
-        if quantidade < 1 or quantidade > 100:
+        # Nome do arquivo com timestamp
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'dados_pessoais_{timestamp}.csv'
+        
+        return Response(
+            stream_with_context(conteudo),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/gerar-stream', methods=['GET', 'POST'])
+def gerar_stream():
+    """
+    Endpoint que envia pessoas em fluxo, uma por linha (NDJSON) ou como
+    server-sent events, à medida que são geradas. Os blocos só são gerados
+    quando o cliente consome os anteriores, então um cliente lento não
+    acumula pessoas em memória no servidor.
+    
+    Parâmetros (query string no GET, corpo JSON no POST):
+        quantidade (int, opcional): Número de pessoas; sem ela o fluxo não termina
+        seed (int, opcional): Semente para geração reprodutível
+        unico (bool, opcional): CPF, e-mail e celular sem repetição (exige quantidade)
+        campos (list ou str, opcional): Colunas incluídas (p.ex. "Nome Completo,CPF")
+        esquema (object ou texto JSON, opcional): Esquema declarativo das colunas (ver esquema.py)
+        formato (str, opcional): ndjson (padrão) ou sse; Accept: text/event-stream também ativa SSE
+    
+    Returns:
+        Response: Fluxo application/x-ndjson ou text/event-stream
+    """
+    try:
+        data = (request.get_json(silent=True) if request.method == 'POST' else request.args.to_dict()) or {}
+        formato = data.get('formato')
+        if formato not in (None, 'ndjson', 'sse'):
             return jsonify({
                 'success': False,
-                'error': 'Quantidade deve estar entre 1 e 100'
+                'error': 'Formato deve ser ndjson ou sse'
             }), 400
         
-        # Gera as pessoas
-        pessoas = []
-        for _ in range(quantidade):
-            pessoa = gerador.gerar_dados_pessoa()
-            pessoa_achatada = gerador.achatar_dicionario(pessoa)
-            pessoas.append(pessoa_achatada)
+        quantidade = data.get('quantidade')
+        if quantidade is not None:
+            quantidade = int(quantidade)
+            if quantidade < 1:
+                return jsonify({
+                    'success': False,
+                    'error': 'Quantidade deve ser maior que zero'
+                }), 400
         
-        # Cria DataFrame
-        df = pd.DataFrame(pessoas)
+        try:
+            if request.method == 'GET' and 'seed' in data:
+                data['seed'] = int(data['seed'])
+            seed = _obter_seed(data)
+        except (TypeError, ValueError) as e:
+            return _erro_seed(e)
         
-        # Cria arquivo em memória
-        output = io.StringIO()
-        df.to_csv(output, index=False, encoding='utf-8-sig')
-        output.seek(0)
+        try:
+            campos = _obter_campos(data)
+            compilado = _obter_esquema(data)
+        except ValueError as e:
+            return _erro_campos(e)
         
-        # Converte para BytesIO
-        bytes_output = io.BytesIO()
-        bytes_output.write(output.getvalue().encode('utf-8-sig'))
-        bytes_output.seek(0)
+        unico = data.get('unico') in (True, 'true', '1', 'sim')
+        # Recusado antes de começar: depois do 200 o fluxo não teria como informar o erro
+        if unico and quantidade is None:
+            return jsonify({
+                'success': False,
+                'error': 'O modo único exige quantidade'
+            }), 400
+        if unico and quantidade > unicidade.MAX_UNICOS:
+            return jsonify({
+                'success': False,
+                'error': f'O modo único comporta no máximo {unicidade.MAX_UNICOS} pessoas'
+            }), 400
         
-        # Nome do arquivo com timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'dados_pessoais_{timestamp}.csv'
+        sse = formato == 'sse' or (formato is None and request.accept_mimetypes.best == 'text/event-stream')
         
-        return send_file(
-            bytes_output,
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+        blocos = _iterar_blocos(quantidade, TAMANHO_BLOCO_NDJSON, seed, unico, campos, compilado)
+        colunas = compilado.colunas if compilado is not None else campos
+        conteudo = (trecho.encode('utf-8') for trecho in exportacao.iterar_ndjson(blocos, colunas, sse=sse))
+        
+        return Response(
+            stream_with_context(conteudo),
+            mimetype='text/event-stream' if sse else 'application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
         )
     except Exception as e:
         return jsonify({
@@ -197,6 +582,201 @@ def exportar_csv():
             'error': str(e)
         }), 500
 
+@app.route('/api/pessoas', methods=['GET'])
+def listar_pessoas():
+    """
+    Página de um conjunto virtual determinado pela semente. Só os blocos
+    lógicos da página são gerados (ver gerador_lote.gerar_faixa): nada é
+    guardado no servidor, e uma página custa o mesmo no começo ou no fim
+    de um conjunto de bilhões de linhas.
+    
+    Query string:
+        seed (int): Semente do conjunto
+        offset (int, opcional): Índice da primeira pessoa (padrão 0)
+        limit (int, opcional): Pessoas na página (padrão 100, máximo MAX_LIMITE_PAGINA)
+        unico (bool, opcional): CPF, e-mail e celular sem repetição no conjunto
+        campos (str, opcional): Só estas colunas (p.ex. "Nome Completo,CPF")
+    
+    Returns:
+        JSON: Pessoas da página (planas, como em gerar-multiplas) e o offset da próxima
+    """
+    try:
+        data = request.args.to_dict()
+        try:
+            seed = _obter_seed({'seed': int(data['seed'])} if 'seed' in data else None)
+            if seed is None:
+                raise ValueError('Informe a seed do conjunto')
+        except (TypeError, ValueError) as e:
+            return _erro_seed(e)
+        try:
+            offset = int(data.get('offset', 0))
+            limit = int(data.get('limit', 100))
+        except ValueError:
+            offset = limit = -1
+        if offset < 0 or not 1 <= limit <= MAX_LIMITE_PAGINA:
+            return jsonify({
+                'success': False,
+                'error': f'offset deve ser maior ou igual a zero e limit estar entre 1 e {MAX_LIMITE_PAGINA}'
+            }), 400
+        try:
+            campos = _obter_campos(data)
+        except ValueError as e:
+            return _erro_campos(e)
+        unico = data.get('unico') in ('true', '1', 'sim')
+        if unico and offset + limit > unicidade.MAX_UNICOS:
+            return jsonify({
+                'success': False,
+                'error': f'O modo único comporta no máximo {unicidade.MAX_UNICOS} pessoas'
+            }), 400
+        
+        pessoas = gerador.gerar_multiplas_pessoas(limit, verbose=False, seed=seed, inicio=offset,
+                                                  unico=unico, campos=campos)
+        return jsonify({
+            'success': True,
+            'seed': seed,
+            'offset': offset,
+            'limit': limit,
+            'data': pessoas,
+            'proximo_offset': offset + limit
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def criar_job():
+    """
+    Endpoint para enfileirar uma geração grande em segundo plano.
+    
+    Request Body:
+        quantidade (int): Número de pessoas a gerar (1-MAX_LINHAS_JOB)
+        formato (str, opcional): csv (padrão), xlsx, parquet, arrow ou feather
+        seed (int, opcional): Semente para geração reprodutível
+        unico (bool, opcional): CPF, e-mail e celular sem repetição
+        campos (list ou str, opcional): Só estas colunas (p.ex. "Nome Completo,CPF")
+        esquema (object, opcional): Esquema declarativo das colunas (ver esquema.py)
+    
+    Returns:
+        JSON: Estado inicial do job (status 202)
+    """
+    try:
+        data = request.get_json()
+        quantidade = int(data.get('quantidade', 1))
+        formato = data.get('formato', 'csv')
+        
+        limite = MAX_LINHAS_EXCEL if formato == 'xlsx' else MAX_LINHAS_JOB
+        if quantidade < 1 or quantidade > limite:
+            return jsonify({
+                'success': False,
+                'error': f'Quantidade deve estar entre 1 e {limite}'
+            }), 400
+        
+        if formato not in exportacao.FORMATOS:
+            return jsonify({
+                'success': False,
+                'error': f"Formato deve ser um de: {', '.join(exportacao.FORMATOS)}"
+            }), 400
+        
+        try:
+            seed = _obter_seed(data)
+        except (TypeError, ValueError) as e:
+            return _erro_seed(e)
+        try:
+            campos = _obter_campos(data)
+            compilado = _obter_esquema(data)
+        except ValueError as e:
+            return _erro_campos(e)
+        
+        job = jobs.obter_gerenciador().enviar(quantidade, formato, seed=seed, unico=bool(data.get('unico')),
+                                              campos=campos,
+                                              definicao_esquema=compilado.definicao if compilado else None)
+        return jsonify({
+            'success': True,
+            'data': job
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def consultar_job(job_id):
+    """
+    Endpoint para acompanhar um job.
+    
+    Returns:
+        JSON: Status, linhas geradas, progresso, linhas por segundo e ETA
+    """
+    job = jobs.obter_gerenciador().obter(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job não encontrado'
+        }), 404
+    return jsonify({
+        'success': True,
+        'data': job
+    })
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def resultado_job(job_id):
+    """
+    Endpoint para baixar o arquivo de um job concluído.
+    
+    Returns:
+        File: Arquivo gerado (409 se o job ainda não terminou)
+    """
+    gerenciador = jobs.obter_gerenciador()
+    job = gerenciador.obter(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job não encontrado'
+        }), 404
+    if job['status'] != 'concluido':
+        return jsonify({
+            'success': False,
+            'error': f"Job ainda não concluído (status: {job['status']})",
+            'data': job
+        }), 409
+    
+    return send_file(
+        gerenciador.caminho_resultado(job),
+        mimetype=MIMETYPES.get(job['formato'], 'text/csv'),
+        as_attachment=True,
+        download_name=f"dados_pessoais_{job_id}.{job['formato']}"
+    )
+
+@app.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    """
+    Métricas no formato de exposição do Prometheus: duração por etapa da
+    geração, consultas de CEP por serviço, acertos do cache, exportações e
+    requisições HTTP.
+    
+    Returns:
+        Response: Texto no formato do Prometheus
+    """
+    return Response(metricas.exportar_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/cep/saude', methods=['GET'])
+def saude_cep():
+    """
+    Estado dos web services de CEP neste worker: disjuntor (fechado, aberto
+    ou meio_aberto), falhas seguidas, latência média e timeout atual.
+    
+    Returns:
+        JSON: Estado de cada serviço já consultado
+    """
+    return jsonify({
+        'success': True,
+        'online': gerador.CEP_ONLINE,
+        'servicos': cep_disjuntor.resumo()
+    })
+
 @app.route('/api/validar-cpf', methods=['POST'])
 def validar_cpf():
     """
@@ -210,39 +790,72 @@ def validar_cpf():
     """
     try:
         data = request.get_json()
-        cpf = data.get('cpf', '').replace('.', '').replace('-', '')
+        resultado = gerador.validar_cpf(data.get('cpf', ''))
         
-        # Validação básica
-        if len(cpf) != 11 or not cpf.isdigit():
+        return jsonify({
+            'success': True,
+            'valido': resultado['valido'],
+            'mensagem': resultado['mensagem']
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _ler_cpfs():
+    """
+    Lê a lista de CPFs da requisição: JSON (lista ou {"cpfs": [...]}),
+    arquivo enviado no campo 'arquivo' ou texto com um CPF por linha.
+    
+    Returns:
+        list ou None: CPFs recebidos ou None se o formato for inválido
+    """
+    if 'arquivo' in request.files:
+        texto = request.files['arquivo'].read().decode('utf-8-sig')
+    elif request.is_json:
+        data = request.get_json()
+        cpfs = data.get('cpfs') if isinstance(data, dict) else data
+        return cpfs if isinstance(cpfs, list) else None
+    else:
+        texto = request.get_data(as_text=True)
+    return [linha for linha in texto.splitlines() if linha.strip()]
+
+@app.route('/api/validar-cpfs', methods=['POST'])
+def validar_cpfs():
+    """
+    Endpoint para validar vários CPFs em uma única requisição.
+    
+    Request Body:
+        Lista JSON de CPFs, {"cpfs": [...]}, ou texto/arquivo ('arquivo')
+        com um CPF por linha (até MAX_CPFS_VALIDACAO)
+    
+    Returns:
+        JSON: Resultado de cada CPF e totais de válidos/inválidos
+    """
+    try:
+        cpfs = _ler_cpfs()
+        if cpfs is None:
             return jsonify({
-                'success': True,
-                'valido': False,
-                'mensagem': 'CPF deve conter 11 dígitos numéricos'
-            })
+                'success': False,
+                'error': 'Envie uma lista de CPFs'
+            }), 400
         
-        # Verifica se todos os dígitos são iguais
-        if len(set(cpf)) == 1:
+        if len(cpfs) > MAX_CPFS_VALIDACAO:
             return jsonify({
-                'success': True,
-                'valido': False,
-                'mensagem': 'CPF inválido (todos os dígitos iguais)'
-            })
-        
-        # Valida dígitos verificadores
-        def calcular_digito(cpf_parcial, peso_inicial):
-            soma = sum(int(cpf_parcial[i]) * (peso_inicial - i) for i in range(len(cpf_parcial)))
-            resto = soma % 11
-            return 0 if resto < 2 else 11 - resto
-        
-        digito1 = calcular_digito(cpf[:9], 10)
-        digito2 = calcular_digito(cpf[:10], 11)
+                'success': False,
+                'error': f'Máximo de {MAX_CPFS_VALIDACAO} CPFs por requisição'
+            }), 400
         
-        cpf_valido = cpf[-2:] == f"{digito1}{digito2}"
+        resultados = gerador.validar_cpfs(cpfs)
+        validos = sum(resultado['valido'] for resultado in resultados)
         
         return jsonify({
             'success': True,
-            'valido': cpf_valido,
-            'mensagem': 'CPF válido' if cpf_valido else 'CPF inválido'
+            'total': len(resultados),
+            'validos': validos,
+            'invalidos': len(resultados) - validos,
+            'resultados': resultados
         })
     except Exception as e:
         return jsonify({
@@ -255,5 +868,7 @@ if __name__ == '__main__':
     print("🌐 Servidor Web Iniciado!")
     print("="*60)
     print("\n📍 Acesse: http://localhost:5000")
-    print("\n💡 Pressione Ctrl+C para encerrar\n")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    print("\n💡 Pressione Ctrl+C para encerrar")
+    print("   (servidor de desenvolvimento; em produção use: gunicorn -c gunicorn.conf.py wsgi:app)\n")
+    debug = os.getenv('FLASK_DEBUG', '0').lower() in ('1', 'true', 'sim')
+    app.run(debug=debug, host='0.0.0.0', port=int(os.getenv('PORT', '5000')))
@@ -0,0 +1,3 @@
+"""
+Benchmarks de desempenho (ver benchmarks/executar.py).
+"""
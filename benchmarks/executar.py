@@ -0,0 +1,401 @@
+"""
+Benchmarks do gerador, dos exportadores e dos endpoints.
+
+Cada caso mede a vazão (linhas por segundo, o melhor de algumas repetições)
+e o pico de memória alocada (tracemalloc, numa execução à parte). A consulta
+de CEP fica desligada: qualquer chamada aos web services falha o caso, então
+os números não dependem da rede. Os lotes dos endpoints vão para um SQLite
+temporário, não para ``dados_gerados/``. Os resultados são comparados com
+``benchmarks/baseline.json`` e o processo sai com código 1 se algum caso ficar
+mais lento ou usar mais memória que a tolerância permite.
+
+A vazão não é comparada em números absolutos: cada execução mede também o
+caso ``referencia``, uma carga fixa que não depende do código do projeto, e a
+baseline de cada caso é escalada pela razão entre a referência medida agora
+e a da baseline. Assim uma máquina mais lenta que a da baseline não acusa
+regressão. Mesmo escalada, a vazão oscila em runners compartilhados; com
+``--velocidade-informativa`` (usado no CI) as quedas de vazão só são
+avisadas e apenas o pico de memória, determinístico, reprova.
+
+Uso:
+    python -m benchmarks.executar              # mede e compara com a baseline
+    python -m benchmarks.executar --velocidade-informativa  # só a memória reprova
+    python -m benchmarks.executar --salvar     # regrava a baseline
+    python -m benchmarks.executar -k exportar  # só os casos com "exportar" no nome
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+from unittest.mock import patch
+
+import cep_async
+import esquema
+import exportacao
+import gerador
+import gerador_lote
+import lotes
+import reserva
+
+CAMINHO_BASELINE = Path(__file__).parent / 'baseline.json'
+# Caso medido em toda execução, para escalar a vazão da baseline a esta máquina
+CASO_REFERENCIA = 'referencia'
+# Runners de CI variam bastante; memória é bem mais estável que tempo
+TOLERANCIA_VELOCIDADE = 0.5
+TOLERANCIA_MEMORIA = 0.25
+
+
+class Caso(NamedTuple):
+    nome: str
+    linhas: int
+    preparar: Callable[[], Callable[[], object]]
+
+
+CASOS: List[Caso] = []
+
+
+def caso(nome: str, linhas: int):
+    """Registra um caso. A função decorada prepara os dados e devolve o que será medido."""
+    def registrar(preparar):
+        CASOS.append(Caso(nome, linhas, preparar))
+        return preparar
+    return registrar
+
+
+def _sem_rede(*args, **kwargs):
+    raise RuntimeError('Benchmark tentou consultar CEP na rede')
+
+
+@contextmanager
+def sem_consulta_cep() -> Iterator[None]:
+    """Desliga a consulta online de CEP e faz qualquer tentativa de rede falhar."""
+    with ExitStack() as pilha:
+        pilha.enter_context(patch.object(gerador, 'CEP_ONLINE', False))
+        pilha.enter_context(patch.object(gerador, 'buscar_cep_com_cache', _sem_rede))
+        pilha.enter_context(patch.object(cep_async, 'resolver_ceps', _sem_rede))
+        yield
+
+
+@contextmanager
+def armazem_temporario() -> Iterator[None]:
+    """Guarda os lotes dos endpoints num SQLite temporário, apagado ao final."""
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = lotes.ArmazemLotes(Path(diretorio) / 'lotes.sqlite3')
+        with patch.object(lotes, 'obter_armazem', return_value=armazem):
+            yield
+
+
+# --- Referência (não depende do código do projeto) ---
+
+@caso(CASO_REFERENCIA, 200_000)
+def _referencia():
+    sorteio = random.Random(0)
+    valores = [sorteio.random() for _ in range(200_000)]
+    return lambda: sorted(f'{valor:.6f}' for valor in valores)
+
+
+# --- Funções do gerador (por registro) ---
+
+def _repetir(funcao, vezes: int) -> Callable[[], None]:
+    def executar():
+        rng = random.Random(0)
+        for _ in range(vezes):
+            funcao(rng)
+    return executar
+
+
+for _nome, _funcao in [
+    ('gerar_nome', gerador.gerar_nome),
+    ('gerar_cpf', gerador.gerar_cpf),
+    ('gerar_data_nascimento', gerador.gerar_data_nascimento),
+    ('gerar_email', gerador.gerar_email),
+    ('gerar_celular', gerador.gerar_celular),
+    ('gerar_numero_e_complemento', gerador.gerar_numero_e_complemento),
+    ('gerar_cep_e_endereco', lambda rng: gerador.gerar_cep_e_endereco(rng=rng)),
+    ('gerar_dados_pessoa', lambda rng: gerador.gerar_dados_pessoa(rng=rng)),
+    ('gerar_dados_pessoa_nome_cpf',
+     lambda rng: gerador.gerar_dados_pessoa(rng=rng, campos=['Nome Completo', 'CPF'])),
+]:
+    caso(_nome, 10_000)(lambda funcao=_funcao: _repetir(funcao, 10_000))
+
+
+@caso('achatar_dicionario', 10_000)
+def _achatar_dicionario():
+    rng = random.Random(0)
+    pessoas = [gerador.gerar_dados_pessoa(rng=rng) for _ in range(10_000)]
+    return lambda: [gerador.achatar_dicionario(pessoa) for pessoa in pessoas]
+
+
+@caso('gerar_multiplas_pessoas', 10_000)
+def _gerar_multiplas_pessoas():
+    return lambda: gerador.gerar_multiplas_pessoas(10_000, verbose=False, seed=0)
+
+
+@caso('reserva_obter_pessoa', 500)
+def _reserva_obter_pessoa():
+    # Reserva cheia antes de medir e grande o bastante para todas as execuções
+    # sem reabastecer: só o custo de entregar
+    pool = reserva.ReservaPessoas(minimo=0, maximo=10_000)
+    if not pool.aguardar(10_000, timeout=60):
+        raise RuntimeError('A reserva de pessoas não encheu')
+
+    def executar():
+        with patch.object(reserva, 'obter_reserva', return_value=pool):
+            return [reserva.obter_pessoas(1) for _ in range(500)]
+    return executar
+
+
+@caso('gerar_multiplas_pessoas_compacto', 10_000)
+def _gerar_multiplas_pessoas_compacto():
+    return lambda: gerador.gerar_multiplas_pessoas(10_000, verbose=False, seed=0, compacto=True)
+
+
+@caso('validar_cpfs', 100_000)
+def _validar_cpfs():
+    cpfs = gerador_lote.gerar_lote(100_000, seed=0)['CPF'].tolist()
+    return lambda: gerador.validar_cpfs(cpfs)
+
+
+# --- Gerador em lote e exportação ---
+
+@caso('gerar_lote', 200_000)
+def _gerar_lote():
+    return lambda: gerador_lote.gerar_lote(200_000, seed=0)
+
+
+@caso('gerar_lote_nome_cpf', 200_000)
+def _gerar_lote_nome_cpf():
+    return lambda: gerador_lote.gerar_lote(200_000, seed=0, campos=['Nome Completo', 'CPF'])
+
+
+@caso('gerar_lote_esquema', 200_000)
+def _gerar_lote_esquema():
+    clientes = esquema.compilar(Path(__file__).parent.parent / 'esquemas' / 'clientes.yaml')
+    return lambda: clientes.gerar_lote(200_000, seed=0)
+
+
+@caso('gerar_lote_unico', 200_000)
+def _gerar_lote_unico():
+    return lambda: list(gerador_lote.iterar_lotes(200_000, 200_000, seed=0, unico=True))
+
+
+def _exportar(formato: str, linhas: int):
+    def preparar():
+        blocos = list(gerador_lote.iterar_lotes(linhas, 10_000, seed=0))
+
+        def executar():
+            with tempfile.TemporaryDirectory() as diretorio:
+                exportacao.escrever(formato, iter(blocos), Path(diretorio) / f'saida.{formato}')
+        return executar
+    return preparar
+
+
+for _formato, _linhas in [('csv', 100_000), ('xlsx', 10_000), ('parquet', 100_000),
+                          ('arrow', 100_000), ('feather', 100_000)]:
+    caso(f'exportar_{_formato}', _linhas)(_exportar(_formato, _linhas))
+
+
+# --- Endpoints Flask ---
+
+def _cliente():
+    from app import app
+    app.testing = True
+    return app.test_client()
+
+
+def _requisicoes(metodo: str, url: str, vezes: int, **kwargs):
+    def preparar():
+        cliente = _cliente()
+
+        def executar():
+            for _ in range(vezes):
+                resposta = getattr(cliente, metodo)(url, **kwargs)
+                resposta.get_data()
+                if resposta.status_code >= 400:
+                    raise RuntimeError(f'{url} respondeu {resposta.status_code}')
+                resposta.close()
+        return executar
+    return preparar
+
+
+caso('api_index', 500)(_requisicoes('get', '/', 500))
+caso('api_gerar_pessoa', 1_000)(_requisicoes('post', '/api/gerar-pessoa', 1_000))
+caso('api_gerar_multiplas', 10_000)(
+    _requisicoes('post', '/api/gerar-multiplas', 100, json={'quantidade': 100}))
+caso('api_listar_pessoas', 10_000)(
+    _requisicoes('get', '/api/pessoas?seed=0&offset=999990000&limit=1000', 10))
+caso('api_validar_cpf', 1_000)(
+    _requisicoes('post', '/api/validar-cpf', 1_000, json={'cpf': '529.982.247-25'}))
+caso('api_exportar_csv', 100_000)(
+    _requisicoes('post', '/api/exportar-csv', 1, json={'quantidade': 100_000, 'seed': 0}))
+caso('api_gerar_stream', 100_000)(
+    _requisicoes('get', '/api/gerar-stream?quantidade=100000&seed=0', 1))
+caso('api_exportar_excel', 10_000)(
+    _requisicoes('post', '/api/exportar-excel', 1, json={'quantidade': 10_000, 'seed': 0}))
+caso('api_exportar_parquet', 100_000)(
+    _requisicoes('post', '/api/exportar-parquet', 1, json={'quantidade': 100_000, 'seed': 0}))
+caso('api_exportar_arrow', 100_000)(
+    _requisicoes('post', '/api/exportar-arrow', 1, json={'quantidade': 100_000, 'seed': 0}))
+
+
+@caso('api_exportar_lote', 10_000)
+def _api_exportar_lote():
+    lote_id = _cliente().post('/api/gerar-multiplas', json={'quantidade': 100}).get_json()['lote_id']
+    return _requisicoes('post', '/api/exportar-csv', 100, json={'lote_id': lote_id})()
+
+
+@caso('api_validar_cpfs', 100_000)
+def _api_validar_cpfs():
+    cpfs = '\n'.join(gerador_lote.gerar_lote(100_000, seed=0)['CPF'])
+    return _requisicoes('post', '/api/validar-cpfs', 1, data=cpfs, content_type='text/plain')()
+
+
+# --- Execução ---
+
+def medir(item: Caso, repeticoes: int = 3) -> Dict:
+    """
+    Mede um caso: uma execução de aquecimento, ``repeticoes`` cronometradas
+    (vale a mais rápida) e uma sob tracemalloc para o pico de memória.
+
+    Returns:
+        Dict: linhas_por_segundo, segundos e pico_memoria_kb
+    """
+    executar = item.preparar()
+    executar()
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar()
+        tempos.append(time.perf_counter() - inicio)
+    melhor = min(tempos)
+
+    tracemalloc.start()
+    try:
+        executar()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'linhas_por_segundo': round(item.linhas / melhor),
+        'segundos': round(melhor, 4),
+        'pico_memoria_kb': round(pico / 1024),
+    }
+
+
+def comparar(resultados: Dict[str, Dict], baseline: Dict[str, Dict],
+             tolerancia_velocidade: Optional[float] = TOLERANCIA_VELOCIDADE,
+             tolerancia_memoria: Optional[float] = TOLERANCIA_MEMORIA) -> List[str]:
+    """
+    Compara os resultados com a baseline. Se ambos têm o caso de referência,
+    a vazão da baseline é escalada pela razão entre as duas referências.
+
+    Args:
+        resultados: Medições por caso
+        baseline: Medições de referência por caso
+        tolerancia_velocidade: Queda de vazão aceita (0.5 = até metade da baseline); None não compara
+        tolerancia_memoria: Aumento de pico de memória aceito (0.25 = até 25% a mais); None não compara
+
+    Returns:
+        List[str]: Descrição de cada regressão (vazia se nenhuma)
+    """
+    escala = 1.0
+    if CASO_REFERENCIA in resultados and CASO_REFERENCIA in baseline:
+        escala = (resultados[CASO_REFERENCIA]['linhas_por_segundo']
+                  / baseline[CASO_REFERENCIA]['linhas_por_segundo'])
+    regressoes = []
+    for nome, atual in resultados.items():
+        referencia = baseline.get(nome)
+        if not referencia:
+            continue
+        if tolerancia_velocidade is not None and nome != CASO_REFERENCIA:
+            minimo = referencia['linhas_por_segundo'] * escala * (1 - tolerancia_velocidade)
+            if atual['linhas_por_segundo'] < minimo:
+                regressoes.append(f"{nome}: {atual['linhas_por_segundo']} linhas/s "
+                                  f"(baseline {referencia['linhas_por_segundo']} × {escala:.2f} "
+                                  f"da referência, mínimo {round(minimo)})")
+        if tolerancia_memoria is not None:
+            # Picos pequenos oscilam à toa; só compara a partir de 1 MB
+            maximo = max(referencia['pico_memoria_kb'] * (1 + tolerancia_memoria), 1024)
+            if atual['pico_memoria_kb'] > maximo:
+                regressoes.append(f"{nome}: pico de {atual['pico_memoria_kb']} KB "
+                                  f"(baseline {referencia['pico_memoria_kb']}, máximo {round(maximo)})")
+    return regressoes
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks do gerador de dados pessoais")
+    parser.add_argument("-k", dest="filtro", default=None, help="Só casos cujo nome contém o texto")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções cronometradas por caso")
+    parser.add_argument("--salvar", action="store_true", help="Grava os resultados como nova baseline")
+    parser.add_argument("--baseline", type=Path, default=CAMINHO_BASELINE, help="Arquivo da baseline")
+    parser.add_argument("--saida", type=Path, default=None, help="Grava os resultados em JSON")
+    parser.add_argument("--tolerancia-velocidade", type=float, default=TOLERANCIA_VELOCIDADE)
+    parser.add_argument("--tolerancia-memoria", type=float, default=TOLERANCIA_MEMORIA)
+    parser.add_argument("--velocidade-informativa", action="store_true",
+                        help="Quedas de vazão só geram aviso; apenas a memória reprova")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    casos = [item for item in CASOS
+             if not args.filtro or args.filtro in item.nome or item.nome == CASO_REFERENCIA]
+
+    resultados = {}
+    gerador_lote.preaquecer()
+    with sem_consulta_cep(), armazem_temporario():
+        for item in casos:
+            resultados[item.nome] = medir(item, args.repeticoes)
+            r = resultados[item.nome]
+            print(f"{item.nome:<30} {r['linhas_por_segundo']:>12,} linhas/s "
+                  f"{r['pico_memoria_kb']:>10,} KB", flush=True)
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultados, indent=2) + '\n', encoding='utf-8')
+    if args.salvar:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+        if args.filtro and CASO_REFERENCIA in baseline:
+            # Gravação parcial: mantém a referência da baseline e converte a vazão para ela
+            escala = (baseline[CASO_REFERENCIA]['linhas_por_segundo']
+                      / resultados.pop(CASO_REFERENCIA)['linhas_por_segundo'])
+            for r in resultados.values():
+                r['linhas_por_segundo'] = round(r['linhas_por_segundo'] * escala)
+        baseline.update(resultados)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"\n💾 Baseline gravada em {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\n⚠️ Sem baseline em {args.baseline}; use --salvar para criar")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    if args.velocidade_informativa:
+        avisos = comparar(resultados, baseline, args.tolerancia_velocidade, None)
+        regressoes = comparar(resultados, baseline, None, args.tolerancia_memoria)
+    else:
+        avisos = []
+        regressoes = comparar(resultados, baseline, args.tolerancia_velocidade, args.tolerancia_memoria)
+    if avisos:
+        print("\n⚠️ Quedas de vazão (informativas):")
+        for aviso in avisos:
+            print(f"   - {aviso}")
+    if regressoes:
+        print("\n❌ Regressões de desempenho:")
+        for regressao in regressoes:
+            print(f"   - {regressao}")
+        return 1
+    print("\n✅ Nenhuma regressão em relação à baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Resolução concorrente de CEPs.
+
+Resolve um lote inteiro de CEPs em paralelo com asyncio: sessão HTTP única
+com keep-alive (pool de conexões do ``requests``), concorrência limitada por
+semáforo, limite de requisições por segundo em cada serviço e corrida entre
+ViaCEP e ApiCEP (vale a primeira resposta válida). Serviços com o disjuntor
+aberto (ver cep_disjuntor) ficam fora da corrida, e o timeout de cada consulta
+acompanha a latência do serviço. As URLs são configuráveis, o que permite
+testar contra um servidor HTTP local.
+
+Sessão, threads e limite de taxa são do processo (``obter_resolvedor``):
+lotes e requisições concorrentes reaproveitam as conexões abertas e
+respeitam juntos o limite de cada serviço. Após o fork de um worker o
+resolvedor é recriado.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import cep_disjuntor
+import metricas
+from cep_cache import CacheCEP, obter_cache_cep
+
+VIACEP_URL = os.getenv('VIACEP_URL', 'https://viacep.com.br/ws/{}/json/')
+APICEP_URL = os.getenv('APICEP_URL', 'https://ws.apicep.com/cep/{}.json')
+CEP_CONCORRENCIA = int(os.getenv('CEP_CONCORRENCIA', '20'))
+CEP_TAXA_POR_SERVICO = float(os.getenv('CEP_TAXA_POR_SERVICO', '10'))  # requisições/s
+REQUEST_TIMEOUT = cep_disjuntor.REQUEST_TIMEOUT  # segundos
+
+
+class CEPInexistente(Exception):
+    """O serviço respondeu que o CEP não existe."""
+
+
+def _interpretar_viacep(dados: Dict) -> Dict:
+    if dados.get('erro'):
+        raise CEPInexistente()
+    return {
+        'logradouro': dados.get('logradouro'),
+        'bairro': dados.get('bairro'),
+        'cidade': dados.get('localidade'),
+        'estado': dados.get('uf'),
+    }
+
+
+def _interpretar_apicep(dados: Dict) -> Dict:
+    if dados.get('status') in (400, 404):
+        raise CEPInexistente()
+    return {
+        'logradouro': (dados.get('address') or '').split(' - até')[0] or None,
+        'bairro': dados.get('district'),
+        'cidade': dados.get('city'),
+        'estado': dados.get('state'),
+    }
+
+
+class Servico(NamedTuple):
+    """Web service de CEP: nome, modelo de URL e função que interpreta o JSON."""
+    nome: str
+    url: str
+    interpretar: Callable[[Dict], Dict]
+
+
+def servicos_padrao() -> List[Servico]:
+    """Retorna ViaCEP e ApiCEP com as URLs configuradas no ambiente."""
+    return [
+        Servico('viacep', VIACEP_URL, _interpretar_viacep),
+        Servico('apicep', APICEP_URL, _interpretar_apicep),
+    ]
+
+
+class LimitadorTaxa:
+    """
+    Espaça as requisições de um serviço para no máximo ``taxa`` por segundo,
+    somando todas as threads e laços de eventos que o compartilham.
+
+    Args:
+        taxa: Requisições por segundo (0 desativa o limite)
+    """
+
+    def __init__(self, taxa: float):
+        self.intervalo = 1.0 / taxa if taxa > 0 else 0.0
+        self._proximo = 0.0
+        self._lock = threading.Lock()
+
+    async def aguardar(self) -> None:
+        if not self.intervalo:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+class ResolvedorCEP:
+    """
+    Resolve CEPs concorrentemente, compartilhando sessão HTTP e cache.
+
+    Args:
+        servicos: Serviços consultados em corrida (padrão: ViaCEP e ApiCEP)
+        concorrencia: Máximo de CEPs em resolução ao mesmo tempo
+        taxa_por_servico: Máximo de requisições por segundo em cada serviço
+        timeout: Timeout máximo (s) de cada requisição (abaixo dele, o adaptativo do disjuntor)
+        cache: Cache de CEP (padrão: cache do processo)
+        disjuntores: Disjuntor de cada serviço, por nome (padrão: os do processo)
+    """
+
+    def __init__(self, servicos: Optional[List[Servico]] = None, concorrencia: int = CEP_CONCORRENCIA,
+                 taxa_por_servico: float = CEP_TAXA_POR_SERVICO, timeout: float = REQUEST_TIMEOUT,
+                 cache: Optional[CacheCEP] = None,
+                 disjuntores: Optional[Dict[str, cep_disjuntor.Disjuntor]] = None):
+        self.servicos = servicos or servicos_padrao()
+        self.concorrencia = concorrencia
+        self.timeout = timeout
+        self.cache = cache if cache is not None else obter_cache_cep()
+        self.disjuntores = disjuntores or {
+            servico.nome: cep_disjuntor.obter_disjuntor(servico.nome) for servico in self.servicos}
+        self._limitadores = {servico.nome: LimitadorTaxa(taxa_por_servico) for servico in self.servicos}
+
+        max_conexoes = concorrencia * len(self.servicos)
+        self._sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=len(self.servicos), pool_maxsize=max_conexoes)
+        self._sessao.mount('http://', adaptador)
+        self._sessao.mount('https://', adaptador)
+        self._executor = ThreadPoolExecutor(max_workers=max_conexoes)
+
+    def fechar(self) -> None:
+        """
+        Libera as threads e a sessão HTTP. Consultas ainda na fila são
+        canceladas; as que já estão em andamento (p.ex. as que perderam a
+        corrida) terminam antes de a sessão ser fechada.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._sessao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def _consultar(self, servico: Servico, cep: str) -> Optional[Dict]:
+        """Consulta bloqueante (executada no pool de threads)."""
+        disjuntor = self.disjuntores[servico.nome]
+        if not disjuntor.permitir():
+            metricas.CEP_CONSULTAS.inc(servico.nome, 'desligado')
+            return None
+        inicio = time.perf_counter()
+        resultado = 'erro'
+        try:
+            try:
+                resposta = self._sessao.get(servico.url.format(cep), timeout=min(self.timeout, disjuntor.timeout()))
+            except requests.RequestException:
+                return None
+            if resposta.status_code == 400:
+                resultado = 'inexistente'
+                raise CEPInexistente()
+            if resposta.status_code != 200:
+                return None
+            try:
+                endereco = servico.interpretar(json.loads(resposta.text))
+            except CEPInexistente:
+                resultado = 'inexistente'
+                raise
+            except ValueError:
+                return None
+            resultado = 'ok'
+            return {'cep': cep, **endereco}
+        finally:
+            segundos = time.perf_counter() - inicio
+            if resultado == 'erro':
+                disjuntor.registrar_falha()
+            else:
+                disjuntor.registrar_sucesso(segundos)
+            metricas.CEP_CONSULTAS.inc(servico.nome, resultado)
+            metricas.CEP_CONSULTA_SEGUNDOS.observar(segundos, servico.nome)
+
+    async def _consultar_servico(self, servico: Servico, cep: str) -> Optional[Dict]:
+        if not self.disjuntores[servico.nome].disponivel():
+            # Sem esperar a vez no limitador de taxa de um serviço fora do ar
+            metricas.CEP_CONSULTAS.inc(servico.nome, 'desligado')
+            return None
+        await self._limitadores[servico.nome].aguardar()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._consultar, servico, cep)
+
+    async def _resolver(self, cep: str, semaforo: asyncio.Semaphore) -> Optional[Dict]:
+        encontrado, endereco = self.cache.obter(cep)
+        if encontrado:
+            return endereco
+
+        async with semaforo:
+            pendentes = {asyncio.ensure_future(self._consultar_servico(s, cep)) for s in self.servicos}
+            inexistentes = 0
+            try:
+                while pendentes:
+                    concluidas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                    for tarefa in concluidas:
+                        try:
+                            endereco = tarefa.result()
+                        except CEPInexistente:
+                            inexistentes += 1
+                            continue
+                        if endereco:
+                            self.cache.guardar(cep, endereco)
+                            return endereco
+            finally:
+                for tarefa in pendentes:
+                    tarefa.cancel()
+
+        # Só é cache negativo se todos os serviços negaram o CEP
+        if inexistentes == len(self.servicos):
+            self.cache.guardar(cep, None)
+        return None
+
+    async def resolver_lote(self, ceps: List[str]) -> List[Optional[Dict]]:
+        """
+        Resolve vários CEPs em paralelo.
+
+        Args:
+            ceps: CEPs com 8 dígitos
+
+        Returns:
+            List: Endereço (ou None) de cada CEP, na mesma ordem
+        """
+        semaforo = asyncio.Semaphore(self.concorrencia)
+        return await asyncio.gather(*(self._resolver(cep, semaforo) for cep in ceps))
+
+
+_resolvedor: Optional[ResolvedorCEP] = None
+_pid_resolvedor: Optional[int] = None
+_lock = threading.Lock()
+
+
+def obter_resolvedor() -> ResolvedorCEP:
+    """Resolvedor compartilhado pelo processo (recriado após fork, p.ex. em workers do gunicorn)."""
+    global _resolvedor, _pid_resolvedor
+    with _lock:
+        if _resolvedor is None or _pid_resolvedor != os.getpid():
+            # O do processo pai não tem threads no filho e suas conexões são do pai: é descartado
+            _resolvedor = ResolvedorCEP()
+            _pid_resolvedor = os.getpid()
+        return _resolvedor
+
+
+def resolver_ceps(ceps: List[str], **kwargs) -> List[Optional[Dict]]:
+    """
+    Versão síncrona de ``ResolvedorCEP.resolver_lote``.
+
+    Args:
+        ceps: CEPs a resolver
+        **kwargs: Repassados para ``ResolvedorCEP``; sem eles, usa o
+            resolvedor do processo, senão um próprio, fechado ao final
+
+    Returns:
+        List: Endereço (ou None) de cada CEP, na mesma ordem
+    """
+    if not kwargs:
+        return asyncio.run(obter_resolvedor().resolver_lote(ceps))
+    with ResolvedorCEP(**kwargs) as resolvedor:
+        return asyncio.run(resolvedor.resolver_lote(ceps))
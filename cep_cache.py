@@ -0,0 +1,162 @@
+"""
+Cache de consultas de CEP em dois níveis.
+
+Nível 1: LRU em memória do processo.
+Nível 2: SQLite em disco (por padrão ``dados_gerados/cep_cache.sqlite3``),
+compartilhado entre execuções e entre workers do gunicorn.
+
+CEPs inexistentes também são guardados (cache negativo), com TTL menor.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import metricas
+
+CAMINHO_PADRAO = Path(__file__).parent / "dados_gerados" / "cep_cache.sqlite3"
+CEP_CACHE_TAMANHO = int(os.getenv('CEP_CACHE_TAMANHO', '1000'))
+CEP_CACHE_TTL = int(os.getenv('CEP_CACHE_TTL', str(30 * 24 * 3600)))  # segundos
+CEP_CACHE_TTL_NEGATIVO = int(os.getenv('CEP_CACHE_TTL_NEGATIVO', str(24 * 3600)))  # segundos
+
+# Quantidade de gravações entre duas limpezas de entradas expiradas no disco
+_GRAVACOES_ENTRE_LIMPEZAS = 1000
+
+
+class CacheCEP:
+    """
+    Cache de endereços por CEP com LRU em memória e persistência em SQLite.
+
+    Args:
+        caminho: Arquivo SQLite; None desativa o nível em disco
+        tamanho: Capacidade do LRU em memória
+        ttl: Validade (s) de endereços encontrados
+        ttl_negativo: Validade (s) de CEPs inexistentes
+    """
+
+    def __init__(self, caminho: Optional[Path] = CAMINHO_PADRAO, tamanho: int = CEP_CACHE_TAMANHO,
+                 ttl: int = CEP_CACHE_TTL, ttl_negativo: int = CEP_CACHE_TTL_NEGATIVO):
+        self.caminho = Path(caminho) if caminho else None
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self._memoria: "OrderedDict[str, Tuple[Optional[Dict], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conexao: Optional[sqlite3.Connection] = None
+        self._pid_conexao: Optional[int] = None
+        self._gravacoes = 0
+
+    def _conectar(self) -> Optional[sqlite3.Connection]:
+        """Abre a conexão SQLite (reabrindo após fork, p.ex. em workers do gunicorn)."""
+        if self.caminho is None:
+            return None
+        if self._conexao is None or self._pid_conexao != os.getpid():
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            conexao = sqlite3.connect(str(self.caminho), timeout=5, check_same_thread=False)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS cep_cache ("
+                "cep TEXT PRIMARY KEY, endereco TEXT, expira_em REAL NOT NULL)"
+            )
+            conexao.execute("DELETE FROM cep_cache WHERE expira_em < ?", (time.time(),))
+            conexao.commit()
+            self._conexao = conexao
+            self._pid_conexao = os.getpid()
+        return self._conexao
+
+    def _guardar_memoria(self, cep: str, endereco: Optional[Dict], expira_em: float) -> None:
+        self._memoria[cep] = (endereco, expira_em)
+        self._memoria.move_to_end(cep)
+        while len(self._memoria) > self.tamanho:
+            self._memoria.popitem(last=False)
+
+    def obter(self, cep: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Busca um CEP no cache.
+
+        Args:
+            cep: CEP com 8 dígitos
+
+        Returns:
+            Tuple: (encontrado, endereço). Um acerto negativo retorna (True, None)
+        """
+        agora = time.time()
+        with self._lock:
+            entrada = self._memoria.get(cep)
+            if entrada is not None:
+                if entrada[1] >= agora:
+                    self._memoria.move_to_end(cep)
+                    metricas.CEP_CACHE.inc('memoria')
+                    return True, entrada[0]
+                del self._memoria[cep]
+
+            conexao = self._conectar()
+            if conexao is None:
+                metricas.CEP_CACHE.inc('falta')
+                return False, None
+            linha = conexao.execute(
+                "SELECT endereco, expira_em FROM cep_cache WHERE cep = ? AND expira_em >= ?",
+                (cep, agora),
+            ).fetchone()
+            if linha is None:
+                metricas.CEP_CACHE.inc('falta')
+                return False, None
+            endereco = json.loads(linha[0]) if linha[0] is not None else None
+            self._guardar_memoria(cep, endereco, linha[1])
+            metricas.CEP_CACHE.inc('disco')
+            return True, endereco
+
+    def guardar(self, cep: str, endereco: Optional[Dict]) -> None:
+        """
+        Guarda o resultado de uma consulta.
+
+        Args:
+            cep: CEP consultado
+            endereco: Endereço encontrado ou None para CEP inexistente
+        """
+        ttl = self.ttl if endereco is not None else self.ttl_negativo
+        expira_em = time.time() + ttl
+        with self._lock:
+            self._guardar_memoria(cep, endereco, expira_em)
+
+            conexao = self._conectar()
+            if conexao is None:
+                return
+            conexao.execute(
+                "INSERT OR REPLACE INTO cep_cache (cep, endereco, expira_em) VALUES (?, ?, ?)",
+                (cep, json.dumps(endereco, ensure_ascii=False) if endereco is not None else None, expira_em),
+            )
+            self._gravacoes += 1
+            if self._gravacoes % _GRAVACOES_ENTRE_LIMPEZAS == 0:
+                conexao.execute("DELETE FROM cep_cache WHERE expira_em < ?", (time.time(),))
+            conexao.commit()
+
+    def limpar(self) -> None:
+        """Remove todas as entradas (memória e disco)."""
+        with self._lock:
+            self._memoria.clear()
+            conexao = self._conectar()
+            if conexao is not None:
+                conexao.execute("DELETE FROM cep_cache")
+                conexao.commit()
+
+
+@lru_cache(maxsize=None)
+def obter_cache_cep() -> CacheCEP:
+    """
+    Retorna o cache de CEP do processo.
+    O caminho do SQLite pode ser definido em CEP_CACHE_PATH (vazio desativa o disco).
+
+    Returns:
+        CacheCEP: Instância compartilhada
+    """
+    caminho = os.getenv('CEP_CACHE_PATH')
+    if caminho is None:
+        return CacheCEP(CAMINHO_PADRAO)
+    return CacheCEP(Path(caminho) if caminho else None)
@@ -0,0 +1,164 @@
+"""
+Saúde dos web services de CEP: disjuntor e timeout adaptativo por serviço.
+
+Cada serviço (ViaCEP, ApiCEP) tem um disjuntor compartilhado por todas as
+requisições do worker. Após ``CEP_DISJUNTOR_FALHAS`` falhas seguidas
+(erro de conexão, timeout, resposta inválida) o disjuntor abre e o serviço
+deixa de ser consultado por ``CEP_DISJUNTOR_ESPERA`` segundos; depois disso
+fica meio aberto e uma única consulta de teste decide se fecha de novo ou
+volta a abrir. Com todos os serviços abertos, a geração recorre na hora ao
+índice offline em vez de esgotar as tentativas.
+
+O timeout de cada consulta acompanha a latência observada do serviço
+(média móvel mais quatro desvios, como o RTO do TCP), entre
+``CEP_TIMEOUT_MINIMO`` e ``REQUEST_TIMEOUT``, e dobra a cada falha seguida.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import metricas
+
+CEP_DISJUNTOR_FALHAS = int(os.getenv('CEP_DISJUNTOR_FALHAS', '5'))
+CEP_DISJUNTOR_ESPERA = float(os.getenv('CEP_DISJUNTOR_ESPERA', '30'))  # segundos
+CEP_TIMEOUT_MINIMO = float(os.getenv('CEP_TIMEOUT_MINIMO', '0.3'))  # segundos
+# Única leitura da variável; cep_async e gerador importam daqui
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '2'))  # segundos
+
+FECHADO = 'fechado'
+ABERTO = 'aberto'
+MEIO_ABERTO = 'meio_aberto'
+
+# Pesos da média móvel da latência e do seu desvio (os mesmos do RTO do TCP)
+_PESO_MEDIA = 0.125
+_PESO_DESVIO = 0.25
+
+
+class Disjuntor:
+    """
+    Disjuntor e estimativa de latência de um web service.
+
+    Args:
+        servico: Nome do serviço (rótulo das métricas)
+        falhas: Falhas seguidas que abrem o disjuntor
+        espera: Tempo (s) aberto antes da consulta de teste
+        timeout_minimo: Menor timeout adaptativo (s)
+        timeout_maximo: Maior timeout (s), usado também antes da primeira medição
+    """
+
+    def __init__(self, servico: str, falhas: int = CEP_DISJUNTOR_FALHAS, espera: float = CEP_DISJUNTOR_ESPERA,
+                 timeout_minimo: float = CEP_TIMEOUT_MINIMO, timeout_maximo: float = REQUEST_TIMEOUT):
+        self.servico = servico
+        self.falhas = falhas
+        self.espera = espera
+        self.timeout_minimo = timeout_minimo
+        self.timeout_maximo = timeout_maximo
+        self.estado = FECHADO
+        self.falhas_seguidas = 0
+        self._aberto_em = 0.0
+        self._teste_em: Optional[float] = None
+        self._latencia: Optional[float] = None
+        self._desvio = 0.0
+        self._lock = threading.Lock()
+
+    def _mudar(self, estado: str) -> None:
+        if estado != self.estado:
+            self.estado = estado
+            metricas.CEP_DISJUNTOR.inc(self.servico, estado)
+
+    def _testando(self) -> bool:
+        # Um teste sem resultado (p.ex. cancelado antes de sair) não bloqueia para sempre
+        return self._teste_em is not None and time.monotonic() - self._teste_em < 2 * self.timeout_maximo
+
+    def permitir(self) -> bool:
+        """
+        Indica se o serviço pode ser consultado agora. Com o disjuntor meio
+        aberto, só a primeira chamada (a consulta de teste) recebe True.
+        """
+        with self._lock:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO:
+                if time.monotonic() - self._aberto_em < self.espera:
+                    return False
+                self._mudar(MEIO_ABERTO)
+            if self._testando():
+                return False
+            self._teste_em = time.monotonic()
+            return True
+
+    def disponivel(self) -> bool:
+        """Como ``permitir``, mas sem reservar a consulta de teste."""
+        with self._lock:
+            if self.estado == ABERTO:
+                return time.monotonic() - self._aberto_em >= self.espera
+            return not (self.estado == MEIO_ABERTO and self._testando())
+
+    def timeout(self) -> float:
+        """Timeout (s) da próxima consulta."""
+        with self._lock:
+            if self._latencia is None or self.estado != FECHADO:
+                return self.timeout_maximo
+            estimativa = (self._latencia + 4 * self._desvio) * 2 ** self.falhas_seguidas
+            return min(self.timeout_maximo, max(self.timeout_minimo, estimativa))
+
+    def registrar_sucesso(self, segundos: float) -> None:
+        """Registra uma resposta do serviço (inclusive "CEP inexistente") e sua latência."""
+        with self._lock:
+            if self._latencia is None:
+                self._latencia, self._desvio = segundos, segundos / 2
+            else:
+                self._desvio += _PESO_DESVIO * (abs(segundos - self._latencia) - self._desvio)
+                self._latencia += _PESO_MEDIA * (segundos - self._latencia)
+            self.falhas_seguidas = 0
+            self._teste_em = None
+            self._mudar(FECHADO)
+
+    def registrar_falha(self) -> None:
+        """Registra uma falha (erro de conexão, timeout ou resposta inválida)."""
+        with self._lock:
+            self.falhas_seguidas += 1
+            self._teste_em = None
+            if self.estado == MEIO_ABERTO or self.falhas_seguidas >= self.falhas:
+                self._aberto_em = time.monotonic()
+                self._mudar(ABERTO)
+
+    def resumo(self) -> Dict:
+        """Estado para monitoramento."""
+        with self._lock:
+            aberto_ha = time.monotonic() - self._aberto_em if self.estado != FECHADO else None
+            latencia = self._latencia
+            resumo = {
+                'estado': self.estado,
+                'falhas_seguidas': self.falhas_seguidas,
+                'aberto_ha_segundos': round(aberto_ha, 1) if aberto_ha is not None else None,
+                'latencia_media_segundos': round(latencia, 4) if latencia is not None else None,
+            }
+        resumo['timeout_segundos'] = round(self.timeout(), 4)
+        return resumo
+
+
+_disjuntores: Dict[str, Disjuntor] = {}
+_lock = threading.Lock()
+
+
+def obter_disjuntor(servico: str) -> Disjuntor:
+    """Disjuntor do serviço, compartilhado pelo processo."""
+    with _lock:
+        if servico not in _disjuntores:
+            _disjuntores[servico] = Disjuntor(servico)
+        return _disjuntores[servico]
+
+
+def algum_disponivel(servicos: Iterable[str]) -> bool:
+    """Indica se algum dos serviços pode ser consultado (disjuntor não aberto)."""
+    return any(obter_disjuntor(servico).disponivel() for servico in servicos)
+
+
+def resumo() -> Dict[str, Dict]:
+    """Estado de todos os disjuntores já usados pelo processo."""
+    with _lock:
+        disjuntores = list(_disjuntores.values())
+    return {disjuntor.servico: disjuntor.resumo() for disjuntor in disjuntores}
@@ -0,0 +1,121 @@
+"""
+Índice offline de endereços brasileiros.
+
+Carrega uma única vez a tabela empacotada em ``dados/enderecos.json``
+(faixas de CEP por UF, cidades com suas faixas e bairros, tipos e nomes de
+logradouro) e sorteia endereços diretamente dela, sem nenhuma chamada de rede.
+"""
+
+import bisect
+import json
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CAMINHO_INDICE = Path(__file__).parent / "dados" / "enderecos.json"
+
+
+class IndiceEnderecos:
+    """
+    Tabelas pré-processadas para sorteio de endereços em tempo constante.
+
+    Args:
+        dados: Conteúdo do arquivo JSON do índice
+    """
+
+    def __init__(self, dados: Dict):
+        self.tipos_logradouro: Tuple[str, ...] = tuple(dados["tipos_logradouro"])
+        self.nomes_logradouro: Tuple[str, ...] = tuple(dados["nomes_logradouro"])
+
+        # Faixas de CEP por UF, ordenadas para busca binária
+        faixas_uf = sorted(
+            (int(inicio), int(fim), uf)
+            for uf, faixas in dados["ufs"].items()
+            for inicio, fim in faixas
+        )
+        self._inicios_uf: List[int] = [inicio for inicio, _, _ in faixas_uf]
+        self._faixas_uf: List[Tuple[int, int, str]] = faixas_uf
+
+        # Cidades com pesos acumulados (proporcionais à população)
+        self.cidades: Tuple[Dict, ...] = tuple(
+            {
+                "uf": cidade["uf"],
+                "cidade": cidade["cidade"],
+                "bairros": tuple(cidade["bairros"]),
+                "faixas": tuple((int(inicio), int(fim)) for inicio, fim in cidade["faixas"]),
+            }
+            for cidade in dados["cidades"]
+        )
+        self.pesos_acumulados: List[int] = []
+        total = 0
+        for cidade in dados["cidades"]:
+            total += cidade["peso"]
+            self.pesos_acumulados.append(total)
+
+    def uf_do_cep(self, cep: str) -> Optional[str]:
+        """
+        Identifica a UF a que pertence um CEP.
+
+        Args:
+            cep: CEP com 8 dígitos
+
+        Returns:
+            str ou None: Sigla da UF ou None se o CEP estiver fora das faixas
+        """
+        if len(cep) != 8 or not cep.isdigit():
+            return None
+        valor = int(cep)
+        posicao = bisect.bisect_right(self._inicios_uf, valor) - 1
+        if posicao >= 0:
+            inicio, fim, uf = self._faixas_uf[posicao]
+            if inicio <= valor <= fim:
+                return uf
+        return None
+
+    def sortear_cidade(self, rng=random) -> Dict:
+        """Sorteia uma cidade ponderada pela população."""
+        return rng.choices(self.cidades, cum_weights=self.pesos_acumulados)[0]
+
+    def sortear_cep(self, cidade: Dict, rng=random) -> str:
+        """Sorteia um CEP dentro de uma das faixas da cidade."""
+        inicio, fim = rng.choice(cidade["faixas"])
+        return f"{rng.randint(inicio, fim):08d}"
+
+    def sortear_endereco(self, rng=random) -> Dict[str, Optional[str]]:
+        """
+        Sorteia um endereço completo a partir do índice.
+
+        Returns:
+            Dict: Endereço no mesmo formato de ``gerador._formatar_endereco``
+        """
+        cidade = self.sortear_cidade(rng)
+        logradouro = f"{rng.choice(self.tipos_logradouro)} {rng.choice(self.nomes_logradouro)}"
+        return {
+            "cep": self.sortear_cep(cidade, rng),
+            "logradouro": logradouro,
+            "bairro": rng.choice(cidade["bairros"]),
+            "cidade": cidade["cidade"],
+            "estado": cidade["uf"],
+        }
+
+
+@lru_cache(maxsize=None)
+def carregar_indice(caminho: Optional[str] = None) -> IndiceEnderecos:
+    """
+    Carrega (uma única vez por processo) o índice de endereços.
+
+    Args:
+        caminho: Caminho alternativo do arquivo JSON (opcional)
+
+    Returns:
+        IndiceEnderecos: Índice pronto para sorteio
+    """
+    arquivo = Path(caminho) if caminho else CAMINHO_INDICE
+    with open(arquivo, encoding="utf-8") as f:
+        return IndiceEnderecos(json.load(f))
+
+
+def sortear_endereco(rng=random) -> Dict[str, Optional[str]]:
+    """Sorteia um endereço do índice padrão."""
+    return carregar_indice().sortear_endereco(rng)
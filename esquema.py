@@ -0,0 +1,310 @@
+"""
+Esquemas declarativos de conjuntos de dados.
+
+Um esquema (JSON ou YAML) lista os campos do conjunto, na ordem das colunas:
+
+    nome: clientes
+    campos:
+      - nome: documento
+        gerador: cpf
+        formato: mascarado        # 000.000.000-00
+      - nome: nascimento
+        gerador: data_nascimento
+        formato: iso              # YYYY-MM-DD
+      - nome: cidade
+        caminho: endereco.cidade  # aninhamento nos registros JSON
+        gerador: cidade
+      - nome: origem
+        gerador: constante
+        valor: homologacao
+
+O esquema é compilado uma vez (``compilar``): só as colunas de origem usadas
+são sorteadas pelo gerador em lote e cada formato é aplicado à coluna
+inteira, sem montar e achatar um dicionário por pessoa. Como a geração passa
+por ``gerador_lote.iterar_lotes``, semente, modo único, shards e consulta
+online de CEP funcionam igual ao conjunto padrão.
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+import gerador_lote
+
+try:
+    import yaml
+except ImportError:  # PyYAML é necessário apenas para esquemas em YAML
+    yaml = None
+
+# Gerador -> coluna de origem em gerador.COLUNAS_ORDEM
+GERADORES = {
+    'nome': "Nome Completo",
+    'cpf': "CPF",
+    'data_nascimento': "Data de Nascimento",
+    'email': "Email",
+    'celular': "Celular",
+    'cep': "Endereço - CEP",
+    'logradouro': "Endereço - Logradouro",
+    'numero': "Endereço - Número",
+    'complemento': "Endereço - Complemento",
+    'bairro': "Endereço - Bairro",
+    'cidade': "Endereço - Cidade",
+    'estado': "Endereço - Estado",
+}
+
+# Tipos das colunas nos formatos Arrow (os demais são texto)
+TIPOS = {
+    'numero': 'inteiro',
+    'logradouro': 'categoria',
+    'bairro': 'categoria',
+    'cidade': 'categoria',
+    'estado': 'categoria',
+}
+
+
+def _reorganizar(molde: Sequence[Union[int, str]]) -> Callable[[pd.Series], pd.Series]:
+    """
+    Formatador vetorizado de textos de tamanho fixo: cada item do molde é a
+    posição de um caractere da origem ou um separador literal. Trabalha sobre
+    a matriz de caracteres da coluna inteira, sem laço por valor; valores
+    nulos (p.ex. CEP não resolvido) continuam None.
+    """
+    largura = max(item for item in molde if isinstance(item, int)) + 1
+
+    def formatar(serie: pd.Series) -> pd.Series:
+        nulos = serie.isna().to_numpy()
+        valores = serie.to_numpy(dtype=object)
+        if nulos.any():
+            valores = np.where(nulos, '0' * largura, valores)
+        caracteres = valores.astype(f'U{largura}').view('U1').reshape(len(valores), largura)
+        saida = np.empty((len(valores), len(molde)), dtype='U1')
+        for coluna, item in enumerate(molde):
+            saida[:, coluna] = caracteres[:, item] if isinstance(item, int) else item
+        resultado = saida.view(f'U{len(molde)}').ravel().astype(object)
+        resultado[nulos] = None
+        return pd.Series(resultado, index=serie.index)
+    return formatar
+
+
+# Formatos aceitos por gerador; o primeiro é o padrão (None = valor como gerado)
+FORMATOS: Dict[str, Dict[str, Optional[Callable[[pd.Series], pd.Series]]]] = {
+    # 000.000.000-00
+    'cpf': {'digitos': None, 'mascarado': _reorganizar([0, 1, 2, '.', 3, 4, 5, '.', 6, 7, 8, '-', 9, 10])},
+    # DD/MM/YYYY -> YYYY-MM-DD
+    'data_nascimento': {'br': None, 'iso': _reorganizar([6, 7, 8, 9, '-', 3, 4, '-', 0, 1])},
+    # (00) 00000-0000
+    'celular': {'digitos': None,
+                'mascarado': _reorganizar(['(', 0, 1, ')', ' ', 2, 3, 4, 5, 6, '-', 7, 8, 9, 10])},
+    # 00000-000
+    'cep': {'digitos': None, 'mascarado': _reorganizar([0, 1, 2, 3, 4, '-', 5, 6, 7])},
+}
+
+
+def definicao_padrao() -> Dict:
+    """Esquema equivalente à saída padrão (colunas de gerador.COLUNAS_ORDEM)."""
+    campos = []
+    for chave, coluna in GERADORES.items():
+        campo = {'nome': coluna, 'gerador': chave}
+        if coluna.startswith("Endereço - "):
+            campo['caminho'] = "Endereço." + coluna[len("Endereço - "):]
+        campos.append(campo)
+    return {'nome': 'padrao', 'campos': campos}
+
+
+def ler(caminho: Union[str, Path]) -> Dict:
+    """
+    Lê a definição de um esquema de um arquivo JSON ou YAML.
+
+    Args:
+        caminho: Arquivo .json, .yaml ou .yml
+
+    Returns:
+        Dict: Definição do esquema (ainda não validada)
+
+    Raises:
+        ValueError: Se o arquivo não puder ser interpretado
+    """
+    caminho = Path(caminho)
+    texto = caminho.read_text(encoding='utf-8')
+    if caminho.suffix.lower() in ('.yaml', '.yml'):
+        if yaml is None:
+            raise ValueError("PyYAML é necessário para esquemas YAML (pip install pyyaml)")
+        try:
+            return yaml.safe_load(texto)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Esquema YAML inválido: {e}") from e
+    try:
+        return json.loads(texto)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Esquema JSON inválido: {e}") from e
+
+
+class Campo:
+    """Um campo compilado: coluna de origem, formatação e caminho nos registros."""
+
+    __slots__ = ('nome', 'gerador', 'origem', 'formatar', 'valor', 'caminho')
+
+    def __init__(self, definicao: Dict, posicao: int):
+        if not isinstance(definicao, dict):
+            raise ValueError(f"Campo {posicao}: deve ser um objeto com nome e gerador")
+        desconhecidas = set(definicao) - {'nome', 'gerador', 'formato', 'valor', 'caminho'}
+        if desconhecidas:
+            raise ValueError(f"Campo {posicao}: chaves desconhecidas: {', '.join(sorted(desconhecidas))}")
+        self.nome = definicao.get('nome')
+        if not isinstance(self.nome, str) or not self.nome:
+            raise ValueError(f"Campo {posicao}: nome deve ser um texto não vazio")
+        self.gerador = definicao.get('gerador')
+        if self.gerador != 'constante' and self.gerador not in GERADORES:
+            raise ValueError(f"Campo {self.nome}: gerador desconhecido: {self.gerador} "
+                             f"(use {', '.join(GERADORES)} ou constante)")
+
+        self.origem = GERADORES.get(self.gerador)
+        self.valor = None
+        if self.gerador == 'constante':
+            self.valor = definicao.get('valor')
+            if not isinstance(self.valor, str):
+                raise ValueError(f"Campo {self.nome}: constante exige valor de texto")
+        elif 'valor' in definicao:
+            raise ValueError(f"Campo {self.nome}: valor só se aplica ao gerador constante")
+
+        formatos = FORMATOS.get(self.gerador, {})
+        formato = definicao.get('formato')
+        if formato is None:
+            self.formatar = None
+        elif formato in formatos:
+            self.formatar = formatos[formato]
+        elif formatos:
+            raise ValueError(f"Campo {self.nome}: formato inválido: {formato} (use {', '.join(formatos)})")
+        else:
+            raise ValueError(f"Campo {self.nome}: o gerador {self.gerador} não aceita formato")
+
+        caminho = definicao.get('caminho', self.nome)
+        if not isinstance(caminho, str) or not all(caminho.split('.')):
+            raise ValueError(f"Campo {self.nome}: caminho inválido: {caminho!r}")
+        self.caminho = tuple(caminho.split('.'))
+
+
+class Esquema:
+    """
+    Esquema compilado, pronto para gerar blocos de pessoas.
+
+    Args:
+        definicao: Dicionário com ``campos`` (lista) e ``nome`` (opcional)
+
+    Raises:
+        ValueError: Se a definição for inválida
+    """
+
+    def __init__(self, definicao: Dict):
+        if not isinstance(definicao, dict) or not isinstance(definicao.get('campos'), list):
+            raise ValueError("O esquema deve ter uma lista de campos")
+        if not definicao['campos']:
+            raise ValueError("O esquema deve ter ao menos um campo")
+        self.definicao = definicao
+        self.nome = definicao.get('nome', 'personalizado')
+        self.campos = [Campo(campo, posicao) for posicao, campo in enumerate(definicao['campos'], start=1)]
+
+        self.colunas = [campo.nome for campo in self.campos]
+        repetidas = sorted({coluna for coluna in self.colunas if self.colunas.count(coluna) > 1})
+        if repetidas:
+            raise ValueError(f"Campos repetidos: {', '.join(repetidas)}")
+        # Colunas que o gerador em lote precisa sortear, sem repetição
+        self.origens = list(dict.fromkeys(campo.origem for campo in self.campos if campo.origem))
+        self.tipos = {campo.nome: TIPOS[campo.gerador] for campo in self.campos if campo.gerador in TIPOS}
+        self._montar_registro = self._compilar_registro()
+
+    def _compilar_registro(self) -> Callable[[tuple], Dict]:
+        """Monta, uma vez, a função que aninha uma linha conforme os caminhos."""
+        arvore: Dict = {}
+        for indice, campo in enumerate(self.campos):
+            no = arvore
+            for chave in campo.caminho[:-1]:
+                no = no.setdefault(chave, {})
+                if not isinstance(no, dict):
+                    raise ValueError(f"Campo {campo.nome}: caminho em conflito com outro campo")
+            if campo.caminho[-1] in no:
+                raise ValueError(f"Campo {campo.nome}: caminho em conflito com outro campo")
+            no[campo.caminho[-1]] = indice
+
+        def compilar(no: Dict) -> Callable[[tuple], Dict]:
+            itens = [(chave, filho if isinstance(filho, int) else compilar(filho)) for chave, filho in no.items()]
+            if all(isinstance(filho, int) for _, filho in itens):
+                return lambda linha: {chave: linha[indice] for chave, indice in itens}
+            return lambda linha: {chave: linha[filho] if isinstance(filho, int) else filho(linha)
+                                  for chave, filho in itens}
+        return compilar(arvore)
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte um bloco do gerador em lote (colunas de origem) nas colunas do esquema.
+
+        Args:
+            df: Bloco com as colunas de ``self.origens``
+
+        Returns:
+            pd.DataFrame: Bloco com as colunas de ``self.colunas``
+        """
+        colunas = {}
+        for campo in self.campos:
+            if campo.origem is None:
+                colunas[campo.nome] = np.full(len(df), campo.valor, dtype=object)
+            elif campo.formatar is None:
+                colunas[campo.nome] = df[campo.origem].to_numpy()
+            else:
+                colunas[campo.nome] = campo.formatar(df[campo.origem]).to_numpy()
+        return pd.DataFrame(colunas, index=df.index)
+
+    def gerar_lote(self, quantidade: int, rng: Optional[np.random.Generator] = None,
+                   seed: Optional[int] = None) -> pd.DataFrame:
+        """Gera um bloco de ``quantidade`` pessoas já no formato do esquema."""
+        return self.aplicar(gerador_lote.gerar_lote(quantidade, rng=rng, seed=seed, campos=self.origens))
+
+    def iterar_lotes(self, quantidade: Optional[int], tamanho_lote: Optional[int] = None,
+                     **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Como ``gerador_lote.iterar_lotes``, mas com as colunas do esquema.
+
+        Args:
+            quantidade: Número total de pessoas (None gera blocos indefinidamente)
+            tamanho_lote: Linhas por DataFrame (padrão: gerador_lote.TAMANHO_LOTE_PADRAO)
+            **kwargs: rng, seed, bloco_inicial e unico, repassados ao gerador em lote
+
+        Yields:
+            pd.DataFrame: Próximo bloco de pessoas
+        """
+        tamanho_lote = tamanho_lote or gerador_lote.TAMANHO_LOTE_PADRAO
+        for df in gerador_lote.iterar_lotes(quantidade, tamanho_lote, campos=self.origens, **kwargs):
+            yield self.aplicar(df)
+
+    def registros(self, df: pd.DataFrame) -> List[Dict]:
+        """Registros aninhados conforme o ``caminho`` de cada campo (para respostas JSON)."""
+        montar = self._montar_registro
+        return [montar(linha) for linha in df[self.colunas].itertuples(index=False, name=None)]
+
+    def opcoes_exportacao(self, formato: str) -> Dict:
+        """Opções de ``exportacao.escrever`` para gravar as colunas do esquema."""
+        opcoes = {'campos': self.colunas}
+        if formato in ('parquet', 'arrow', 'feather'):
+            opcoes['tipos'] = self.tipos
+        return opcoes
+
+
+def compilar(definicao: Union[Dict, str, Path]) -> Esquema:
+    """
+    Valida e compila um esquema.
+
+    Args:
+        definicao: Dicionário já carregado ou caminho de um arquivo JSON/YAML
+
+    Returns:
+        Esquema: Esquema compilado
+
+    Raises:
+        ValueError: Se a definição for inválida
+    """
+    if isinstance(definicao, (str, Path)):
+        definicao = ler(definicao)
+    return Esquema(definicao)
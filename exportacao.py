@@ -0,0 +1,438 @@
+"""
+Exportação em fluxo (streaming) dos dados gerados.
+
+Os escritores recebem um iterável de DataFrames (p.ex. ``gerador_lote.iterar_lotes``)
+e processam um bloco por vez, de modo que a memória usada não depende do
+número total de linhas.
+"""
+
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+import gerador
+import metricas
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é necessário apenas para Parquet/Arrow
+    pa = pq = None
+
+FORMATOS = ('csv', 'xlsx', 'parquet', 'arrow', 'feather')
+
+BOM_UTF8 = '\ufeff'
+# Limite do Excel: 1.048.576 linhas por planilha, uma delas o cabeçalho
+MAX_LINHAS_PLANILHA = 1_048_575
+NOME_PLANILHA = 'Dados Pessoais'
+
+
+def pico_memoria_mb() -> Optional[float]:
+    """
+    Pico de memória residente (RSS) do processo até agora.
+
+    Returns:
+        float ou None: Pico em MB, ou None onde não é possível medir
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _colunas(campos: Optional[Sequence[str]]) -> List[str]:
+    """Colunas exportadas: os campos pedidos ou todas as de ``gerador.COLUNAS_ORDEM``."""
+    return list(campos) if campos else gerador.COLUNAS_ORDEM
+
+
+def iterar_csv(blocos: Iterable[pd.DataFrame], campos: Optional[Sequence[str]] = None) -> Iterator[str]:
+    """
+    Converte blocos de pessoas em pedaços de texto CSV.
+    O primeiro pedaço traz o BOM (como ``utf-8-sig``) e o cabeçalho.
+
+    Args:
+        blocos: DataFrames com as colunas de ``gerador.COLUNAS_ORDEM``
+        campos: Colunas incluídas, na ordem dada (todas se None)
+
+    Yields:
+        str: Trecho do arquivo CSV
+    """
+    colunas = _colunas(campos)
+    yield BOM_UTF8 + pd.DataFrame(columns=colunas).to_csv(index=False)
+    for df in blocos:
+        yield df[colunas].to_csv(index=False, header=False)
+
+
+def iterar_ndjson(blocos: Iterable[pd.DataFrame], campos: Optional[Sequence[str]] = None,
+                  sse: bool = False) -> Iterator[str]:
+    """
+    Converte blocos de pessoas em JSON delimitado por linha (uma pessoa por
+    linha) ou em eventos ``data:`` de server-sent events.
+
+    Args:
+        blocos: DataFrames com as colunas de ``gerador.COLUNAS_ORDEM``
+        campos: Colunas incluídas, na ordem dada (todas se None)
+        sse: Formata cada pessoa como um evento SSE
+
+    Yields:
+        str: Trecho com as pessoas de um bloco
+    """
+    colunas = _colunas(campos)
+    for df in blocos:
+        # O serializador do pandas é bem mais rápido que json.dumps por registro,
+        # mas escapa "/" (datas viram "01\/02\/1990"); o escape é desfeito aqui
+        linhas = df[colunas].to_json(orient='records', lines=True, force_ascii=False).replace('\\/', '/')
+        linhas = linhas.rstrip('\n')
+        if sse:
+            yield 'data: ' + linhas.replace('\n', '\n\ndata: ') + '\n\n'
+        else:
+            yield linhas + '\n'
+
+
+def escrever_excel(blocos: Iterable[pd.DataFrame], destino: Union[str, Path, BinaryIO],
+                   linhas_por_planilha: int = MAX_LINHAS_PLANILHA,
+                   campos: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Escreve blocos de pessoas em um XLSX no modo write-only do openpyxl,
+    que grava as linhas em disco à medida que chegam. Ao atingir o limite de
+    linhas do Excel, continua em uma nova planilha ("Dados Pessoais 2", ...).
+
+    Args:
+        blocos: DataFrames com as colunas de ``gerador.COLUNAS_ORDEM``
+        destino: Caminho ou arquivo binário de saída
+        linhas_por_planilha: Linhas de dados por planilha
+        campos: Colunas incluídas, na ordem dada (todas se None)
+
+    Returns:
+        Dict: Linhas escritas, planilhas criadas e pico de memória (MB)
+    """
+    colunas = _colunas(campos)
+    workbook = Workbook(write_only=True)
+    planilha = None
+    linhas_na_planilha = 0
+    planilhas = 0
+    total = 0
+
+    for df in blocos:
+        for linha in df[colunas].itertuples(index=False, name=None):
+            if planilha is None or linhas_na_planilha == linhas_por_planilha:
+                planilhas += 1
+                titulo = NOME_PLANILHA if planilhas == 1 else f"{NOME_PLANILHA} {planilhas}"
+                planilha = workbook.create_sheet(titulo)
+                planilha.append(colunas)
+                linhas_na_planilha = 0
+            planilha.append(linha)
+            linhas_na_planilha += 1
+            total += 1
+
+    if planilha is None:
+        planilhas = 1
+        workbook.create_sheet(NOME_PLANILHA).append(colunas)
+
+    workbook.save(destino)
+    return {'linhas': total, 'planilhas': planilhas, 'pico_memoria_mb': pico_memoria_mb()}
+
+
+def _exigir_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("Os formatos parquet/arrow requerem o pacote pyarrow (pip install pyarrow)")
+
+
+def escrever_csv(blocos: Iterable[pd.DataFrame], destino: Union[str, Path],
+                 campos: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Escreve blocos de pessoas em um arquivo CSV (utf-8 com BOM).
+
+    Args:
+        blocos: DataFrames com as colunas de ``gerador.COLUNAS_ORDEM``
+        destino: Caminho do arquivo
+        campos: Colunas incluídas, na ordem dada (todas se None)
+
+    Returns:
+        Dict: Linhas escritas e pico de memória (MB)
+    """
+    total = 0
+
+    def contar(blocos):
+        nonlocal total
+        for df in blocos:
+            total += len(df)
+            yield df
+
+    with open(destino, 'w', encoding='utf-8', newline='') as arquivo:
+        for trecho in iterar_csv(contar(blocos), campos):
+            arquivo.write(trecho)
+    return {'linhas': total, 'pico_memoria_mb': pico_memoria_mb()}
+
+
+# Colunas de baixa cardinalidade, gravadas com codificação de dicionário
+COLUNAS_DICIONARIO = (
+    "Endereço - Logradouro", "Endereço - Bairro", "Endereço - Cidade", "Endereço - Estado",
+)
+# Tipo de cada coluna nos formatos Arrow: 'inteiro', 'categoria' (dicionário) ou texto
+TIPOS_PADRAO = {"Endereço - Número": 'inteiro', **{coluna: 'categoria' for coluna in COLUNAS_DICIONARIO}}
+TAMANHO_ROW_GROUP_PADRAO = int(os.getenv('TAMANHO_ROW_GROUP', '131072'))
+
+
+def _schema_arrow(campos: Optional[Sequence[str]] = None,
+                  tipos: Optional[Dict[str, str]] = None) -> "pa.Schema":
+    """Schema fixo das colunas (evita inferir tipo nulo em blocos sem complemento)."""
+    tipos = TIPOS_PADRAO if tipos is None else tipos
+
+    def tipo(coluna):
+        if tipos.get(coluna) == 'inteiro':
+            return pa.int64()
+        if tipos.get(coluna) == 'categoria':
+            return pa.dictionary(pa.int32(), pa.string())
+        return pa.string()
+    return pa.schema([(coluna, tipo(coluna)) for coluna in _colunas(campos)])
+
+
+def _colunas_dicionario(schema: "pa.Schema") -> List[str]:
+    return [campo.name for campo in schema if pa.types.is_dictionary(campo.type)]
+
+
+class _CodificadorDicionario:
+    """
+    Dicionário crescente de uma coluna ao longo dos blocos. Cada bloco só
+    acrescenta valores novos ao final, o que o formato IPC do Arrow aceita
+    como delta de dicionário.
+    """
+
+    def __init__(self):
+        self.categorias = pd.Index([], dtype=object)
+
+    def codificar(self, valores: pd.Series) -> "pa.DictionaryArray":
+        novos = pd.Index(valores.dropna().unique()).difference(self.categorias, sort=False)
+        if len(novos):
+            self.categorias = self.categorias.append(novos)
+        codigos = self.categorias.get_indexer(valores)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codigos, mask=codigos < 0, type=pa.int32()),
+            pa.array(self.categorias, type=pa.string()),
+        )
+
+
+def _iterar_tabelas_arrow(blocos: Iterable[pd.DataFrame], schema: "pa.Schema") -> Iterator["pa.Table"]:
+    """Converte blocos de pessoas em tabelas Arrow com o schema fixo."""
+    codificadores = {coluna: _CodificadorDicionario() for coluna in _colunas_dicionario(schema)}
+    for df in blocos:
+        colunas = []
+        for campo in schema:
+            valores = df[campo.name]
+            if campo.name in codificadores:
+                colunas.append(codificadores[campo.name].codificar(valores))
+            else:
+                colunas.append(pa.array(valores, type=campo.type, from_pandas=True))
+        yield pa.Table.from_arrays(colunas, schema=schema)
+
+
+def escrever_parquet(blocos: Iterable[pd.DataFrame], destino: Union[str, Path, BinaryIO],
+                     tamanho_row_group: int = TAMANHO_ROW_GROUP_PADRAO,
+                     compressao: str = 'zstd', campos: Optional[Sequence[str]] = None,
+                     tipos: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Escreve blocos de pessoas em um arquivo Parquet.
+    Estado, cidade, bairro e logradouro usam codificação de dicionário
+    (e voltam como category no pandas). As linhas são agrupadas em row
+    groups de ``tamanho_row_group``, independentemente do tamanho dos blocos.
+
+    Args:
+        blocos: DataFrames com as colunas de ``gerador.COLUNAS_ORDEM``
+        destino: Caminho ou arquivo binário de saída
+        tamanho_row_group: Linhas por row group
+        compressao: Codec de compressão do Parquet
+        campos: Colunas incluídas, na ordem dada (todas se None)
+        tipos: Tipo de cada coluna (padrão: ``TIPOS_PADRAO``)
+
+    Returns:
+        Dict: Linhas escritas, row groups e pico de memória (MB)
+    """
+    _exigir_pyarrow()
+    total = 0
+    row_groups = 0
+    pendentes = []
+    linhas_pendentes = 0
+
+    destino = str(destino) if isinstance(destino, Path) else destino
+    schema = _schema_arrow(campos, tipos)
+    with pq.ParquetWriter(destino, schema, compression=compressao,
+                          use_dictionary=_colunas_dicionario(schema)) as escritor:
+        def gravar(tabela):
+            nonlocal row_groups
+            escritor.write_table(tabela, row_group_size=tamanho_row_group)
+            row_groups += 1
+
+        for tabela in _iterar_tabelas_arrow(blocos, schema):
+            total += tabela.num_rows
+            pendentes.append(tabela)
+            linhas_pendentes += tabela.num_rows
+            if linhas_pendentes < tamanho_row_group:
+                continue
+            acumulado = pa.concat_tables(pendentes).combine_chunks()
+            inicio = 0
+            while acumulado.num_rows - inicio >= tamanho_row_group:
+                gravar(acumulado.slice(inicio, tamanho_row_group))
+                inicio += tamanho_row_group
+            pendentes = [acumulado.slice(inicio)]
+            linhas_pendentes = acumulado.num_rows - inicio
+
+        if linhas_pendentes:
+            gravar(pa.concat_tables(pendentes).combine_chunks())
+
+    return {'linhas': total, 'row_groups': row_groups, 'pico_memoria_mb': pico_memoria_mb()}
+
+
+def escrever_arrow(blocos: Iterable[pd.DataFrame], destino: Union[str, Path, BinaryIO],
+                   compressao: Optional[str] = None, campos: Optional[Sequence[str]] = None,
+                   tipos: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Escreve blocos de pessoas no formato de arquivo Arrow IPC (Feather v2).
+    Sem compressão o arquivo pode ser lido por memory-map quase sem custo.
+
+    Args:
+        blocos: DataFrames com as colunas de ``gerador.COLUNAS_ORDEM``
+        destino: Caminho ou arquivo binário de saída
+        compressao: None, 'lz4' ou 'zstd'
+        campos: Colunas incluídas, na ordem dada (todas se None)
+        tipos: Tipo de cada coluna (padrão: ``TIPOS_PADRAO``)
+
+    Returns:
+        Dict: Linhas escritas e pico de memória (MB)
+    """
+    _exigir_pyarrow()
+    total = 0
+    opcoes = pa.ipc.IpcWriteOptions(compression=compressao, emit_dictionary_deltas=True)
+    destino = str(destino) if isinstance(destino, Path) else destino
+    schema = _schema_arrow(campos, tipos)
+    with pa.ipc.new_file(destino, schema, options=opcoes) as escritor:
+        for tabela in _iterar_tabelas_arrow(blocos, schema):
+            escritor.write_table(tabela)
+            total += tabela.num_rows
+    return {'linhas': total, 'pico_memoria_mb': pico_memoria_mb()}
+
+
+def escrever_feather(blocos: Iterable[pd.DataFrame], destino: Union[str, Path, BinaryIO],
+                     campos: Optional[Sequence[str]] = None, tipos: Optional[Dict[str, str]] = None) -> Dict:
+    """Arrow IPC com compressão zstd (arquivo .feather menor, leitura ainda rápida)."""
+    return escrever_arrow(blocos, destino, compressao='zstd', campos=campos, tipos=tipos)
+
+
+def ler_tabela_arrow(caminho: Union[str, Path]) -> "pa.Table":
+    """Lê um arquivo Arrow IPC/Feather por memory-map."""
+    _exigir_pyarrow()
+    with pa.memory_map(str(caminho)) as fonte:
+        return pa.ipc.open_file(fonte).read_all()
+
+
+def escrever(formato: str, blocos: Iterable[pd.DataFrame], destino: Union[str, Path], **opcoes) -> Dict:
+    """
+    Escreve blocos de pessoas no formato indicado.
+
+    Args:
+        formato: Um de FORMATOS
+        blocos: DataFrames com as colunas de ``gerador.COLUNAS_ORDEM``
+        destino: Caminho do arquivo
+        **opcoes: Repassadas ao escritor (p.ex. tamanho_row_group no Parquet ou
+            campos e tipos, as colunas incluídas e seus tipos nos formatos Arrow)
+
+    Returns:
+        Dict: Estatísticas do escritor
+    """
+    escritores = {
+        'csv': escrever_csv, 'xlsx': escrever_excel, 'parquet': escrever_parquet,
+        'arrow': escrever_arrow, 'feather': escrever_feather,
+    }
+    if formato not in escritores:
+        raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS)})")
+    espera = [0.0]
+    inicio = time.perf_counter()
+    estatisticas = escritores[formato](_medir_espera(blocos, espera), destino, **opcoes)
+    metricas.EXPORTACAO_SEGUNDOS.observar(time.perf_counter() - inicio - espera[0], formato)
+    metricas.EXPORTACAO_LINHAS.inc(formato, valor=estatisticas['linhas'])
+    return estatisticas
+
+
+def _medir_espera(blocos: Iterable[pd.DataFrame], espera: List[float]) -> Iterator[pd.DataFrame]:
+    """Repassa os blocos somando em ``espera[0]`` o tempo gasto para gerá-los."""
+    iterador = iter(blocos)
+    while True:
+        inicio = time.perf_counter()
+        try:
+            df = next(iterador)
+        except StopIteration:
+            return
+        finally:
+            espera[0] += time.perf_counter() - inicio
+        yield df
+
+
+def _ler_excel_em_blocos(caminho: Path, tamanho_bloco: int = 10_000,
+                        campos: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Lê as planilhas de um XLSX em DataFrames de até ``tamanho_bloco`` linhas."""
+    colunas = _colunas(campos)
+    workbook = load_workbook(caminho, read_only=True)
+    try:
+        for planilha in workbook.worksheets:
+            linhas = planilha.iter_rows(min_row=2, values_only=True)
+            bloco = []
+            for linha in linhas:
+                bloco.append(linha)
+                if len(bloco) == tamanho_bloco:
+                    yield pd.DataFrame(bloco, columns=colunas)
+                    bloco = []
+            if bloco:
+                yield pd.DataFrame(bloco, columns=colunas)
+    finally:
+        workbook.close()
+
+
+def _ler_parquet_em_blocos(caminho: Path) -> Iterator[pd.DataFrame]:
+    """Lê um Parquet um row group por vez."""
+    arquivo = pq.ParquetFile(str(caminho))
+    for grupo in range(arquivo.num_row_groups):
+        yield arquivo.read_row_group(grupo).to_pandas()
+
+
+def mesclar_partes(formato: str, partes: List[Path], destino: Path, **opcoes) -> None:
+    """
+    Junta arquivos parciais (shards) em um único arquivo, em fluxo.
+
+    Args:
+        formato: Formato dos arquivos (um de FORMATOS)
+        partes: Arquivos parciais, na ordem das linhas
+        destino: Arquivo final
+        **opcoes: Repassadas ao escritor (p.ex. tamanho_row_group, campos)
+    """
+    if formato == 'csv':
+        with open(destino, 'wb') as saida:
+            for numero, parte in enumerate(partes):
+                with open(parte, 'rb') as entrada:
+                    if numero > 0:
+                        entrada.readline()  # BOM + cabeçalho só no primeiro
+                    shutil.copyfileobj(entrada, saida)
+    elif formato == 'parquet':
+        _exigir_pyarrow()
+        escrever_parquet((df for parte in partes for df in _ler_parquet_em_blocos(parte)), destino, **opcoes)
+    elif formato in ('arrow', 'feather'):
+        _exigir_pyarrow()
+        blocos = (lote.to_pandas() for parte in partes for lote in ler_tabela_arrow(parte).to_batches())
+        escrever(formato, blocos, destino, **opcoes)
+    elif formato == 'xlsx':
+        campos = opcoes.get('campos')
+        escrever_excel((df for parte in partes for df in _ler_excel_em_blocos(parte, campos=campos)), destino,
+                       campos=campos)
+    else:
+        raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS)})")
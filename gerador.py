@@ -1,62 +1,200 @@
 import random
 import datetime
 import json
+import numpy as np
 import pandas as pd
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 from brazilcep import get_address_from_cep, WebService
+from brazilcep.exceptions import CEPNotFound, InvalidCEP
 from pathlib import Path
-from functools import lru_cache
 import os
+import sys
+import argparse
+import math
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import enderecos
+import metricas
+import nomes
+import unicidade
+from cep_cache import obter_cache_cep
+import cep_async
+import cep_disjuntor
+import esquema
+import exportacao
+import gerador_lote
 
 # Constantes
 MAX_CEP_ATTEMPTS = int(os.getenv('MAX_CEP_ATTEMPTS', '5'))  # Reduzido para testes
-REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '2'))  # segundos - Reduzido para testes
+REQUEST_TIMEOUT = cep_disjuntor.REQUEST_TIMEOUT  # segundos - Reduzido para testes
 MIN_AGE_YEARS = 18
 MAX_AGE_YEARS = 80
 MAX_NAME_LENGTH = 60
+# Consulta online (ViaCEP/ApiCEP) é opcional; por padrão usa o índice offline
+CEP_ONLINE = os.getenv('CEP_ONLINE', '0').lower() in ('1', 'true', 'sim')
+# Web services consultados no modo online (nomes dos disjuntores, ver cep_disjuntor)
+SERVICOS_CEP = ('viacep', 'apicep')
+# Listas de prenomes/sobrenomes (CSV nome,frequencia[,sexo]); vazio usa dados/nomes.csv e dados/sobrenomes.csv
+NOMES_ARQUIVO = os.getenv('NOMES_ARQUIVO', '')
+SOBRENOMES_ARQUIVO = os.getenv('SOBRENOMES_ARQUIVO', '')
+# Chance de um segundo prenome do mesmo sexo (p.ex. "Maria Eduarda")
+PROB_NOME_COMPOSTO = float(os.getenv('PROB_NOME_COMPOSTO', '0.15'))
 
-NOMES = [
-    "Maria", "Joao", "Ana", "Pedro", "Sofia", "Lucas", "Isabela", "Gabriel", 
-    "Laura", "Matheus", "Julia", "Guilherme", "Manuela", "Rafael", "Beatriz", 
-    "Daniel", "Luiza", "Felipe", "Helena", "Bruno"
+PROVEDORES_EMAIL = [
+    "gmail.com", "hotmail.com", "outlook.com", "yahoo.com", "protonmail.com"
 ]
 
-SOBRENOMES = [
-    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", 
-    "Rodrigues", "Almeida", "Nascimento", "Martins", "Ferreira", "Gomes", 
-    "Ribeiro", "Carvalho", "Teixeira", "Fernandes", "Dias", "Moreira", "Borges"
+# Ordem das colunas nos arquivos exportados
+COLUNAS_ORDEM = [
+    "Nome Completo", "CPF", "Data de Nascimento", "Email", "Celular",
+    "Endereço - CEP", "Endereço - Logradouro", "Endereço - Número", 
+    "Endereço - Complemento", "Endereço - Bairro", "Endereço - Cidade", 
+    "Endereço - Estado"
 ]
 
-PROVEDORES_EMAIL = [
-    "gmail.com", "hotmail.com", "outlook.com", "yahoo.com", "protonmail.com"
-]
+# Campos que dependem da consulta de CEP (os demais são gerados localmente)
+CAMPOS_ENDERECO_CEP = (
+    "Endereço - CEP", "Endereço - Logradouro", "Endereço - Bairro",
+    "Endereço - Cidade", "Endereço - Estado"
+)
+CAMPOS_NUMERO_COMPLEMENTO = ("Endereço - Número", "Endereço - Complemento")
+_TODAS_AS_COLUNAS = frozenset(COLUNAS_ORDEM)
+_ENDERECO_VAZIO = {'cep': None, 'logradouro': None, 'bairro': None, 'cidade': None, 'estado': None}
+
+class Pessoa(NamedTuple):
+    """
+    Pessoa como registro plano, na ordem de ``COLUNAS_ORDEM``: uma tupla de
+    campos em vez de dicionários com as chaves por extenso em cada linha.
+    Vira DataFrame diretamente (``pd.DataFrame(pessoas, columns=COLUNAS_ORDEM)``);
+    o dicionário aninhado da API só é montado por ``aninhado``.
+    """
+    nome: Optional[str]
+    cpf: Optional[str]
+    data_nascimento: Optional[str]
+    email: Optional[str]
+    celular: Optional[str]
+    cep: Optional[str]
+    logradouro: Optional[str]
+    numero: Optional[int]
+    complemento: Optional[str]
+    bairro: Optional[str]
+    cidade: Optional[str]
+    estado: Optional[str]
+
+    def plano(self, campos: Optional[Iterable[str]] = None) -> Dict:
+        """Dicionário plano (colunas da exportação), só com ``campos`` e nessa ordem se informados."""
+        if campos is None:
+            return dict(zip(COLUNAS_ORDEM, self))
+        return {campo: self[_POSICAO_COLUNA[campo]] for campo in campos}
+
+    def aninhado(self, campos: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Dicionário com o endereço aninhado, como devolvido por /api/gerar-pessoa.
+        Com ``campos``, só as chaves pedidas (e "Endereço" só se alguma dele for pedida).
+        """
+        pedidos = _TODAS_AS_COLUNAS if campos is None else set(campos)
+        dados = {}
+        endereco = {}
+        for coluna, valor in zip(COLUNAS_ORDEM, self):
+            if coluna not in pedidos:
+                continue
+            if coluna.startswith("Endereço - "):
+                endereco[coluna[len("Endereço - "):]] = valor
+            else:
+                dados[coluna] = valor
+        if endereco:
+            dados["Endereço"] = endereco
+        return dados
 
-def gerar_nome() -> str:
+_POSICAO_COLUNA = {coluna: posicao for posicao, coluna in enumerate(COLUNAS_ORDEM)}
+
+def pessoas_do_dataframe(df: pd.DataFrame) -> List[Pessoa]:
+    """Registros Pessoa das linhas de um DataFrame (colunas ausentes ficam None)."""
+    linhas = df.itertuples(index=False, name=None)
+    if list(df.columns) == COLUNAS_ORDEM:
+        return [Pessoa._make(linha) for linha in linhas]
+    posicoes = [_POSICAO_COLUNA[coluna] for coluna in df.columns]
+    pessoas = []
+    for linha in linhas:
+        valores = [None] * len(COLUNAS_ORDEM)
+        for posicao, valor in zip(posicoes, linha):
+            valores[posicao] = valor
+        pessoas.append(Pessoa._make(valores))
+    return pessoas
+
+def criar_rng_numpy(seed: int, *fluxo: int) -> np.random.Generator:
     """
-    Gera um nome completo brasileiro aleatório.
+    Cria um gerador NumPy determinístico para um sub-fluxo da semente.
+    Sub-fluxos distintos (p.ex. por bloco ou por pessoa) são estatisticamente
+    independentes, o que permite gerar partes do mesmo conjunto em paralelo
+    e reproduzi-las de forma idêntica.
     
+    Args:
+        seed: Semente do conjunto de dados
+        *fluxo: Identificação do sub-fluxo (p.ex. índice do bloco)
+        
     Returns:
-        str: Nome completo com 1 a 3 sobrenomes, máximo de 60 caracteres
+        np.random.Generator: Gerador pronto para uso
     """
-    while True:
-        nome_escolhido = random.choice(NOMES)
-        num_sobrenomes = random.randint(1, 3)
-        sobrenomes_escolhidos = random.sample(SOBRENOMES, num_sobrenomes)
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=fluxo)))
+
+def criar_rng(seed: int, *fluxo: int) -> random.Random:
+    """
+    Cria um random.Random determinístico para um sub-fluxo da semente
+    (mesma derivação de criar_rng_numpy).
+    
+    Args:
+        seed: Semente do conjunto de dados
+        *fluxo: Identificação do sub-fluxo (p.ex. índice da pessoa)
         
-        nome_completo_partes = [nome_escolhido] + sobrenomes_escolhidos
-        nome_gerado = " ".join(nome_completo_partes)
+    Returns:
+        random.Random: Gerador pronto para uso
+    """
+    estado = np.random.SeedSequence(seed, spawn_key=fluxo).generate_state(4)
+    return random.Random(int.from_bytes(estado.tobytes(), 'little'))
+
+@lru_cache(maxsize=None)
+def obter_tabela_nomes() -> nomes.TabelaNomes:
+    """
+    Tabela de nomes em uso, montada uma vez por processo a partir dos
+    arquivos empacotados em dados/ (ou de NOMES_ARQUIVO/SOBRENOMES_ARQUIVO).
+    
+    Returns:
+        nomes.TabelaNomes: Tabela pronta para sorteio
+    """
+    return nomes.carregar_tabela_nomes(
+        NOMES_ARQUIVO or None, SOBRENOMES_ARQUIVO or None,
+        provedores_email=PROVEDORES_EMAIL, max_tamanho=MAX_NAME_LENGTH,
+        prob_nome_composto=PROB_NOME_COMPOSTO,
+    )
+
+def gerar_nome(rng=random, sexo: Optional[str] = None) -> str:
+    """
+    Gera um nome completo brasileiro aleatório, com prenomes sorteados pela
+    frequência real e coerentes com o sexo.
+    
+    Args:
+        rng: Fonte de aleatoriedade (random.Random ou o módulo random)
+        sexo: 'F' ou 'M' para restringir o prenome (qualquer se None)
         
-        if len(nome_gerado) <= MAX_NAME_LENGTH:
-            return nome_gerado
+    Returns:
+        str: Nome completo com 1 a 3 sobrenomes, máximo de 60 caracteres
+    """
+    return obter_tabela_nomes().sortear_nome(rng, sexo)
 
-def gerar_cpf() -> str:
+def completar_cpf(base: str) -> str:
     """
-    Gera um CPF válido brasileiro seguindo o algoritmo de validação.
+    Acrescenta os dígitos verificadores a uma base de 9 dígitos.
     
+    Args:
+        base: Nove primeiros dígitos do CPF
+        
     Returns:
         str: CPF com 11 dígitos (sem formatação)
     """
-    cpf_digits = [random.randint(0, 9) for _ in range(9)]
+    cpf_digits = [int(digito) for digito in base]
     
     # Calcula o primeiro dígito verificador (DV1)
     dv1_sum = sum(cpf_digits[i] * (10 - i) for i in range(9))
@@ -72,10 +210,94 @@ def gerar_cpf() -> str:
     
     return ''.join(map(str, cpf_digits))
 
-def gerar_data_nascimento() -> str:
+def gerar_cpf(rng=random) -> str:
+    """
+    Gera um CPF válido brasileiro seguindo o algoritmo de validação.
+    
+    Args:
+        rng: Fonte de aleatoriedade (random.Random ou o módulo random)
+        
+    Returns:
+        str: CPF com 11 dígitos (sem formatação)
+    """
+    return completar_cpf(''.join(str(rng.randint(0, 9)) for _ in range(9)))
+
+# Situações possíveis de um CPF validado, na ordem dos códigos de _situacao_cpfs
+MENSAGENS_CPF = (
+    'CPF válido',
+    'CPF deve conter 11 dígitos numéricos',
+    'CPF inválido (todos os dígitos iguais)',
+    'CPF inválido',
+)
+_PESOS_DV1 = np.arange(10, 1, -1)
+_PESOS_DV2 = np.arange(11, 1, -1)
+
+def _situacao_cpfs(cpfs: List[str]) -> np.ndarray:
+    """
+    Calcula, de uma vez, a situação de cada CPF (índice em MENSAGENS_CPF).
+    Os dígitos verificadores são conferidos sobre uma matriz N x 11.
+    """
+    situacao = np.full(len(cpfs), 1, dtype=np.int8)
+    bem_formados = [
+        i for i, cpf in enumerate(cpfs)
+        if len(cpf) == 11 and cpf.isascii() and cpf.isdigit()
+    ]
+    if not bem_formados:
+        return situacao
+    
+    texto = ''.join(cpfs[i] for i in bem_formados).encode('ascii')
+    digitos = (np.frombuffer(texto, dtype=np.uint8).reshape(-1, 11) - ord('0')).astype(np.int64)
+    
+    resto = (digitos[:, :9] @ _PESOS_DV1) % 11
+    dv1 = np.where(resto < 2, 0, 11 - resto)
+    resto = (digitos[:, :10] @ _PESOS_DV2) % 11
+    dv2 = np.where(resto < 2, 0, 11 - resto)
+    
+    repetidos = (digitos == digitos[:, :1]).all(axis=1)
+    corretos = (digitos[:, 9] == dv1) & (digitos[:, 10] == dv2)
+    situacao[bem_formados] = np.where(repetidos, 2, np.where(corretos, 0, 3))
+    return situacao
+
+def validar_cpfs(cpfs: Iterable[str]) -> List[Dict]:
+    """
+    Valida vários CPFs (com ou sem pontuação) de uma só vez.
+    
+    Args:
+        cpfs: CPFs a validar; itens que não são texto são inválidos
+        
+    Returns:
+        List: Para cada CPF, dicionário com 'cpf', 'valido' e 'mensagem'
+    """
+    cpfs = list(cpfs)
+    limpos = [
+        cpf.strip().replace('.', '').replace('-', '') if isinstance(cpf, str) else ''
+        for cpf in cpfs
+    ]
+    situacao = _situacao_cpfs(limpos)
+    return [
+        {'cpf': cpf, 'valido': codigo == 0, 'mensagem': MENSAGENS_CPF[codigo]}
+        for cpf, codigo in zip(cpfs, situacao.tolist())
+    ]
+
+def validar_cpf(cpf: str) -> Dict:
+    """
+    Valida um CPF (com ou sem pontuação).
+    
+    Args:
+        cpf: CPF a validar
+        
+    Returns:
+        Dict: 'cpf', 'valido' e 'mensagem'
+    """
+    return validar_cpfs([cpf])[0]
+
+def gerar_data_nascimento(rng=random) -> str:
     """
     Gera uma data de nascimento aleatória para uma pessoa entre 18 e 80 anos.
     
+    Args:
+        rng: Fonte de aleatoriedade (random.Random ou o módulo random)
+        
     Returns:
         str: Data no formato DD/MM/YYYY
     """
@@ -87,56 +309,41 @@ def gerar_data_nascimento() -> str:
     
     # Gera uma data aleatória dentro do intervalo
     time_between_dates = latest_birth_date - earliest_birth_date
-    random_number_of_days = random.randrange(time_between_dates.days)
+    random_number_of_days = rng.randrange(time_between_dates.days)
     random_date = earliest_birth_date + datetime.timedelta(days=random_number_of_days)
     
     return random_date.strftime('%d/%m/%Y')
 
-def gerar_email() -> str:
+def gerar_email(rng=random, numero: Optional[int] = None) -> str:
     """
     Gera um endereço de email aleatório.
     
+    Args:
+        rng: Fonte de aleatoriedade (random.Random ou o módulo random)
+        numero: Número que substitui o sorteado nos modelos; números
+            distintos garantem e-mails distintos (modo único)
+        
     Returns:
         str: Endereço de email válido
     """
-    nomes_lower = [nome.lower() for nome in NOMES]
-    sobrenomes_lower = [sobrenome.lower() for sobrenome in SOBRENOMES]
-    
-    local_part_options = [
-        f"{random.choice(nomes_lower)}{random.randint(1, 99)}",
-        f"{random.choice(nomes_lower)}.{random.choice(sobrenomes_lower)}",
-        f"{random.choice(nomes_lower)}{random.choice(sobrenomes_lower)[0]}{random.randint(10, 99)}",
-        f"{random.choice(sobrenomes_lower)}{random.choice(nomes_lower)[0]}{random.randint(1, 99)}"
-    ]
-    
-    local_part = random.choice(local_part_options).replace(' ', '').lower()
-    provedor = random.choice(PROVEDORES_EMAIL)
-    
-    return f"{local_part}@{provedor}"
+    return obter_tabela_nomes().sortear_email(rng, numero)
 
-def gerar_celular() -> str:
+def gerar_celular(rng=random) -> str:
     """
     Gera um número de celular brasileiro válido (formato com 11 dígitos).
     
+    Args:
+        rng: Fonte de aleatoriedade (random.Random ou o módulo random)
+        
     Returns:
         str: Número de celular (sem formatação)
     """
     first_digit = '9'
-    second_digit = str(random.randint(6, 9))
-    remaining_digits = ''.join([str(random.randint(0, 9)) for _ in range(9)])
+    second_digit = str(rng.randint(6, 9))
+    remaining_digits = ''.join([str(rng.randint(0, 9)) for _ in range(9)])
     
     return f"{first_digit}{second_digit}{remaining_digits}"
 
-def _gerar_cep_aleatorio() -> str:
-    """Gera um CEP aleatório de 8 dígitos."""
-    cep_digits = [str(random.randint(0, 9)) for _ in range(8)]
-    return "".join(cep_digits)
-
-@lru_cache(maxsize=1000)
-def buscar_cep_com_cache(cep: str):
-    # código de busca 
-    pass
-
 def _formatar_endereco(cep: str, address: Dict) -> Dict[str, Optional[str]]:
     """
     Formata os dados de endereço em estrutura padronizada.
@@ -166,96 +373,305 @@ def _buscar_endereco_por_cep(cep: str, webservice: WebService) -> Optional[Dict]
         
     Returns:
         Dict ou None: Dados do endereço ou None se falhar
+        
+    Raises:
+        CEPNotFound, InvalidCEP: Quando o serviço afirma que o CEP não existe
     """
+    servico = webservice.name.lower()
+    disjuntor = cep_disjuntor.obter_disjuntor(servico)
+    if not disjuntor.permitir():
+        # Serviço fora do ar: nem tenta (o disjuntor volta a testá-lo depois)
+        metricas.CEP_CONSULTAS.inc(servico, 'desligado')
+        return None
+    inicio = time.perf_counter()
     try:
-        address = get_address_from_cep(cep, webservice=webservice, timeout=REQUEST_TIMEOUT)
+        address = get_address_from_cep(cep, webservice=webservice, timeout=disjuntor.timeout())
+        disjuntor.registrar_sucesso(time.perf_counter() - inicio)
         if address:
+            metricas.CEP_CONSULTAS.inc(servico, 'ok')
             return _formatar_endereco(cep, address)
+        metricas.CEP_CONSULTAS.inc(servico, 'vazio')
+    except (CEPNotFound, InvalidCEP):
+        disjuntor.registrar_sucesso(time.perf_counter() - inicio)
+        metricas.CEP_CONSULTAS.inc(servico, 'inexistente')
+        raise
     except Exception:
         # Captura qualquer erro de conexão, timeout, ou API
-        pass
+        disjuntor.registrar_falha()
+        metricas.CEP_CONSULTAS.inc(servico, 'erro')
+    finally:
+        metricas.CEP_CONSULTA_SEGUNDOS.observar(time.perf_counter() - inicio, servico)
     return None
 
-def gerar_cep_e_endereco() -> Optional[Dict[str, Optional[str]]]:
+def buscar_cep_com_cache(cep: str) -> Optional[Dict]:
     """
-    Gera um CEP aleatório e busca o endereço correspondente usando brazilcep.
-    Tenta múltiplos web services (ViaCEP, ApiCEP, etc.) para maior confiabilidade.
+    Busca o endereço de um CEP passando pelo cache (memória + SQLite).
+    Na falta do cache, consulta ViaCEP e depois ApiCEP. CEPs que os serviços
+    afirmam não existir entram no cache negativo; falhas de rede não são
+    guardadas, para serem tentadas de novo depois.
+    
+    Args:
+        cep: CEP com 8 dígitos
+        
+    Returns:
+        Dict ou None: Dados do endereço ou None se não encontrado
+    """
+    cache = obter_cache_cep()
+    encontrado, endereco = cache.obter(cep)
+    if encontrado:
+        return endereco
+    
+    inexistente = True
+    for webservice in [WebService.VIACEP, WebService.APICEP]:
+        try:
+            endereco = _buscar_endereco_por_cep(cep, webservice)
+        except (CEPNotFound, InvalidCEP):
+            continue
+        if endereco:
+            cache.guardar(cep, endereco)
+            return endereco
+        # Erro de conexão ou timeout: resultado inconclusivo
+        inexistente = False
+    
+    if inexistente:
+        cache.guardar(cep, None)
+    return None
+
+def _gerar_cep_e_endereco_online(rng=random) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Enriquece o endereço consultando ViaCEP/ApiCEP via brazilcep (com cache).
+    Os CEPs candidatos são sorteados do índice offline, que só contém
+    faixas existentes, o que reduz bastante as tentativas perdidas.
     
     Returns:
         Dict ou None: Dicionário com dados do endereço ou None se falhar
     """
-    webservices = [WebService.VIACEP, WebService.APICEP]
+    indice = enderecos.carregar_indice()
     
     for _ in range(MAX_CEP_ATTEMPTS):
-        cep = _gerar_cep_aleatorio()
-        
-        for webservice in webservices:
-            endereco = _buscar_endereco_por_cep(cep, webservice)
-            if endereco:
-                return endereco
+        if not cep_disjuntor.algum_disponivel(SERVICOS_CEP):
+            # Todos os serviços fora do ar: recorre logo ao índice offline
+            break
+        cep = indice.sortear_cep(indice.sortear_cidade(rng), rng)
+        metricas.CEP_TENTATIVAS.inc()
+        endereco = buscar_cep_com_cache(cep)
+        if endereco:
+            return endereco
     
+    metricas.CEP_FALLBACK.inc()
     print(f"⚠️ Aviso: Não foi possível gerar CEP válido após {MAX_CEP_ATTEMPTS} tentativas")
     return None
 
-def gerar_numero_e_complemento() -> Tuple[int, Optional[str]]:
+def gerar_cep_e_endereco(online: Optional[bool] = None, rng=random) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Gera um CEP e o endereço correspondente.
+    Por padrão sorteia do índice offline empacotado (sem rede). No modo
+    online consulta os web services e, se falharem, recorre ao índice offline.
+    
+    Args:
+        online: Força (ou desativa) a consulta online; usa CEP_ONLINE se None
+        rng: Fonte de aleatoriedade (random.Random ou o módulo random)
+        
+    Returns:
+        Dict ou None: Dicionário com dados do endereço
+    """
+    if online is None:
+        online = CEP_ONLINE
+    
+    if online:
+        endereco = _gerar_cep_e_endereco_online(rng)
+        if endereco:
+            return endereco
+    
+    return enderecos.sortear_endereco(rng)
+
+def gerar_enderecos_online(quantidade: int, rng=random) -> List[Dict[str, Optional[str]]]:
+    """
+    Resolve os endereços de um lote inteiro de uma vez, consultando os
+    web services em paralelo (ver cep_async). Cada rodada tenta de novo,
+    com novos CEPs candidatos, apenas os que ficaram sem endereço; os que
+    sobrarem após MAX_CEP_ATTEMPTS rodadas recebem endereço offline.
+    
+    Args:
+        quantidade: Número de endereços
+        rng: Fonte de aleatoriedade para os CEPs candidatos
+        
+    Returns:
+        List[Dict]: Um endereço por pessoa
+    """
+    indice = enderecos.carregar_indice()
+    resultado: List[Optional[Dict]] = [None] * quantidade
+    faltando = list(range(quantidade))
+    
+    for _ in range(MAX_CEP_ATTEMPTS):
+        if not faltando or not cep_disjuntor.algum_disponivel(SERVICOS_CEP):
+            break
+        ceps = [indice.sortear_cep(indice.sortear_cidade(rng), rng) for _ in faltando]
+        metricas.CEP_TENTATIVAS.inc(valor=len(ceps))
+        resolvidos = cep_async.resolver_ceps(ceps)
+        for posicao, endereco in zip(faltando, resolvidos):
+            resultado[posicao] = endereco
+        faltando = [posicao for posicao in faltando if resultado[posicao] is None]
+    
+    if faltando:
+        metricas.CEP_FALLBACK.inc(valor=len(faltando))
+        print(f"⚠️ Aviso: {len(faltando)} endereço(s) sem CEP online após {MAX_CEP_ATTEMPTS} tentativas")
+    for posicao in faltando:
+        resultado[posicao] = indice.sortear_endereco(rng)
+    return resultado
+
+def gerar_numero_e_complemento(rng=random) -> Tuple[int, Optional[str]]:
     """
     Gera número e complemento de endereço aleatórios.
     
+    Args:
+        rng: Fonte de aleatoriedade (random.Random ou o módulo random)
+        
     Returns:
         Tuple: (número do endereço, complemento ou None)
     """
-    numero = random.randint(1, 2000)
+    numero = rng.randint(1, 2000)
     complemento = None
     
-    if random.random() < 0.5:
-        complemento_tipo = random.choice(["APTO", "CASA", "BLOCO", "SALA"])
+    if rng.random() < 0.5:
+        complemento_tipo = rng.choice(["APTO", "CASA", "BLOCO", "SALA"])
         
         if complemento_tipo == "APTO":
-            complemento_valor = str(random.randint(1, 300))
+            complemento_valor = str(rng.randint(1, 300))
         elif complemento_tipo == "CASA":
-            complemento_valor = str(random.randint(1, 5))
+            complemento_valor = str(rng.randint(1, 5))
         elif complemento_tipo == "BLOCO":
-            complemento_valor = random.choice(["A", "B", "C", "D"])
+            complemento_valor = rng.choice(["A", "B", "C", "D"])
         else:  # SALA
-            complemento_valor = str(random.randint(101, 500))
+            complemento_valor = str(rng.randint(101, 500))
         
         complemento = f"{complemento_tipo} {complemento_valor}"
     
     return numero, complemento
 
-def gerar_dados_pessoa() -> Dict:
+def normalizar_campos(campos: Union[None, str, Iterable[str]]) -> Optional[List[str]]:
     """
-    Gera dados completos de uma pessoa fictícia brasileira.
+    Valida uma projeção de campos.
     
+    Args:
+        campos: Lista de colunas ou texto separado por vírgulas (None = todas)
+        
     Returns:
-        Dict: Dicionário com todos os dados da pessoa
-    """
-    nome = gerar_nome()
-    cpf = gerar_cpf()
-    data_nascimento = gerar_data_nascimento()
-    email = gerar_email()
-    celular = gerar_celular()
-    
-    endereco_info = gerar_cep_e_endereco()
-    numero_endereco, complemento_endereco = gerar_numero_e_complemento()
-    
-    dados_pessoa = {
-        "Nome Completo": nome,
-        "CPF": cpf,
-        "Data de Nascimento": data_nascimento,
-        "Email": email,
-        "Celular": celular,
-        "Endereço": {
-            "CEP": endereco_info['cep'] if endereco_info else None,
-            "Logradouro": endereco_info['logradouro'] if endereco_info else None,
-            "Número": numero_endereco,
-            "Complemento": complemento_endereco,
-            "Bairro": endereco_info['bairro'] if endereco_info else None,
-            "Cidade": endereco_info['cidade'] if endereco_info else None,
-            "Estado": endereco_info['estado'] if endereco_info else None
-        }
-    }
-    return dados_pessoa
+        Optional[List[str]]: Campos na ordem pedida, sem repetição (None = todos)
+        
+    Raises:
+        ValueError: Se algum campo não existir ou a lista estiver vazia
+    """
+    if campos is None:
+        return None
+    if isinstance(campos, str):
+        campos = [campo.strip() for campo in campos.split(',') if campo.strip()]
+    campos = list(dict.fromkeys(campos))
+    if not campos:
+        raise ValueError("Informe ao menos um campo")
+    desconhecidos = [campo for campo in campos if campo not in COLUNAS_ORDEM]
+    if desconhecidos:
+        raise ValueError(f"Campos desconhecidos: {', '.join(map(str, desconhecidos))}")
+    return campos
+
+def precisa_endereco(campos: Optional[Iterable[str]]) -> bool:
+    """Indica se a projeção inclui algum campo que depende da consulta de CEP."""
+    return campos is None or any(campo in CAMPOS_ENDERECO_CEP for campo in campos)
+
+def gerar_registro(endereco_info: Optional[Dict] = None, rng=random,
+                   unicos: Optional[unicidade.ValoresUnicos] = None, indice: int = 0,
+                   campos: Optional[Iterable[str]] = None, online: Optional[bool] = None) -> Pessoa:
+    """
+    Gera uma pessoa fictícia brasileira como registro plano (Pessoa).
+    
+    Com ``campos``, só os campos pedidos são gerados (os demais ficam None):
+    o endereço não é consultado se nenhum campo de CEP for pedido. Com rng
+    semeado a pessoa continua reprodutível para a mesma projeção, mas
+    projeções diferentes consomem o rng de forma diferente e não saem
+    iguais entre si.
+    
+    Args:
+        endereco_info: Endereço já resolvido (opcional, p.ex. de gerar_enderecos_online)
+        rng: Fonte de aleatoriedade; um random.Random semeado torna a pessoa reprodutível
+        unicos: Valores únicos do conjunto (modo único, opcional)
+        indice: Índice global da pessoa (usado com ``unicos``)
+        campos: Colunas de ``COLUNAS_ORDEM`` a gerar (None = todas)
+        online: Consulta o CEP online (sem endereco_info); usa CEP_ONLINE se None
+    
+    Returns:
+        Pessoa: Registro com os dados da pessoa
+    """
+    pedidos = _TODAS_AS_COLUNAS if campos is None else set(campos)
+    cronometro = metricas.cronometro(amostrado=True)
+    nome = cpf = data_nascimento = email = celular = None
+    if "Nome Completo" in pedidos:
+        nome = gerar_nome(rng)
+        cronometro.marcar('nome')
+    if "CPF" in pedidos:
+        cpf = gerar_cpf(rng) if unicos is None else completar_cpf(f"{unicos.base_cpf(indice):09d}")
+        cronometro.marcar('cpf')
+    if "Data de Nascimento" in pedidos:
+        data_nascimento = gerar_data_nascimento(rng)
+        cronometro.marcar('data_nascimento')
+    if "Email" in pedidos:
+        email = gerar_email(rng, None if unicos is None else unicos.numero_email(indice))
+        cronometro.marcar('email')
+    if "Celular" in pedidos:
+        celular = gerar_celular(rng) if unicos is None else str(unicos.celular(indice))
+        cronometro.marcar('celular')
+    
+    if endereco_info is None and precisa_endereco(campos):
+        endereco_info = gerar_cep_e_endereco(online, rng)
+        cronometro.marcar('endereco')
+    numero_endereco = complemento_endereco = None
+    if any(campo in pedidos for campo in CAMPOS_NUMERO_COMPLEMENTO):
+        numero_endereco, complemento_endereco = gerar_numero_e_complemento(rng)
+        cronometro.marcar('numero_complemento')
+    
+    if not endereco_info:
+        endereco_info = _ENDERECO_VAZIO
+    return Pessoa(nome, cpf, data_nascimento, email, celular, endereco_info['cep'], endereco_info['logradouro'],
+                  numero_endereco, complemento_endereco, endereco_info['bairro'], endereco_info['cidade'],
+                  endereco_info['estado'])
+
+def gerar_dados_pessoa(endereco_info: Optional[Dict] = None, rng=random,
+                       unicos: Optional[unicidade.ValoresUnicos] = None, indice: int = 0,
+                       campos: Optional[Iterable[str]] = None, online: Optional[bool] = None) -> Dict:
+    """
+    Gera dados completos de uma pessoa fictícia brasileira, com o endereço
+    aninhado (a visão JSON de gerar_registro; ver Pessoa.aninhado).
+    
+    Args:
+        Os mesmos de gerar_registro
+    
+    Returns:
+        Dict: Dicionário com os dados da pessoa
+    """
+    return gerar_registro(endereco_info, rng, unicos, indice, campos, online).aninhado(campos)
+
+def gerar_pessoa(indice: int, seed: int, unico: bool = False,
+                 campos: Union[None, str, Iterable[str]] = None) -> Pessoa:
+    """
+    Gera a pessoa de índice ``indice`` do conjunto virtual da semente, sem
+    gerar as anteriores: só o bloco lógico que a contém é gerado (ver
+    gerador_lote), e no modo único os valores vêm da permutação do índice.
+    O endereço vem sempre do índice offline, para que a pessoa não dependa
+    da rede. É a mesma pessoa de gerar_multiplas_pessoas(seed=seed), das
+    exportações e dos jobs, em qualquer fatia que contenha o índice.
+    
+    Args:
+        indice: Posição da pessoa no conjunto (0 em diante)
+        seed: Semente do conjunto
+        unico: CPF, e-mail e celular sem repetição no conjunto
+        campos: Colunas a gerar (None = todas; as demais ficam None)
+    
+    Returns:
+        Pessoa: Registro plano da pessoa (ver Pessoa.plano e Pessoa.aninhado)
+    """
+    if indice < 0:
+        raise ValueError("O índice deve ser maior ou igual a zero")
+    return gerar_multiplas_pessoas(1, verbose=False, seed=seed, inicio=indice, unico=unico,
+                                   campos=campos, compacto=True)[0]
 
 def achatar_dicionario(dados: Dict) -> Dict:
     """
@@ -298,48 +714,88 @@ def obter_diretorio_saida() -> Path:
     
     return output_dir
 
-def gerar_multiplas_pessoas(quantidade: int) -> List[Dict]:
+def gerar_multiplas_pessoas(quantidade: int, verbose: bool = True, seed: Optional[int] = None,
+                            inicio: int = 0, unico: bool = False,
+                            campos: Union[None, str, Iterable[str]] = None,
+                            compacto: bool = False) -> Union[List[Dict], List[Pessoa]]:
     """
     Gera uma lista com múltiplas pessoas.
+    No modo online os endereços do lote são resolvidos em paralelo antes.
+    Com seed (ou unico), as pessoas são as linhas ``inicio`` em diante do
+    conjunto da semente (gerador_lote.gerar_faixa), as mesmas das
+    exportações, do fluxo e dos jobs; os endereços vêm do índice offline.
     
     Args:
         quantidade: Número de pessoas a gerar
+        verbose: Exibe o progresso no console
+        seed: Semente para geração reprodutível (opcional)
+        inicio: Índice da primeira pessoa dentro do conjunto semeado
+        unico: Garante CPF, e-mail e celular sem repetição no conjunto da
+            semente (sorteia uma semente se None)
+        campos: Colunas a gerar, na ordem das chaves de cada pessoa (None = todas);
+            sem campos de CEP, os endereços não são consultados
+        compacto: Devolve registros Pessoa (tuplas, com None nos campos não
+            pedidos) em vez de dicionários planos; bem mais leve para lotes
+            que vão direto para um DataFrame
         
     Returns:
-        List[Dict]: Lista com dados de todas as pessoas
+        List[Dict] ou List[Pessoa]: Lista com dados de todas as pessoas
     """
-    print(f"\n🔄 Gerando {quantidade} pessoa(s)...\n")
+    campos = normalizar_campos(campos)
+    if verbose:
+        print(f"\n🔄 Gerando {quantidade} pessoa(s)...\n")
+    
+    if unico and seed is None:
+        seed = secrets.randbits(64)
+    if seed is not None:
+        df = gerador_lote.gerar_faixa(seed, inicio, quantidade, unico=unico, campos=campos)
+        pessoas = pessoas_do_dataframe(df)
+        if not compacto:
+            pessoas = [pessoa.plano(campos) for pessoa in pessoas]
+        if verbose:
+            print(f"\n✅ {quantidade} pessoa(s) gerada(s) com sucesso!\n")
+        return pessoas
+    
     pessoas = []
+    cronometro = metricas.cronometro()
+    if CEP_ONLINE and precisa_endereco(campos):
+        enderecos_lote = gerar_enderecos_online(quantidade)
+        cronometro.marcar('enderecos_online')
+    else:
+        enderecos_lote = [None] * quantidade
     
-    for i in range(quantidade):
-        print(f"   Gerando pessoa {i+1}/{quantidade}...")
-        pessoa = gerar_dados_pessoa()
-        pessoas.append(achatar_dicionario(pessoa))
+    for i, endereco_info in enumerate(enderecos_lote):
+        if verbose:
+            print(f"   Gerando pessoa {i+1}/{quantidade}...")
+        pessoa = gerar_registro(endereco_info, campos=campos)
+        pessoas.append(pessoa if compacto else pessoa.plano(campos))
+    metricas.PESSOAS.inc('registro', valor=quantidade)
     
-    print(f"\n✅ {quantidade} pessoa(s) gerada(s) com sucesso!\n")
+    if verbose:
+        print(f"\n✅ {quantidade} pessoa(s) gerada(s) com sucesso!\n")
     return pessoas
 
-def exportar_para_excel(pessoas: List[Dict], nome_arquivo: str = None) -> str:
+def exportar_para_excel(pessoas: Union[List[Dict], List[Pessoa], pd.DataFrame, Iterable[pd.DataFrame]],
+                        nome_arquivo: str = None) -> str:
     """
-    Exporta lista de pessoas para arquivo Excel.
+    Exporta pessoas para arquivo Excel.
+    Usa o escritor write-only (exportacao.escrever_excel): passando um
+    iterável de DataFrames (p.ex. gerador_lote.iterar_lotes), as linhas vão
+    para o disco à medida que são geradas e a memória fica constante.
     
     Args:
-        pessoas: Lista com dados das pessoas
+        pessoas: Lista de pessoas (dicionários planos ou Pessoa), DataFrame ou iterável de DataFrames
         nome_arquivo: Nome do arquivo de saída (opcional, gera com timestamp se None)
         
     Returns:
         str: Caminho completo do arquivo gerado
     """
-    df = pd.DataFrame(pessoas)
-    
-    # Reordena as colunas para melhor visualização
-    colunas_ordem = [
-        "Nome Completo", "CPF", "Data de Nascimento", "Email", "Celular",
-        "Endereço - CEP", "Endereço - Logradouro", "Endereço - Número", 
-        "Endereço - Complemento", "Endereço - Bairro", "Endereço - Cidade", 
-        "Endereço - Estado"
-    ]
-    df = df[colunas_ordem]
+    if isinstance(pessoas, pd.DataFrame):
+        blocos = [pessoas]
+    elif isinstance(pessoas, list):
+        blocos = [pd.DataFrame(pessoas, columns=COLUNAS_ORDEM)]
+    else:
+        blocos = pessoas
     
     # Obtém o diretório de saída
     output_dir = obter_diretorio_saida()
@@ -351,31 +807,26 @@ def exportar_para_excel(pessoas: List[Dict], nome_arquivo: str = None) -> str:
     
     # Salva o arquivo no diretório de saída
     caminho = output_dir / nome_arquivo
-    df.to_excel(caminho, index=False, engine='openpyxl')
+    exportacao.escrever('xlsx', blocos, caminho)
     
     return str(caminho)
 
-def exportar_para_csv(pessoas: List[Dict], nome_arquivo: str = None) -> str:
+def exportar_para_csv(pessoas: Union[List[Dict], List[Pessoa], pd.DataFrame], nome_arquivo: str = None) -> str:
     """
     Exporta lista de pessoas para arquivo CSV.
     
     Args:
-        pessoas: Lista com dados das pessoas
+        pessoas: Lista de pessoas (dicionários planos ou Pessoa) ou DataFrame já montado
         nome_arquivo: Nome do arquivo de saída (opcional, gera com timestamp se None)
         
     Returns:
         str: Caminho completo do arquivo gerado
     """
-    df = pd.DataFrame(pessoas)
-    
-    # Reordena as colunas para melhor visualização
-    colunas_ordem = [
-        "Nome Completo", "CPF", "Data de Nascimento", "Email", "Celular",
-        "Endereço - CEP", "Endereço - Logradouro", "Endereço - Número", 
-        "Endereço - Complemento", "Endereço - Bairro", "Endereço - Cidade", 
-        "Endereço - Estado"
-    ]
-    df = df[colunas_ordem]
+    if isinstance(pessoas, pd.DataFrame):
+        # Reordena as colunas para melhor visualização
+        df = pessoas[COLUNAS_ORDEM]
+    else:
+        df = pd.DataFrame(pessoas, columns=COLUNAS_ORDEM)
     
     # Obtém o diretório de saída
     output_dir = obter_diretorio_saida()
@@ -387,7 +838,7 @@ def exportar_para_csv(pessoas: List[Dict], nome_arquivo: str = None) -> str:
     
     # Salva o arquivo no diretório de saída
     caminho = output_dir / nome_arquivo
-    df.to_csv(caminho, index=False, encoding='utf-8-sig')
+    exportacao.escrever('csv', [df], caminho)
     
     return str(caminho)
 
@@ -404,8 +855,203 @@ def exibir_menu() -> None:
     print("  [0] Sair")
     print("\n" + "="*60)
 
+def dividir_em_partes(quantidade: int, tamanho_lote: int, partes: int) -> List[Tuple[int, int]]:
+    """
+    Divide a geração em faixas contíguas de blocos, uma por worker.
+    
+    Args:
+        quantidade: Número total de pessoas
+        tamanho_lote: Linhas por bloco
+        partes: Número de workers
+        
+    Returns:
+        List[Tuple]: (bloco_inicial, quantidade) de cada parte não vazia
+    """
+    total_blocos = math.ceil(quantidade / tamanho_lote)
+    base, extra = divmod(total_blocos, partes)
+    resultado = []
+    bloco = 0
+    for parte in range(partes):
+        blocos_da_parte = base + (1 if parte < extra else 0)
+        if blocos_da_parte == 0:
+            continue
+        linhas = min(blocos_da_parte * tamanho_lote, quantidade - bloco * tamanho_lote)
+        resultado.append((bloco, linhas))
+        bloco += blocos_da_parte
+    return resultado
+
+def _gerar_parte(tarefa: Tuple) -> Tuple[str, int, float, Dict]:
+    """
+    Gera e grava um arquivo parcial (executado em um processo do pool).
+    
+    Args:
+        tarefa: (bloco_inicial, quantidade, tamanho_lote, seed, formato, caminho, opcoes, unico,
+            definicao_esquema), com a projeção de campos, se houver, em ``opcoes['campos']``
+        
+    Returns:
+        Tuple: (caminho, linhas, segundos, métricas desta parte)
+    """
+    bloco_inicial, quantidade, tamanho_lote, seed, formato, caminho, opcoes, unico, definicao_esquema = tarefa
+    # O processo pode ser reaproveitado entre partes: cada uma devolve só as suas métricas
+    metricas.REGISTRO.zerar()
+    inicio = time.perf_counter()
+    if definicao_esquema is not None:
+        blocos = esquema.compilar(definicao_esquema).iterar_lotes(
+            quantidade, tamanho_lote, seed=seed, bloco_inicial=bloco_inicial, unico=unico)
+    else:
+        blocos = gerador_lote.iterar_lotes(quantidade, tamanho_lote, seed=seed, bloco_inicial=bloco_inicial,
+                                           unico=unico, campos=opcoes.get('campos'))
+    estatisticas = exportacao.escrever(formato, blocos, caminho, **opcoes)
+    return caminho, estatisticas['linhas'], time.perf_counter() - inicio, metricas.REGISTRO.instantaneo()
+
+def gerar_em_paralelo(quantidade: int, workers: int, formato: str, diretorio: Path,
+                      seed: Optional[int] = None, tamanho_lote: Optional[int] = None,
+                      mesclar: bool = False, opcoes: Optional[Dict] = None,
+                      unico: bool = False, definicao_esquema: Optional[Dict] = None) -> List[str]:
+    """
+    Gera o conjunto dividido entre processos, um arquivo parcial por worker.
+    As linhas são as do conjunto da semente (ver gerador_lote), então o
+    resultado não depende do número de workers nem do tamanho dos blocos.
+    
+    Args:
+        quantidade: Número total de pessoas
+        workers: Número de processos
+        formato: Um de exportacao.FORMATOS (csv, xlsx, parquet, arrow, feather)
+        diretorio: Diretório de saída
+        seed: Semente (gera uma aleatória se None)
+        tamanho_lote: Linhas por bloco (padrão: gerador_lote.TAMANHO_LOTE_PADRAO)
+        mesclar: Junta as partes em um único arquivo ao final
+        opcoes: Opções do escritor (p.ex. {'tamanho_row_group': N} no Parquet ou
+            {'campos': [...]}, que também limita o que é gerado)
+        unico: CPF, e-mail e celular sem repetição em todas as partes
+        definicao_esquema: Esquema declarativo das colunas (ver esquema.py; opcional)
+        
+    Returns:
+        List[str]: Arquivos gerados
+    """
+    if formato not in exportacao.FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (use {', '.join(exportacao.FORMATOS)})")
+    if seed is None:
+        seed = secrets.randbits(64)
+    tamanho_lote = tamanho_lote or gerador_lote.TAMANHO_LOTE_PADRAO
+    opcoes = dict(opcoes or {})
+    if definicao_esquema is not None:
+        # Valida antes de abrir o pool; cada worker compila de novo a definição
+        opcoes.update(esquema.compilar(definicao_esquema).opcoes_exportacao(formato))
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = f"dados_gerados_{timestamp}"
+    tarefas = [
+        (bloco_inicial, linhas, tamanho_lote, seed, formato,
+         str(diretorio / f"{base}_parte{numero:03d}.{formato}"), opcoes, unico, definicao_esquema)
+        for numero, (bloco_inicial, linhas) in enumerate(dividir_em_partes(quantidade, tamanho_lote, workers))
+    ]
+    
+    print(f"\n🔄 Gerando {quantidade} pessoa(s) em {len(tarefas)} parte(s) (seed={seed})...\n")
+    inicio = time.perf_counter()
+    gerador_lote.preaquecer()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        resultados = list(executor.map(_gerar_parte, tarefas))
+    for caminho, linhas, segundos, instantaneo in resultados:
+        print(f"   {caminho}: {linhas} linhas em {segundos:.1f}s")
+        metricas.REGISTRO.mesclar(instantaneo)
+    
+    arquivos = [caminho for caminho, _, _, _ in resultados]
+    if mesclar and len(arquivos) > 1:
+        destino = diretorio / f"{base}.{formato}"
+        exportacao.mesclar_partes(formato, [Path(a) for a in arquivos], destino, **opcoes)
+        for arquivo in arquivos:
+            os.remove(arquivo)
+        arquivos = [str(destino)]
+    elif mesclar:
+        destino = diretorio / f"{base}.{formato}"
+        os.replace(arquivos[0], destino)
+        arquivos = [str(destino)]
+    
+    decorrido = time.perf_counter() - inicio
+    print(f"\n✅ {quantidade} pessoa(s) em {decorrido:.1f}s ({quantidade / decorrido:,.0f} linhas/s)\n")
+    return arquivos
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Cria o parser da linha de comando não interativa."""
+    parser = argparse.ArgumentParser(description="Gerador de dados pessoais brasileiros")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    
+    generate = subcomandos.add_parser("generate", help="Gera pessoas em paralelo e grava em arquivos")
+    generate.add_argument("--count", type=int, required=True, help="Número de pessoas")
+    generate.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Número de processos")
+    generate.add_argument("--format", choices=exportacao.FORMATOS, default="csv", help="Formato de saída")
+    generate.add_argument("--out", type=Path, default=None, help="Diretório de saída (padrão: dados_gerados/)")
+    generate.add_argument("--seed", type=int, default=None, help="Semente para geração reprodutível")
+    generate.add_argument("--chunk-size", type=int, default=gerador_lote.TAMANHO_LOTE_PADRAO,
+                          help="Linhas por bloco")
+    generate.add_argument("--merge", action="store_true", help="Junta as partes em um único arquivo")
+    generate.add_argument("--unique", action="store_true",
+                          help="CPF, e-mail e celular sem repetição em todo o conjunto")
+    generate.add_argument("--metrics", action="store_true",
+                          help="Exibe ao final o tempo gasto em cada etapa")
+    generate.add_argument("--fields", default=None,
+                          help='Só estas colunas, separadas por vírgula (p.ex. "Nome Completo,CPF")')
+    generate.add_argument("--schema", type=Path, default=None,
+                          help="Esquema das colunas em JSON ou YAML (veja esquemas/)")
+    generate.add_argument("--row-group-size", type=int, default=None,
+                          help="Linhas por row group (apenas parquet)")
+    return parser
+
+def executar_cli(argv: List[str]) -> int:
+    """
+    Executa a linha de comando não interativa.
+    
+    Args:
+        argv: Argumentos (sem o nome do programa)
+        
+    Returns:
+        int: Código de saída
+    """
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if args.count <= 0 or args.workers <= 0 or args.chunk_size <= 0:
+        parser.error("--count, --workers e --chunk-size devem ser maiores que zero")
+    if args.seed is not None and args.seed < 0:
+        parser.error("--seed deve ser um inteiro não negativo")
+    
+    if args.unique and args.count > unicidade.MAX_UNICOS:
+        parser.error(f"--unique comporta no máximo {unicidade.MAX_UNICOS} pessoas")
+    
+    opcoes = {}
+    if args.row_group_size is not None:
+        if args.format != "parquet" or args.row_group_size <= 0:
+            parser.error("--row-group-size exige --format parquet e um valor maior que zero")
+        opcoes["tamanho_row_group"] = args.row_group_size
+    if args.fields is not None:
+        if args.schema is not None:
+            parser.error("use --fields ou --schema, não ambos")
+        try:
+            opcoes["campos"] = normalizar_campos(args.fields)
+        except ValueError as e:
+            parser.error(f"--fields: {e}")
+    definicao_esquema = None
+    if args.schema is not None:
+        try:
+            definicao_esquema = esquema.compilar(args.schema).definicao
+        except (OSError, ValueError) as e:
+            parser.error(f"--schema: {e}")
+    
+    gerar_em_paralelo(args.count, args.workers, args.format, args.out or obter_diretorio_saida(),
+                      seed=args.seed, tamanho_lote=args.chunk_size, mesclar=args.merge, opcoes=opcoes,
+                      unico=args.unique, definicao_esquema=definicao_esquema)
+    if args.metrics:
+        print("📈 Métricas:")
+        print(metricas.resumo())
+    return 0
+
 def main():
     """Função principal para executar o gerador."""
+    if len(sys.argv) > 1:
+        sys.exit(executar_cli(sys.argv[1:]))
+    
     while True:
         exibir_menu()
         
@@ -432,16 +1078,26 @@ def main():
                         input("\n⏎ Pressione ENTER para continuar...")
                         continue
                     
-                    if quantidade > 1000:
+                    if quantidade > 1000 and CEP_ONLINE:
                         confirma = input(f"\n⚠️  Você vai gerar {quantidade} pessoas. Isso pode demorar. Continuar? (s/n): ")
                         if confirma.lower() != 's':
                             continue
                     
-                    pessoas = gerar_multiplas_pessoas(quantidade)
+                    if opcao == "2":
+                        # Só Excel: gera e grava em blocos, com memória constante
+                        pessoas = gerador_lote.iterar_lotes(quantidade)
+                    elif CEP_ONLINE:
+                        pessoas = gerar_multiplas_pessoas(quantidade, compacto=True)
+                    else:
+                        # Sem consulta online, o lote vetorizado gera tudo de uma vez
+                        pessoas = gerador_lote.gerar_lote(quantidade)
                     
                     if opcao == "2" or opcao == "4":
                         arquivo_excel = exportar_para_excel(pessoas)
                         print(f"\n✅ Arquivo Excel criado: {arquivo_excel}")
+                        pico = exportacao.pico_memoria_mb()
+                        if pico is not None:
+                            print(f"   Pico de memória: {pico:.0f} MB")
                     
                     if opcao == "3" or opcao == "4":
                         arquivo_csv = exportar_para_csv(pessoas)
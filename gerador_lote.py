@@ -0,0 +1,513 @@
+"""
+Gerador vetorizado em lote (NumPy).
+
+Gera N pessoas de uma vez, coluna a coluna, em vez de montar um dicionário
+por pessoa. Os valores textuais vêm de tabelas pré-computadas (nomes
+completos, e-mails, datas, complementos, logradouros) indexadas por arrays
+de inteiros aleatórios; CPF, celular e CEP são montados como matrizes de
+dígitos. Usa apenas o índice offline de endereços.
+
+É também a definição do conjunto de uma semente: a pessoa de índice i está
+no bloco lógico ``i // BLOCO_SEMENTE``, gerado pelo sub-fluxo
+``criar_rng_numpy(seed, bloco)``. Os blocos lógicos são fatiados ou juntados
+no tamanho de bloco pedido por quem consome (exportação, fluxo, jobs,
+CLI, paginação), então a mesma semente dá as mesmas linhas em qualquer
+caminho e com qualquer configuração de tamanho de bloco.
+"""
+
+import datetime
+import itertools
+import secrets
+from functools import lru_cache
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import enderecos
+import gerador
+import metricas
+import unicidade
+
+TAMANHO_LOTE_PADRAO = 100_000
+# Linhas por sub-fluxo da semente. Faz parte da definição dos dados: mudá-lo
+# muda o conjunto de toda semente (unicidade.MAX_UNICOS é múltiplo dele)
+BLOCO_SEMENTE = 5_000
+
+# Pesos dos dígitos verificadores do CPF
+_PESOS_DV1 = np.arange(10, 1, -1)
+_PESOS_DV2 = np.arange(11, 1, -1)
+
+
+def _digitos_para_texto(digitos: np.ndarray) -> np.ndarray:
+    """
+    Converte uma matriz (N, k) de dígitos 0-9 em um array de strings de k caracteres.
+
+    Args:
+        digitos: Matriz de inteiros entre 0 e 9
+
+    Returns:
+        np.ndarray: Array de objetos ``str``
+    """
+    largura = digitos.shape[1]
+    ascii_ = np.ascontiguousarray(digitos.astype(np.uint8) + ord('0'))
+    return ascii_.view(f"S{largura}").ravel().astype(f"U{largura}").astype(object)
+
+
+def _inteiros_para_digitos(valores: np.ndarray, largura: int) -> np.ndarray:
+    """Decompõe inteiros não negativos em uma matriz (N, largura) de dígitos."""
+    potencias = 10 ** np.arange(largura - 1, -1, -1, dtype=np.int64)
+    return (valores.astype(np.int64)[:, None] // potencias) % 10
+
+
+def _sortear_em_blocos(rng: np.random.Generator, inicios: np.ndarray, tamanhos: np.ndarray,
+                       blocos: np.ndarray) -> np.ndarray:
+    """Sorteia, para cada linha, um índice uniforme dentro do bloco indicado."""
+    return inicios[blocos] + (rng.random(len(blocos)) * tamanhos[blocos]).astype(np.int64)
+
+
+@lru_cache(maxsize=None)
+def _tabela_nomes() -> dict:
+    """
+    Arrays NumPy da tabela de nomes em uso (``gerador.obter_tabela_nomes``).
+    Nomes completos e e-mails são montados juntando partes prontas, sem
+    pré-gerar o produto de todas as combinações, e os sorteios usam as
+    tabelas de alias: o custo não depende do tamanho das listas.
+    """
+    tabela = gerador.obter_tabela_nomes()
+
+    def alias(tabela_alias):
+        return (np.array(tabela_alias.probabilidades, dtype=np.float64),
+                np.array(tabela_alias.aliases, dtype=np.int64))
+
+    sexos = list(tabela.alias_por_sexo)
+    nomes_email = np.array(tabela.nomes_email, dtype=object)
+    return {
+        "nomes": np.array(tabela.nomes, dtype=object),
+        "segundos_nomes": np.array([" " + nome for nome in tabela.nomes], dtype=object),
+        "sobrenomes": np.array([" " + s for s in tabela.sobrenomes], dtype=object),
+        "tamanhos_nomes": np.array(tabela.tamanhos_nomes, dtype=np.int64),
+        "tamanhos_sobrenomes": np.array(tabela.tamanhos_sobrenomes, dtype=np.int64) + 1,
+        "alias_nomes": alias(tabela.alias_nomes),
+        "alias_sobrenomes": alias(tabela.alias_sobrenomes),
+        # Código do sexo de cada prenome e, por código, os prenomes e o alias daquele sexo
+        "sexo_nomes": np.array([sexos.index(s) if s in sexos else -1 for s in tabela.sexos_nomes]),
+        "prenomes_por_sexo": [
+            (np.array(tabela.indices_por_sexo[sexo], dtype=np.int64), alias(tabela.alias_por_sexo[sexo]))
+            for sexo in sexos
+        ],
+        "prob_nome_composto": tabela.prob_nome_composto,
+        "max_tamanho": tabela.max_tamanho,
+        "nomes_email": nomes_email,
+        "sobrenomes_email": np.array(tabela.sobrenomes_email, dtype=object),
+        "nomes_ponto": nomes_email + ".",
+        "iniciais_nomes": np.array([nome[0] for nome in tabela.nomes_email], dtype=object),
+        "iniciais_sobrenomes": np.array([s[0] for s in tabela.sobrenomes_email], dtype=object),
+        "provedores": np.array(["@" + p for p in tabela.provedores_email], dtype=object),
+        "numeros": np.array([str(i) for i in range(100)], dtype=object),
+    }
+
+
+def _sortear_alias(rng: np.random.Generator, alias, n: int) -> np.ndarray:
+    """Sorteia ``n`` índices pela tabela de alias (probabilidades, aliases)."""
+    probabilidades, aliases = alias
+    u = rng.random(n) * len(probabilidades)
+    indices = u.astype(np.int64)
+    return np.where(u - indices < probabilidades[indices], indices, aliases[indices])
+
+
+def _sortear_sobrenomes_distintos(rng: np.random.Generator, t: dict, quantidade: np.ndarray) -> np.ndarray:
+    """
+    Sorteia três sobrenomes por linha; os ``quantidade`` primeiros de cada
+    linha são distintos (linhas com repetição são sorteadas de novo).
+    """
+    n = len(quantidade)
+    sobrenomes = _sortear_alias(rng, t["alias_sobrenomes"], 3 * n).reshape(n, 3)
+    while True:
+        s0, s1, s2 = sobrenomes.T
+        repetidos = np.flatnonzero(((s0 == s1) & (quantidade >= 2))
+                                   | (((s2 == s0) | (s2 == s1)) & (quantidade == 3)))
+        if not len(repetidos):
+            return sobrenomes
+        sobrenomes[repetidos] = _sortear_alias(rng, t["alias_sobrenomes"], 3 * len(repetidos)).reshape(-1, 3)
+
+
+def _sortear_partes_nome(rng: np.random.Generator, t: dict, n: int):
+    """
+    Sorteia prenome, segundo prenome do mesmo sexo (-1 se não houver),
+    quantidade de sobrenomes (1 a 3) e os sobrenomes de cada linha.
+    """
+    nome = _sortear_alias(rng, t["alias_nomes"], n)
+    segundo = np.full(n, -1, dtype=np.int64)
+    composto = rng.random(n) < t["prob_nome_composto"]
+    for codigo, (prenomes, alias) in enumerate(t["prenomes_por_sexo"]):
+        linhas = np.flatnonzero(composto & (t["sexo_nomes"][nome] == codigo))
+        segundo[linhas] = prenomes[_sortear_alias(rng, alias, len(linhas))]
+    segundo[segundo == nome] = -1
+    quantidade = rng.integers(1, 4, n)
+    return nome, segundo, quantidade, _sortear_sobrenomes_distintos(rng, t, quantidade)
+
+
+def _gerar_nomes(rng: np.random.Generator, n: int) -> np.ndarray:
+    t = _tabela_nomes()
+    nome, segundo, quantidade, sobrenomes = _sortear_partes_nome(rng, t, n)
+
+    # Respeita o limite de tamanho sorteando de novo os nomes longos demais
+    while True:
+        usados = np.arange(3) < quantidade[:, None]
+        tamanho = (t["tamanhos_nomes"][nome]
+                   + np.where(segundo >= 0, t["tamanhos_nomes"][segundo] + 1, 0)
+                   + (t["tamanhos_sobrenomes"][sobrenomes] * usados).sum(axis=1))
+        refazer = np.flatnonzero(tamanho > t["max_tamanho"])
+        if not len(refazer):
+            break
+        nome[refazer], segundo[refazer], quantidade[refazer], sobrenomes[refazer] = \
+            _sortear_partes_nome(rng, t, len(refazer))
+
+    resultado = t["nomes"][nome]
+    compostos = segundo >= 0
+    resultado[compostos] += t["segundos_nomes"][segundo[compostos]]
+    resultado += t["sobrenomes"][sobrenomes[:, 0]]
+    for coluna in (1, 2):
+        linhas = quantidade > coluna
+        resultado[linhas] += t["sobrenomes"][sobrenomes[linhas, coluna]]
+    return resultado
+
+
+def _gerar_cpfs(rng: np.random.Generator, n: int, bases: Optional[np.ndarray] = None) -> np.ndarray:
+    """CPFs válidos; com ``bases`` (inteiros de 9 dígitos), só os dígitos verificadores são calculados."""
+    digitos = np.empty((n, 11), dtype=np.int64)
+    digitos[:, :9] = rng.integers(0, 10, (n, 9)) if bases is None else _inteiros_para_digitos(bases, 9)
+
+    resto = (digitos[:, :9] @ _PESOS_DV1) % 11
+    digitos[:, 9] = np.where(resto < 2, 0, 11 - resto)
+    resto = (digitos[:, :10] @ _PESOS_DV2) % 11
+    digitos[:, 10] = np.where(resto < 2, 0, 11 - resto)
+
+    return _digitos_para_texto(digitos)
+
+
+@lru_cache(maxsize=4)
+def _tabela_datas(hoje: datetime.date) -> np.ndarray:
+    """Todas as datas de nascimento possíveis (18 a 80 anos) formatadas DD/MM/YYYY."""
+    mais_antiga = hoje.replace(year=hoje.year - gerador.MAX_AGE_YEARS)
+    mais_recente = hoje.replace(year=hoje.year - gerador.MIN_AGE_YEARS)
+    datas = pd.date_range(mais_antiga, mais_recente, inclusive='left')
+    return datas.strftime('%d/%m/%Y').to_numpy(dtype=object)
+
+
+def _gerar_datas(rng: np.random.Generator, n: int) -> np.ndarray:
+    tabela = _tabela_datas(datetime.date.today())
+    return tabela[rng.integers(0, len(tabela), n)]
+
+
+def _gerar_emails(rng: np.random.Generator, n: int, numeros: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    E-mails nos quatro modelos de ``gerar_email``; cada modelo monta só as suas linhas.
+    Com ``numeros`` (modo único), todos os modelos terminam no número informado.
+    """
+    t = _tabela_nomes()
+    modelo = rng.integers(0, 4, n)
+    nome = _sortear_alias(rng, t["alias_nomes"], n)
+    sobrenome = _sortear_alias(rng, t["alias_sobrenomes"], n)
+    if numeros is None:
+        numero = rng.integers(1, 100, n)
+        numero[modelo == 2] = rng.integers(10, 100, np.count_nonzero(modelo == 2))
+        sufixo = t["numeros"][numero]
+        sufixo_ponto = np.full(n, "", dtype=object)
+    else:
+        sufixo = sufixo_ponto = numeros.astype(str).astype(object)
+
+    local = np.empty(n, dtype=object)
+    linhas = modelo == 0
+    local[linhas] = t["nomes_email"][nome[linhas]] + sufixo[linhas]
+    linhas = modelo == 1
+    local[linhas] = (t["nomes_ponto"][nome[linhas]] + t["sobrenomes_email"][sobrenome[linhas]]
+                     + sufixo_ponto[linhas])
+    linhas = modelo == 2
+    local[linhas] = (t["nomes_email"][nome[linhas]] + t["iniciais_sobrenomes"][sobrenome[linhas]]
+                     + sufixo[linhas])
+    linhas = modelo == 3
+    local[linhas] = (t["sobrenomes_email"][sobrenome[linhas]] + t["iniciais_nomes"][nome[linhas]]
+                     + sufixo[linhas])
+
+    return local + t["provedores"][rng.integers(0, len(t["provedores"]), n)]
+
+
+def _gerar_celulares(rng: np.random.Generator, n: int, valores: Optional[np.ndarray] = None) -> np.ndarray:
+    if valores is not None:
+        return _digitos_para_texto(_inteiros_para_digitos(valores, 11))
+    digitos = np.empty((n, 11), dtype=np.int64)
+    digitos[:, 0] = 9
+    digitos[:, 1] = rng.integers(6, 10, n)
+    digitos[:, 2:] = rng.integers(0, 10, (n, 9))
+    return _digitos_para_texto(digitos)
+
+
+@lru_cache(maxsize=None)
+def _tabela_complementos():
+    """Complementos possíveis por tipo (APTO, CASA, BLOCO, SALA), em blocos contíguos."""
+    blocos = [
+        [f"APTO {i}" for i in range(1, 301)],
+        [f"CASA {i}" for i in range(1, 6)],
+        [f"BLOCO {letra}" for letra in "ABCD"],
+        [f"SALA {i}" for i in range(101, 501)],
+    ]
+    tamanhos = np.array([len(bloco) for bloco in blocos])
+    inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    tabela = np.array([valor for bloco in blocos for valor in bloco], dtype=object)
+    return tabela, inicios, tamanhos
+
+
+def _gerar_numeros_e_complementos(rng: np.random.Generator, n: int):
+    numeros = rng.integers(1, 2001, n)
+    tabela, inicios, tamanhos = _tabela_complementos()
+    complementos = tabela[_sortear_em_blocos(rng, inicios, tamanhos, rng.integers(0, 4, n))]
+    complementos[rng.random(n) >= 0.5] = None
+    return numeros, complementos
+
+
+@lru_cache(maxsize=None)
+def _tabelas_enderecos():
+    """Achata o índice offline de endereços em arrays NumPy."""
+    indice = enderecos.carregar_indice()
+    cidades = indice.cidades
+
+    faixas = [faixa for cidade in cidades for faixa in cidade["faixas"]]
+    bairros = [bairro for cidade in cidades for bairro in cidade["bairros"]]
+    qtd_faixas = np.array([len(cidade["faixas"]) for cidade in cidades])
+    qtd_bairros = np.array([len(cidade["bairros"]) for cidade in cidades])
+
+    return {
+        "pesos_acumulados": np.array(indice.pesos_acumulados, dtype=np.int64),
+        "cidades": np.array([cidade["cidade"] for cidade in cidades], dtype=object),
+        "ufs": np.array([cidade["uf"] for cidade in cidades], dtype=object),
+        "faixa_inicio": np.array([inicio for inicio, _ in faixas], dtype=np.int64),
+        "faixa_tamanho": np.array([fim - inicio + 1 for inicio, fim in faixas], dtype=np.int64),
+        "cidade_faixas_inicio": np.concatenate(([0], np.cumsum(qtd_faixas)[:-1])),
+        "cidade_faixas_qtd": qtd_faixas,
+        "bairros": np.array(bairros, dtype=object),
+        "cidade_bairros_inicio": np.concatenate(([0], np.cumsum(qtd_bairros)[:-1])),
+        "cidade_bairros_qtd": qtd_bairros,
+        "logradouros": np.array(
+            [f"{tipo} {nome}" for tipo in indice.tipos_logradouro for nome in indice.nomes_logradouro],
+            dtype=object,
+        ),
+    }
+
+
+def _gerar_enderecos(rng: np.random.Generator, n: int) -> dict:
+    t = _tabelas_enderecos()
+    sorteio = rng.integers(0, t["pesos_acumulados"][-1], n)
+    cidade = np.searchsorted(t["pesos_acumulados"], sorteio, side='right')
+
+    faixa = _sortear_em_blocos(rng, t["cidade_faixas_inicio"], t["cidade_faixas_qtd"], cidade)
+    ceps = t["faixa_inicio"][faixa] + (rng.random(n) * t["faixa_tamanho"][faixa]).astype(np.int64)
+    bairro = _sortear_em_blocos(rng, t["cidade_bairros_inicio"], t["cidade_bairros_qtd"], cidade)
+
+    return {
+        "Endereço - CEP": _digitos_para_texto(_inteiros_para_digitos(ceps, 8)),
+        "Endereço - Logradouro": t["logradouros"][rng.integers(0, len(t["logradouros"]), n)],
+        "Endereço - Bairro": t["bairros"][bairro],
+        "Endereço - Cidade": t["cidades"][cidade],
+        "Endereço - Estado": t["ufs"][cidade],
+    }
+
+
+def preaquecer() -> None:
+    """
+    Monta todas as tabelas pré-computadas. Chamado antes de criar processos
+    (pool da CLI, workers do gunicorn com preload), as tabelas são herdadas
+    via fork em vez de reconstruídas em cada processo.
+    """
+    _tabela_nomes()
+    _tabela_datas(datetime.date.today())
+    _tabela_complementos()
+    _tabelas_enderecos()
+
+
+def gerar_lote(quantidade: int, rng: Optional[np.random.Generator] = None,
+               seed: Optional[int] = None, unicos: Optional[unicidade.ValoresUnicos] = None,
+               indice_inicial: int = 0, campos: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Gera um lote de pessoas diretamente como DataFrame.
+    Com ``campos``, só as colunas pedidas são sorteadas (a mesma semente com
+    outra projeção produz valores diferentes).
+
+    Args:
+        quantidade: Número de pessoas a gerar
+        rng: Gerador NumPy (opcional)
+        seed: Semente, usada quando rng não é informado (opcional)
+        unicos: Valores únicos do conjunto (modo único, opcional)
+        indice_inicial: Índice global da primeira pessoa (usado com ``unicos``)
+        campos: Colunas a gerar, nesta ordem (None = ``gerador.COLUNAS_ORDEM``)
+
+    Returns:
+        pd.DataFrame: Uma linha por pessoa, colunas em ``campos``
+    """
+    if rng is None:
+        rng = gerador.criar_rng_numpy(seed) if seed is not None else np.random.default_rng()
+    campos = gerador.COLUNAS_ORDEM if campos is None else campos
+
+    cronometro = metricas.cronometro(metricas.ETAPAS_LOTE)
+    bases_cpf = celulares = numeros_email = None
+    if unicos is not None:
+        indices = np.arange(indice_inicial, indice_inicial + quantidade, dtype=np.int64)
+        bases_cpf = unicos.base_cpf(indices) if "CPF" in campos else None
+        celulares = unicos.celular(indices) if "Celular" in campos else None
+        numeros_email = unicos.numero_email(indices) if "Email" in campos else None
+        cronometro.marcar('unicos')
+
+    colunas = {}
+    if any(campo in campos for campo in gerador.CAMPOS_NUMERO_COMPLEMENTO):
+        colunas["Endereço - Número"], colunas["Endereço - Complemento"] = \
+            _gerar_numeros_e_complementos(rng, quantidade)
+        cronometro.marcar('numero_complemento')
+    if "Nome Completo" in campos:
+        colunas["Nome Completo"] = _gerar_nomes(rng, quantidade)
+        cronometro.marcar('nome')
+    if "CPF" in campos:
+        colunas["CPF"] = _gerar_cpfs(rng, quantidade, bases_cpf)
+        cronometro.marcar('cpf')
+    if "Data de Nascimento" in campos:
+        colunas["Data de Nascimento"] = _gerar_datas(rng, quantidade)
+        cronometro.marcar('data_nascimento')
+    if "Email" in campos:
+        colunas["Email"] = _gerar_emails(rng, quantidade, numeros_email)
+        cronometro.marcar('email')
+    if "Celular" in campos:
+        colunas["Celular"] = _gerar_celulares(rng, quantidade, celulares)
+        cronometro.marcar('celular')
+    if gerador.precisa_endereco(campos):
+        colunas.update(_gerar_enderecos(rng, quantidade))
+        cronometro.marcar('endereco')
+    # Índice explícito: sem colunas sorteadas (esquema só de constantes) o bloco ainda tem as linhas
+    df = pd.DataFrame({coluna: colunas[coluna] for coluna in campos}, index=pd.RangeIndex(quantidade))
+    cronometro.marcar('dataframe')
+    metricas.PESSOAS.inc('lote', valor=quantidade)
+    return df
+
+
+def _fatias_da_semente(seed: int, inicio: int, quantidade: Optional[int],
+                       unicos: Optional[unicidade.ValoresUnicos], campos: Optional[Sequence[str]]
+                       ) -> Iterator[pd.DataFrame]:
+    """Trechos dos blocos lógicos que cobrem as linhas ``[inicio, inicio + quantidade)``."""
+    bloco, corte = divmod(inicio, BLOCO_SEMENTE)
+    restantes = quantidade
+    while restantes is None or restantes > 0:
+        df = gerar_lote(BLOCO_SEMENTE, gerador.criar_rng_numpy(seed, bloco), unicos=unicos,
+                        indice_inicial=bloco * BLOCO_SEMENTE, campos=campos)
+        fim = BLOCO_SEMENTE if restantes is None else min(BLOCO_SEMENTE, corte + restantes)
+        if restantes is not None:
+            restantes -= fim - corte
+        yield df.iloc[corte:fim] if corte or fim < BLOCO_SEMENTE else df
+        bloco, corte = bloco + 1, 0
+
+
+def _reagrupar(fatias: Iterator[pd.DataFrame], tamanho_lote: int) -> Iterator[pd.DataFrame]:
+    """Junta (ou divide) as fatias em DataFrames de ``tamanho_lote`` linhas; o último pode ter menos."""
+    pendentes, linhas = [], 0
+    for fatia in fatias:
+        while len(fatia):
+            parte = fatia.iloc[:tamanho_lote - linhas]
+            fatia = fatia.iloc[len(parte):]
+            pendentes.append(parte)
+            linhas += len(parte)
+            if linhas == tamanho_lote:
+                yield _juntar(pendentes)
+                pendentes, linhas = [], 0
+    if pendentes:
+        yield _juntar(pendentes)
+
+
+def _juntar(partes) -> pd.DataFrame:
+    if len(partes) == 1:
+        return partes[0].reset_index(drop=True)
+    return pd.concat(partes, ignore_index=True)
+
+
+# Chaves da permutação de cada semente, reaproveitadas entre páginas e requisições
+_permutacoes = lru_cache(maxsize=32)(unicidade.ValoresUnicos)
+
+
+def _valores_unicos(seed: int, inicio: int, quantidade: Optional[int]) -> unicidade.ValoresUnicos:
+    """Valores únicos da semente, conferindo se as linhas cabem no espaço de valores."""
+    if quantidade is None:
+        raise ValueError("O modo único exige quantidade")
+    if inicio + quantidade > unicidade.MAX_UNICOS:
+        raise ValueError(f"O modo único comporta no máximo {unicidade.MAX_UNICOS} pessoas")
+    return _permutacoes(seed)
+
+
+def gerar_faixa(seed: int, inicio: int, quantidade: int, unico: bool = False,
+                campos: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Linhas ``[inicio, inicio + quantidade)`` do conjunto da semente, sem
+    gerar as anteriores (só os blocos lógicos que as contêm).
+
+    Args:
+        seed: Semente do conjunto
+        inicio: Índice da primeira pessoa
+        quantidade: Número de pessoas
+        unico: CPF, e-mail e celular sem repetição no conjunto
+        campos: Colunas a gerar, nesta ordem (None = todas)
+
+    Returns:
+        pd.DataFrame: Uma linha por pessoa, com índice de 0 a quantidade - 1
+    """
+    unicos = _valores_unicos(seed, inicio, quantidade) if unico else None
+    for df in _reagrupar(_fatias_da_semente(seed, inicio, quantidade, unicos, campos), quantidade):
+        return df
+    return gerar_lote(0, gerador.criar_rng_numpy(seed), campos=campos)
+
+
+def iterar_lotes(quantidade: Optional[int], tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                 rng: Optional[np.random.Generator] = None, seed: Optional[int] = None,
+                 bloco_inicial: int = 0, unico: bool = False,
+                 campos: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Gera ``quantidade`` pessoas em DataFrames de até ``tamanho_lote`` linhas,
+    mantendo a memória limitada para volumes grandes. Sem semente, com a
+    consulta online de CEP ligada e algum campo de endereço pedido, cada
+    bloco é gerado por ``gerador.gerar_multiplas_pessoas``; sem campos de
+    endereço (p.ex. um esquema só de constantes) o motor vetorizado basta.
+
+    Com ``seed`` (ou ``unico``), as linhas são as do conjunto da semente (ver
+    o início do módulo), independentemente de ``tamanho_lote`` e da consulta
+    online: qualquer faixa pode ser gerada separadamente (p.ex. em outro
+    processo, via ``bloco_inicial``) e sai idêntica à geração sequencial.
+
+    Args:
+        quantidade: Número total de pessoas (None gera blocos indefinidamente)
+        tamanho_lote: Linhas por DataFrame
+        rng: Gerador NumPy (opcional, ignorado se seed for informada)
+        seed: Semente do conjunto de dados (opcional)
+        bloco_inicial: Índice do primeiro bloco gerado (a primeira pessoa é a
+            de índice ``bloco_inicial * tamanho_lote``)
+        unico: CPF, e-mail e celular sem repetição no conjunto da semente
+            (sorteia uma semente se None; exige ``quantidade``). Blocos gerados em processos
+            diferentes com a mesma semente também não se repetem entre si
+        campos: Colunas a gerar, nesta ordem (None = todas)
+
+    Yields:
+        pd.DataFrame: Próximo bloco de pessoas
+    """
+    if unico and seed is None:
+        seed = secrets.randbits(64)
+    if seed is not None:
+        inicio = bloco_inicial * tamanho_lote
+        unicos = _valores_unicos(seed, inicio, quantidade) if unico else None
+        yield from _reagrupar(_fatias_da_semente(seed, inicio, quantidade, unicos, campos), tamanho_lote)
+        return
+
+    if rng is None:
+        rng = np.random.default_rng()
+    inicios = itertools.count(0, tamanho_lote) if quantidade is None else range(0, quantidade, tamanho_lote)
+    for inicio in inicios:
+        tamanho = tamanho_lote if quantidade is None else min(tamanho_lote, quantidade - inicio)
+        if gerador.CEP_ONLINE and gerador.precisa_endereco(campos):
+            pessoas = gerador.gerar_multiplas_pessoas(tamanho, verbose=False, campos=campos, compacto=True)
+            df = pd.DataFrame(pessoas, columns=gerador.COLUNAS_ORDEM)
+            yield df if campos is None else df[list(campos)]
+        else:
+            yield gerar_lote(tamanho, rng, campos=campos)
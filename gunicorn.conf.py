@@ -0,0 +1,31 @@
+"""
+Configuração do gunicorn para servir a aplicação em produção.
+
+Uso: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# A geração é limitada por CPU: um processo por núcleo (mais um) e poucas
+# threads por processo, suficientes para não bloquear downloads em fluxo
+workers = int(os.getenv('WEB_CONCURRENCY') or multiprocessing.cpu_count() + 1)
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = 'gthread'
+
+# Carrega app e tabelas pré-computadas uma vez no mestre (ver wsgi.py)
+preload_app = True
+
+# Exportações grandes podem levar vários segundos
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+keepalive = 5
+
+# Recicla workers periodicamente para conter fragmentação de memória
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info')
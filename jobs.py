@@ -0,0 +1,300 @@
+"""
+Jobs de geração em segundo plano.
+
+Gerações grandes são enfileiradas num pool de processos (fora do worker
+do gunicorn, para não disputar o GIL com as requisições) e gravadas em
+``dados_gerados/jobs``. O estado de cada job (progresso, linhas por segundo,
+ETA) é salvo em ``<id>.json`` ao lado do arquivo de resultado, de modo que
+qualquer worker do gunicorn consegue consultá-lo, não só o que o criou.
+
+O estado guarda o pid (e o host) do processo responsável pelo job: o worker
+enquanto o job está na fila, o processo do pool durante a execução. Um job
+na fila ou executando cujo processo já não existe (worker reciclado ou
+derrubado) é marcado como erro na próxima consulta, em vez de ficar
+``executando`` para sempre.
+
+Jobs terminados (concluídos ou com erro) expiram ``JOBS_TTL`` segundos após
+o fim, e só os ``JOBS_MAX`` mais recentes são mantidos: a limpeza roda a
+cada job enviado e apaga o estado e o resultado. Um job expirado é tratado
+como inexistente.
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import secrets
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+import esquema
+import exportacao
+import gerador
+import gerador_lote
+
+JOBS_WORKERS = int(os.getenv('JOBS_WORKERS', '2'))
+JOBS_TAMANHO_BLOCO = int(os.getenv('JOBS_TAMANHO_BLOCO', '50000'))
+JOBS_TTL = int(os.getenv('JOBS_TTL', '86400'))  # segundos
+JOBS_MAX = int(os.getenv('JOBS_MAX', '100'))
+_ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+_PENDENTES = ('na_fila', 'executando')
+
+
+def _processo_vivo(pid: int) -> bool:
+    """Indica se o processo existe (neste host)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _executar_job(diretorio: str, tamanho_bloco: int, job_id: str, opcoes: Dict) -> None:
+    """Ponto de entrada do job no processo do pool."""
+    GerenciadorJobs(diretorio, tamanho_bloco=tamanho_bloco)._executar(job_id, opcoes)
+
+
+class GerenciadorJobs:
+    """
+    Enfileira e acompanha jobs de geração.
+
+    Args:
+        diretorio: Onde ficam os estados e os resultados
+        workers: Jobs executados ao mesmo tempo (processos do pool)
+        tamanho_bloco: Linhas por bloco (granularidade do progresso)
+        ttl: Validade (s) de um job terminado, contada do fim
+        maximo: Jobs terminados mantidos (os mais antigos saem primeiro)
+    """
+
+    def __init__(self, diretorio: Optional[Path] = None, workers: int = JOBS_WORKERS,
+                 tamanho_bloco: int = JOBS_TAMANHO_BLOCO, ttl: int = JOBS_TTL, maximo: int = JOBS_MAX):
+        self.diretorio = Path(diretorio) if diretorio else gerador.obter_diretorio_saida() / 'jobs'
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.tamanho_bloco = tamanho_bloco
+        self.ttl = ttl
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        # Criado no primeiro uso, para não ser herdado pelo fork dos workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _caminho_estado(self, job_id: str) -> Path:
+        return self.diretorio / f'{job_id}.json'
+
+    def caminho_resultado(self, job: Dict) -> Path:
+        """Caminho do arquivo gerado por um job."""
+        return self.diretorio / f"{job['id']}.{job['formato']}"
+
+    def _caminho_parcial(self, job: Dict) -> Path:
+        destino = self.caminho_resultado(job)
+        return destino.with_name(destino.name + '.parcial')
+
+    def _salvar(self, job: Dict) -> None:
+        """Grava o estado de forma atômica (escreve e renomeia)."""
+        temporario = self._caminho_estado(job['id']).with_suffix('.json.tmp')
+        temporario.write_text(json.dumps(job), encoding='utf-8')
+        os.replace(temporario, self._caminho_estado(job['id']))
+
+    def _ler(self, job_id: str) -> Optional[Dict]:
+        try:
+            return json.loads(self._caminho_estado(job_id).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def _atualizar(self, job: Dict, **campos) -> Dict:
+        job.update(campos)
+        self._salvar(job)
+        return dict(job)
+
+    def _dono(self) -> Dict:
+        """Campos que identificam o processo responsável pelo job."""
+        return {'pid': os.getpid(), 'host': socket.gethostname()}
+
+    def _orfao(self, job: Dict) -> bool:
+        """Job pendente cujo processo responsável terminou sem concluí-lo."""
+        return (job['status'] in _PENDENTES and job.get('host') == socket.gethostname()
+                and not _processo_vivo(job['pid']))
+
+    def _expirado(self, job: Dict) -> bool:
+        return job['status'] not in _PENDENTES and (job['concluido_em'] or 0) + self.ttl < time.time()
+
+    def _remover(self, job: Dict) -> None:
+        """Apaga o resultado e o estado de um job terminado."""
+        self.caminho_resultado(job).unlink(missing_ok=True)
+        self._caminho_estado(job['id']).unlink(missing_ok=True)
+
+    def limpar(self) -> int:
+        """
+        Remove os jobs terminados expirados e os mais antigos além de ``maximo``.
+        Jobs na fila ou executando nunca são removidos.
+
+        Returns:
+            int: Quantidade de jobs removidos
+        """
+        estados = (self._ler_atual(caminho.stem) for caminho in self.diretorio.glob('*.json')
+                   if _ID_VALIDO.match(caminho.stem))
+        terminados = sorted((job for job in estados if job is not None and job['status'] not in _PENDENTES),
+                            key=lambda job: job['concluido_em'] or 0, reverse=True)
+        removidos = 0
+        for posicao, job in enumerate(terminados):
+            if posicao >= self.maximo or self._expirado(job):
+                self._remover(job)
+                removidos += 1
+        return removidos
+
+    def enviar(self, quantidade: int, formato: str = 'csv', seed: Optional[int] = None,
+               opcoes: Optional[Dict] = None, unico: bool = False,
+               campos: Optional[List[str]] = None, definicao_esquema: Optional[Dict] = None) -> Dict:
+        """
+        Enfileira uma geração.
+
+        Args:
+            quantidade: Número de pessoas
+            formato: Um de exportacao.FORMATOS
+            seed: Semente (gera uma aleatória se None, informada no estado)
+            opcoes: Opções do escritor (p.ex. {'tamanho_row_group': N})
+            unico: CPF, e-mail e celular sem repetição
+            campos: Colunas geradas e gravadas (None = todas)
+            definicao_esquema: Esquema declarativo das colunas (ver esquema.py; opcional)
+
+        Returns:
+            Dict: Estado inicial do job
+        """
+        if formato not in exportacao.FORMATOS:
+            raise ValueError(f"Formato inválido: {formato} (use {', '.join(exportacao.FORMATOS)})")
+        if quantidade < 1:
+            raise ValueError('Quantidade deve ser maior que zero')
+        self.limpar()
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'na_fila',
+            'quantidade': quantidade,
+            'formato': formato,
+            'seed': seed if seed is not None else secrets.randbits(64),
+            'unico': unico,
+            'campos': campos,
+            'esquema': definicao_esquema,
+            'linhas': 0,
+            'progresso': 0.0,
+            'linhas_por_segundo': None,
+            'eta_segundos': None,
+            'criado_em': time.time(),
+            'iniciado_em': None,
+            'concluido_em': None,
+            'erro': None,
+            **self._dono(),
+        }
+        with self._lock:
+            if self._executor is None:
+                # spawn: o worker do gunicorn tem threads, e o fork herdaria locks delas
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+        self._salvar(job)
+        futuro = self._executor.submit(_executar_job, str(self.diretorio), self.tamanho_bloco, job['id'],
+                                       opcoes or {})
+        futuro.add_done_callback(lambda futuro: self._ao_terminar(job['id'], futuro))
+        return dict(job)
+
+    def _ao_terminar(self, job_id: str, futuro: Future) -> None:
+        """Marca como erro um job cujo processo falhou (p.ex. morto pelo sistema) sem gravar o fim."""
+        erro = futuro.exception()
+        if erro is None:
+            return
+        if isinstance(erro, BrokenProcessPool):
+            with self._lock:
+                self._executor = None  # o próximo job cria um pool novo
+        job = self._ler(job_id)
+        if job is not None and job['status'] in _PENDENTES:
+            self._caminho_parcial(job).unlink(missing_ok=True)
+            self._atualizar(job, status='erro', erro=f'Job interrompido: {erro}', concluido_em=time.time())
+
+    def obter(self, job_id: str) -> Optional[Dict]:
+        """
+        Estado atual de um job (deste processo ou de outro worker). Um job
+        órfão (ver o início do módulo) é marcado como erro; um job expirado é
+        apagado.
+
+        Returns:
+            Dict ou None: Estado do job ou None se não existir ou tiver expirado
+        """
+        if not _ID_VALIDO.match(job_id):
+            return None
+        job = self._ler_atual(job_id)
+        if job is not None and self._expirado(job):
+            self._remover(job)
+            return None
+        return job
+
+    def _ler_atual(self, job_id: str) -> Optional[Dict]:
+        """Lê o estado de um job, marcando como erro se estiver órfão."""
+        job = self._ler(job_id)
+        if job is not None and self._orfao(job):
+            # Relê antes de marcar: o processo pode ter concluído o job ao terminar
+            job = self._ler(job_id)
+            if job is not None and self._orfao(job):
+                self._caminho_parcial(job).unlink(missing_ok=True)
+                job = self._atualizar(job, status='erro', concluido_em=time.time(),
+                                      erro='Job interrompido: o processo que o executava terminou')
+        return job
+
+    def _acompanhar(self, job: Dict, blocos: Iterable[pd.DataFrame], quantidade: int,
+                    inicio: float) -> Iterator[pd.DataFrame]:
+        """Repassa os blocos ao escritor atualizando o progresso a cada um."""
+        linhas = 0
+        for df in blocos:
+            yield df
+            linhas += len(df)
+            decorrido = time.time() - inicio
+            por_segundo = linhas / decorrido if decorrido > 0 else None
+            self._atualizar(
+                job,
+                linhas=linhas,
+                progresso=round(linhas / quantidade, 4),
+                linhas_por_segundo=round(por_segundo) if por_segundo else None,
+                eta_segundos=round((quantidade - linhas) / por_segundo, 1) if por_segundo else None,
+            )
+
+    def _executar(self, job_id: str, opcoes: Dict) -> None:
+        inicio = time.time()
+        job = self._ler(job_id)
+        if job is None or job['status'] != 'na_fila':
+            return
+        self._atualizar(job, status='executando', iniciado_em=inicio, **self._dono())
+        destino = self.caminho_resultado(job)
+        parcial = self._caminho_parcial(job)
+        try:
+            if job['esquema'] is not None:
+                compilado = esquema.compilar(job['esquema'])
+                blocos = compilado.iterar_lotes(job['quantidade'], self.tamanho_bloco, seed=job['seed'],
+                                                unico=job['unico'])
+                opcoes = {**opcoes, **compilado.opcoes_exportacao(job['formato'])}
+            else:
+                blocos = gerador_lote.iterar_lotes(job['quantidade'], self.tamanho_bloco, seed=job['seed'],
+                                                   unico=job['unico'], campos=job['campos'])
+                opcoes = {**opcoes, 'campos': job['campos']}
+            exportacao.escrever(job['formato'], self._acompanhar(job, blocos, job['quantidade'], inicio),
+                                parcial, **opcoes)
+            os.replace(parcial, destino)
+        except Exception as e:
+            parcial.unlink(missing_ok=True)
+            self._atualizar(job, status='erro', erro=str(e), concluido_em=time.time())
+            return
+        self._atualizar(job, status='concluido', progresso=1.0, eta_segundos=0, concluido_em=time.time())
+
+
+@lru_cache(maxsize=None)
+def obter_gerenciador() -> GerenciadorJobs:
+    """Gerenciador de jobs compartilhado pelo processo."""
+    return GerenciadorJobs()
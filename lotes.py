@@ -0,0 +1,243 @@
+"""
+Lotes gerados guardados para exportação posterior.
+
+``/api/gerar-multiplas`` guarda as pessoas que devolveu e responde com o id
+do lote; os endpoints de exportação recebem esse id e só serializam o lote,
+sem gerar (nem consultar CEPs) de novo, e o arquivo baixado é exatamente o
+que foi exibido. Como no cache de CEP, os lotes ficam num LRU em memória e
+num SQLite em ``dados_gerados/lotes.sqlite3``, para que qualquer worker do
+gunicorn encontre o lote criado por outro. Lotes expiram após ``LOTES_TTL``
+segundos e só os ``LOTES_MAX`` mais recentes são mantidos em disco (a
+limpeza roda a cada algumas gravações, então a tabela pode passar um pouco
+desse limite entre uma limpeza e outra).
+
+Lotes guardados com ``adiado=True`` (os de uma pessoa só, um por chamada de
+``/api/gerar-pessoa``) não são gravados na requisição: ficam pendentes em
+memória e uma thread do armazém os grava em disco em seguida, vários numa
+única transação. A requisição não paga o pickle nem o commit e não disputa
+o lock de escrita; até a gravação, só o worker que criou o lote o enxerga.
+"""
+
+import atexit
+import os
+import pickle
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+import gerador
+
+LOTES_TTL = int(os.getenv('LOTES_TTL', '3600'))  # segundos
+LOTES_MAX = int(os.getenv('LOTES_MAX', '1000'))
+LOTES_MEMORIA = int(os.getenv('LOTES_MEMORIA', '100'))
+_ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+# Quantidade de gravações entre duas limpezas da tabela
+_GRAVACOES_ENTRE_LIMPEZAS = 100
+
+
+# Armazéns vivos do processo: recomeçam sem pendentes no filho após o fork e
+# gravam os pendentes ao sair (um único hook de cada para todos)
+_armazens: "weakref.WeakSet[ArmazemLotes]" = weakref.WeakSet()
+
+
+def _reiniciar_apos_fork() -> None:
+    for armazem in list(_armazens):
+        armazem._apos_fork()
+
+
+def _gravar_ao_sair() -> None:
+    for armazem in list(_armazens):
+        armazem.gravar_pendentes()
+
+
+os.register_at_fork(after_in_child=_reiniciar_apos_fork)
+atexit.register(_gravar_ao_sair)
+
+
+class Lote(NamedTuple):
+    id: str
+    pessoas: List[Dict]
+    colunas: List[str]
+    tipos: Optional[Dict[str, str]]
+    expira_em: float
+
+    def dataframe(self) -> pd.DataFrame:
+        """Pessoas do lote como DataFrame, nas colunas exportadas."""
+        return pd.DataFrame(self.pessoas, columns=self.colunas)
+
+
+class ArmazemLotes:
+    """
+    Guarda lotes de pessoas por id, com validade e quantidade limitadas.
+
+    Args:
+        caminho: Arquivo SQLite dos lotes; None guarda só em memória
+        ttl: Validade (s) de cada lote
+        maximo: Lotes mantidos em disco (os mais antigos saem primeiro)
+        tamanho_memoria: Capacidade do LRU em memória
+    """
+
+    def __init__(self, caminho: Optional[Path] = None, ttl: int = LOTES_TTL, maximo: int = LOTES_MAX,
+                 tamanho_memoria: int = LOTES_MEMORIA):
+        self.caminho = Path(caminho) if caminho else None
+        self.ttl = ttl
+        self.maximo = maximo
+        self.tamanho_memoria = tamanho_memoria
+        self._memoria: "OrderedDict[str, Lote]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conexao: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._gravacoes = 0
+        # Lotes adiados ainda não gravados em disco, e a thread que os grava
+        self._pendentes: Dict[str, Lote] = {}
+        self._ha_pendentes = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        _armazens.add(self)
+
+    def _apos_fork(self) -> None:
+        """No filho, os pendentes herdados ficam com o pai (que os grava) e a thread não existe."""
+        self._lock = threading.Lock()
+        self._pendentes = {}
+        self._ha_pendentes = threading.Event()
+        self._thread = None
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Abre a conexão SQLite (de novo após um fork, p.ex. nos workers do gunicorn)."""
+        if self._conexao is None or self._pid != os.getpid():
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            conexao = sqlite3.connect(str(self.caminho), timeout=10, check_same_thread=False)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            # Perder os últimos lotes numa queda de energia é aceitável; um fsync por lote não
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS lotes ('
+                'id TEXT PRIMARY KEY, conteudo BLOB NOT NULL, expira_em REAL NOT NULL)'
+            )
+            conexao.execute('CREATE INDEX IF NOT EXISTS lotes_expira_em ON lotes (expira_em)')
+            conexao.commit()
+            self._conexao = conexao
+            self._pid = os.getpid()
+        return self._conexao
+
+    def _guardar_memoria(self, lote: Lote) -> None:
+        self._memoria[lote.id] = lote
+        self._memoria.move_to_end(lote.id)
+        while len(self._memoria) > self.tamanho_memoria:
+            self._memoria.popitem(last=False)
+
+    def _limpar_disco(self, conexao: sqlite3.Connection) -> None:
+        """Remove lotes expirados e os mais antigos além de ``maximo``."""
+        conexao.execute('DELETE FROM lotes WHERE expira_em < ?', (time.time(),))
+        # Todos os lotes têm a mesma validade: os que expiram antes são os mais antigos
+        conexao.execute(
+            'DELETE FROM lotes WHERE id NOT IN (SELECT id FROM lotes ORDER BY expira_em DESC LIMIT ?)',
+            (self.maximo,),
+        )
+
+    def _gravar(self, conexao: sqlite3.Connection, novos: List[Lote]) -> None:
+        """Insere lotes numa transação, limpando a tabela a cada algumas gravações."""
+        conexao.executemany('INSERT INTO lotes (id, conteudo, expira_em) VALUES (?, ?, ?)',
+                            [(lote.id, pickle.dumps(lote, protocol=pickle.HIGHEST_PROTOCOL), lote.expira_em)
+                             for lote in novos])
+        antes = self._gravacoes
+        self._gravacoes += len(novos)
+        if antes // _GRAVACOES_ENTRE_LIMPEZAS != self._gravacoes // _GRAVACOES_ENTRE_LIMPEZAS:
+            self._limpar_disco(conexao)
+        conexao.commit()
+
+    def gravar_pendentes(self) -> None:
+        """Grava em disco os lotes adiados ainda pendentes."""
+        with self._lock:
+            if not self._pendentes:
+                return
+            novos = list(self._pendentes.values())
+            self._pendentes = {}
+            self._gravar(self._conectar(), novos)
+
+    def _gravar_em_segundo_plano(self) -> None:
+        while True:
+            self._ha_pendentes.wait()
+            self._ha_pendentes.clear()
+            try:
+                self.gravar_pendentes()
+            except sqlite3.Error:
+                # Lotes perdidos só deixam de ser vistos por outros workers; a thread segue
+                pass
+
+    def guardar(self, pessoas: List[Dict], colunas: List[str], tipos: Optional[Dict[str, str]] = None,
+                adiado: bool = False) -> Lote:
+        """
+        Guarda um lote. As pessoas ficam como dicionários planos: o DataFrame
+        só é montado se o lote for exportado.
+
+        Args:
+            pessoas: Pessoas do lote, como dicionários planos
+            colunas: Colunas exportadas, na ordem
+            tipos: Tipos das colunas nos formatos Arrow (p.ex. de um esquema)
+            adiado: Grava em disco em segundo plano, fora da chamada (ver o início do módulo)
+
+        Returns:
+            Lote: Lote guardado, com id e validade
+        """
+        lote = Lote(secrets.token_hex(16), pessoas, list(colunas), tipos, time.time() + self.ttl)
+        with self._lock:
+            self._guardar_memoria(lote)
+            if self.caminho is None:
+                return lote
+            if adiado:
+                self._pendentes[lote.id] = lote
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._gravar_em_segundo_plano,
+                                                    name='lotes-gravacao', daemon=True)
+                    self._thread.start()
+                self._ha_pendentes.set()
+                return lote
+            self._gravar(self._conectar(), [lote])
+        return lote
+
+    def obter(self, lote_id: str) -> Optional[Lote]:
+        """
+        Busca um lote pelo id (deste processo ou gravado por outro worker).
+
+        Returns:
+            Lote ou None: O lote, ou None se não existir ou tiver expirado
+        """
+        if not isinstance(lote_id, str) or not _ID_VALIDO.match(lote_id):
+            return None
+        agora = time.time()
+        with self._lock:
+            lote = self._memoria.get(lote_id)
+            if lote is not None:
+                if lote.expira_em >= agora:
+                    self._memoria.move_to_end(lote_id)
+                    return lote
+                del self._memoria[lote_id]
+            # Adiado e já fora do LRU, mas ainda não gravado
+            lote = self._pendentes.get(lote_id)
+            if lote is not None and lote.expira_em >= agora:
+                return lote
+            if self.caminho is None:
+                return None
+            linha = self._conectar().execute(
+                'SELECT conteudo FROM lotes WHERE id = ? AND expira_em >= ?', (lote_id, agora)
+            ).fetchone()
+            if linha is None:
+                return None
+            lote = pickle.loads(linha[0])
+            self._guardar_memoria(lote)
+        return lote
+
+
+@lru_cache(maxsize=None)
+def obter_armazem() -> ArmazemLotes:
+    """Armazém de lotes compartilhado pelo processo."""
+    return ArmazemLotes(gerador.obter_diretorio_saida() / 'lotes.sqlite3')
@@ -0,0 +1,381 @@
+"""
+Métricas de desempenho no formato do Prometheus.
+
+Histogramas de duração por etapa (nome, CPF, endereço, colunas do lote,
+exportação...), contadores de consultas de CEP por serviço e de acertos do
+cache. Tudo fica em memória no processo e é exposto em ``/metrics`` e, na
+CLI, como um resumo ao final da geração (``--metrics``).
+
+Com vários workers do gunicorn, defina ``METRICAS_DIR``: cada processo grava
+periodicamente um instantâneo ``<pid>.json`` nesse diretório e ``/metrics``
+soma todos, então qualquer worker responde pelo servidor inteiro.
+"""
+
+import json
+import os
+import itertools
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+METRICAS_ATIVAS = os.getenv('METRICAS', '1').lower() not in ('0', 'false', 'nao', 'não')
+METRICAS_DIR = os.getenv('METRICAS_DIR', '')
+METRICAS_INTERVALO = float(os.getenv('METRICAS_INTERVALO', '5'))
+# Etapas por pessoa custam poucos microssegundos: só 1 a cada N pessoas é cronometrada
+METRICAS_AMOSTRAGEM = max(1, int(os.getenv('METRICAS_AMOSTRAGEM', '100')))
+
+# Limites (s) dos baldes: de microssegundos (etapas por pessoa) a minutos (exportações)
+BALDES_PADRAO = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = '') -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_numero(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) and not valor.is_integer() else str(int(valor))
+
+
+class Contador:
+    """
+    Contador monotônico com rótulos.
+
+    Args:
+        nome: Nome da métrica (terminado em ``_total``)
+        ajuda: Descrição exibida no ``# HELP``
+        rotulos: Nomes dos rótulos; os valores são passados na mesma ordem
+    """
+
+    tipo = 'counter'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores_rotulos: str, valor: float = 1) -> None:
+        """Soma ``valor`` à série dos rótulos informados."""
+        if not METRICAS_ATIVAS:
+            return
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0) + valor
+
+    def valor(self, *valores_rotulos: str) -> float:
+        """Valor atual de uma série (0 se nunca incrementada)."""
+        return self._valores.get(valores_rotulos, 0)
+
+    def _instantaneo(self) -> List:
+        with self._lock:
+            return [[list(chave), valor] for chave, valor in self._valores.items()]
+
+    def _mesclar(self, series: List) -> None:
+        with self._lock:
+            for chave, valor in series:
+                chave = tuple(chave)
+                self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def _zerar(self) -> None:
+        with self._lock:
+            self._valores.clear()
+
+    def _linhas(self, series: Dict) -> List[str]:
+        return [f'{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}'
+                for chave, valor in sorted(series.items())]
+
+
+class Histograma:
+    """
+    Histograma de durações com rótulos.
+
+    Args:
+        nome: Nome da métrica (terminado em ``_segundos``)
+        ajuda: Descrição exibida no ``# HELP``
+        rotulos: Nomes dos rótulos
+        baldes: Limites superiores dos baldes, em ordem crescente
+    """
+
+    tipo = 'histogram'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                 baldes: Sequence[float] = BALDES_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.baldes = tuple(baldes)
+        # Por série: contagem de cada balde (não acumulada, +Inf no fim), soma e total
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores_rotulos: str) -> None:
+        """Registra uma observação (em segundos) na série dos rótulos informados."""
+        if not METRICAS_ATIVAS:
+            return
+        balde = bisect_left(self.baldes, valor)
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                serie = self._series[valores_rotulos] = [[0] * (len(self.baldes) + 1), 0.0, 0]
+            serie[0][balde] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def soma(self, *valores_rotulos: str) -> float:
+        """Tempo total observado numa série."""
+        serie = self._series.get(valores_rotulos)
+        return serie[1] if serie else 0.0
+
+    def total(self, *valores_rotulos: str) -> int:
+        """Quantidade de observações numa série."""
+        serie = self._series.get(valores_rotulos)
+        return serie[2] if serie else 0
+
+    def _instantaneo(self) -> List:
+        with self._lock:
+            return [[list(chave), [list(serie[0]), serie[1], serie[2]]] for chave, serie in self._series.items()]
+
+    def _mesclar(self, series: List) -> None:
+        with self._lock:
+            for chave, (contagens, soma, total) in series:
+                chave = tuple(chave)
+                serie = self._series.get(chave)
+                if serie is None:
+                    serie = self._series[chave] = [[0] * (len(self.baldes) + 1), 0.0, 0]
+                serie[0] = [a + b for a, b in zip(serie[0], contagens)]
+                serie[1] += soma
+                serie[2] += total
+
+    def _zerar(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def _linhas(self, series: Dict) -> List[str]:
+        linhas = []
+        for chave, (contagens, soma, total) in sorted(series.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.baldes + (float('inf'),), contagens):
+                acumulado += contagem
+                le = '+Inf' if limite == float('inf') else repr(limite)
+                rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{le}"')
+                linhas.append(f'{self.nome}_bucket{rotulos} {acumulado}')
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f'{self.nome}_sum{rotulos} {_formatar_numero(soma)}')
+            linhas.append(f'{self.nome}_count{rotulos} {total}')
+        return linhas
+
+
+class Cronometro:
+    """
+    Mede etapas consecutivas: cada ``marcar(etapa)`` registra o tempo desde a
+    marca anterior (ou desde a criação) na série da etapa do histograma.
+    """
+
+    __slots__ = ('_histograma', '_ultimo')
+
+    def __init__(self, histograma: Histograma):
+        self._histograma = histograma
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, etapa: str) -> None:
+        agora = time.perf_counter()
+        self._histograma.observar(agora - self._ultimo, etapa)
+        self._ultimo = agora
+
+
+class Registro:
+    """Conjunto de métricas do processo."""
+
+    def __init__(self):
+        self.metricas: Dict[str, object] = {}
+        self._ultima_gravacao = 0.0
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self.metricas.setdefault(nome, Contador(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                   baldes: Sequence[float] = BALDES_PADRAO) -> Histograma:
+        return self.metricas.setdefault(nome, Histograma(nome, ajuda, rotulos, baldes))
+
+    def instantaneo(self) -> Dict[str, List]:
+        """Cópia serializável (JSON) de todas as séries."""
+        return {nome: metrica._instantaneo() for nome, metrica in self.metricas.items()}
+
+    def mesclar(self, instantaneo: Dict[str, List]) -> None:
+        """Soma um instantâneo (p.ex. de outro processo) às séries deste registro."""
+        for nome, series in instantaneo.items():
+            if nome in self.metricas:
+                self.metricas[nome]._mesclar(series)
+
+    def zerar(self) -> None:
+        for metrica in self.metricas.values():
+            metrica._zerar()
+
+    def exportar_prometheus(self, instantaneos: Optional[List[Dict[str, List]]] = None) -> str:
+        """
+        Texto no formato de exposição do Prometheus.
+
+        Args:
+            instantaneos: Instantâneos a somar no lugar do registro local
+                (p.ex. os de todos os workers); usa o próprio registro se None
+        """
+        instantaneos = instantaneos if instantaneos is not None else [self.instantaneo()]
+        linhas = []
+        for nome, metrica in self.metricas.items():
+            series: Dict[Tuple[str, ...], object] = {}
+            for instantaneo in instantaneos:
+                for chave, valor in instantaneo.get(nome, []):
+                    chave = tuple(chave)
+                    if isinstance(metrica, Histograma):
+                        anterior = series.get(chave, [[0] * (len(metrica.baldes) + 1), 0.0, 0])
+                        series[chave] = [[a + b for a, b in zip(anterior[0], valor[0])],
+                                         anterior[1] + valor[1], anterior[2] + valor[2]]
+                    else:
+                        series[chave] = series.get(chave, 0) + valor
+            linhas.append(f'# HELP {nome} {metrica.ajuda}')
+            linhas.append(f'# TYPE {nome} {metrica.tipo}')
+            linhas.extend(metrica._linhas(series))
+        return '\n'.join(linhas) + '\n'
+
+    def gravar(self, diretorio: Path, forcar: bool = False) -> None:
+        """
+        Grava o instantâneo deste processo em ``<diretorio>/<pid>.json``, no
+        máximo a cada METRICAS_INTERVALO segundos (a menos que ``forcar``).
+        """
+        agora = time.monotonic()
+        if not forcar and agora - self._ultima_gravacao < METRICAS_INTERVALO:
+            return
+        self._ultima_gravacao = agora
+        diretorio.mkdir(parents=True, exist_ok=True)
+        destino = diretorio / f'{os.getpid()}.json'
+        temporario = destino.with_suffix('.json.tmp')
+        temporario.write_text(json.dumps(self.instantaneo()), encoding='utf-8')
+        os.replace(temporario, destino)
+
+    def ler_instantaneos(self, diretorio: Path) -> List[Dict[str, List]]:
+        """Instantâneos gravados por todos os processos em ``diretorio``."""
+        instantaneos = []
+        for caminho in sorted(diretorio.glob('*.json')):
+            try:
+                instantaneos.append(json.loads(caminho.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                continue
+        return instantaneos
+
+
+REGISTRO = Registro()
+
+ETAPAS = REGISTRO.histograma(
+    'gerador_etapa_segundos', 'Duração de cada etapa da geração de uma pessoa (amostrada)', ('etapa',))
+ETAPAS_LOTE = REGISTRO.histograma(
+    'gerador_lote_etapa_segundos', 'Duração de cada coluna do gerador em lote (por bloco)', ('etapa',))
+PESSOAS = REGISTRO.contador(
+    'gerador_pessoas_total', 'Pessoas geradas', ('modo',))
+RESERVA = REGISTRO.contador(
+    'reserva_pessoas_total', 'Pessoas pedidas à reserva pré-gerada, atendidas ou não (esgotada)', ('resultado',))
+CEP_CONSULTAS = REGISTRO.contador(
+    'cep_consultas_total', 'Consultas de CEP aos web services', ('servico', 'resultado'))
+CEP_CONSULTA_SEGUNDOS = REGISTRO.histograma(
+    'cep_consulta_segundos', 'Duração das consultas de CEP por web service', ('servico',))
+CEP_DISJUNTOR = REGISTRO.contador(
+    'cep_disjuntor_transicoes_total', 'Mudanças de estado do disjuntor de cada web service de CEP',
+    ('servico', 'estado'))
+CEP_TENTATIVAS = REGISTRO.contador(
+    'cep_tentativas_total', 'CEPs candidatos sorteados no modo online')
+CEP_FALLBACK = REGISTRO.contador(
+    'cep_fallback_offline_total', 'Endereços que recorreram ao índice offline após esgotar as tentativas')
+CEP_CACHE = REGISTRO.contador(
+    'cep_cache_total', 'Consultas ao cache de CEP por resultado', ('resultado',))
+EXPORTACAO_SEGUNDOS = REGISTRO.histograma(
+    'exportacao_segundos', 'Tempo de escrita por formato (sem o tempo de geração dos blocos)', ('formato',))
+EXPORTACAO_LINHAS = REGISTRO.contador(
+    'exportacao_linhas_total', 'Linhas exportadas por formato', ('formato',))
+HTTP_SEGUNDOS = REGISTRO.histograma(
+    'http_requisicao_segundos', 'Duração das requisições HTTP por endpoint', ('endpoint',))
+HTTP_REQUISICOES = REGISTRO.contador(
+    'http_requisicoes_total', 'Requisições HTTP por endpoint e status', ('endpoint', 'status'))
+
+
+class _CronometroInativo:
+    """Cronômetro que não mede nada (METRICAS=0 ou fora da amostra)."""
+
+    def marcar(self, etapa: str) -> None:
+        pass
+
+
+_CRONOMETRO_INATIVO = _CronometroInativo()
+
+
+_chamadas_amostradas = itertools.count()
+
+
+def cronometro(histograma: Histograma = ETAPAS, amostrado: bool = False) -> Cronometro:
+    """
+    Cronômetro de etapas (por padrão, as etapas da geração por pessoa).
+
+    Args:
+        histograma: Onde as marcas são registradas
+        amostrado: Mede só 1 a cada METRICAS_AMOSTRAGEM chamadas (caminhos
+            quentes, por pessoa); as demais recebem um cronômetro inativo
+    """
+    if not METRICAS_ATIVAS or (amostrado and next(_chamadas_amostradas) % METRICAS_AMOSTRAGEM):
+        return _CRONOMETRO_INATIVO
+    return Cronometro(histograma)
+
+
+def exportar_prometheus() -> str:
+    """Métricas do processo ou, com METRICAS_DIR, de todos os processos."""
+    if METRICAS_DIR:
+        diretorio = Path(METRICAS_DIR)
+        REGISTRO.gravar(diretorio, forcar=True)
+        return REGISTRO.exportar_prometheus(REGISTRO.ler_instantaneos(diretorio))
+    return REGISTRO.exportar_prometheus()
+
+
+def resumo() -> str:
+    """
+    Resumo legível das métricas do processo, para a CLI.
+
+    Returns:
+        str: Tabela de etapas, consultas de CEP e acertos do cache
+    """
+    linhas = []
+    for titulo, histograma in (('Etapas por pessoa', ETAPAS), ('Etapas do lote', ETAPAS_LOTE),
+                               ('Exportação', EXPORTACAO_SEGUNDOS), ('Consultas de CEP', CEP_CONSULTA_SEGUNDOS)):
+        series = sorted(histograma._series.items(), key=lambda item: -item[1][1])
+        if not series:
+            continue
+        linhas.append(f"   {titulo}:")
+        for chave, (_, soma, total) in series:
+            linhas.append(f"      {'/'.join(chave):<24} {total:>10,}x {soma:>9.3f}s "
+                          f"{soma / total * 1000:>10.4f} ms/chamada")
+
+    consultas = sorted(CEP_CONSULTAS._valores.items())
+    if consultas:
+        linhas.append("   Resultados das consultas de CEP:")
+        for (servico, resultado), valor in consultas:
+            linhas.append(f"      {servico}/{resultado:<16} {int(valor):>10,}")
+        linhas.append(f"      tentativas: {int(CEP_TENTATIVAS.valor()):,}, "
+                      f"fallback offline: {int(CEP_FALLBACK.valor()):,}")
+
+    cache = {chave[0]: valor for chave, valor in CEP_CACHE._valores.items()}
+    total_cache = sum(cache.values())
+    if total_cache:
+        acertos = cache.get('memoria', 0) + cache.get('disco', 0)
+        linhas.append(f"   Cache de CEP: {acertos / total_cache:.1%} de acertos "
+                      f"(memória {int(cache.get('memoria', 0)):,}, disco {int(cache.get('disco', 0)):,}, "
+                      f"faltas {int(cache.get('falta', 0)):,})")
+
+    if not linhas:
+        return "   Nenhuma métrica registrada"
+    return '\n'.join(linhas)
@@ -0,0 +1,254 @@
+"""
+Tabelas pré-computadas de nomes e sobrenomes.
+
+Tudo o que não depende do sorteio é calculado uma única vez ao montar a
+tabela: formas minúsculas sem acentos e sem espaços (para e-mails), tamanhos
+e tabelas de alias para o sorteio ponderado pela frequência. Sortear um nome
+custa O(1), qualquer que seja o tamanho da lista, então listas grandes (p.ex.
+as frequências de nomes do IBGE) não deixam a geração por registro mais lenta.
+"""
+
+import csv
+import random
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+CAMINHO_NOMES = Path(__file__).parent / "dados" / "nomes.csv"
+CAMINHO_SOBRENOMES = Path(__file__).parent / "dados" / "sobrenomes.csv"
+
+
+def normalizar_para_email(texto: str) -> str:
+    """
+    Converte um nome para uso em e-mail: minúsculo, sem acentos e só com
+    letras ("João Pedro" -> "joaopedro"). Sem dígitos, o número acrescentado
+    pelos modelos de e-mail nunca se confunde com o nome.
+    """
+    sem_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ''.join(c for c in sem_acentos.lower() if c.isalpha())
+
+
+def ler_lista_nomes(caminho: Union[str, Path]) -> Tuple[List[str], List[float], List[Optional[str]]]:
+    """
+    Lê uma lista de nomes com frequências.
+
+    Aceita CSV ``nome,frequencia[,sexo]`` (cabeçalho opcional, como as listas
+    do IBGE) ou um nome por linha (todos com peso 1). Nomes em caixa alta são
+    convertidos para "Título".
+
+    Args:
+        caminho: Arquivo a ler
+
+    Returns:
+        Tuple: Nomes, pesos e sexo de cada nome ('F', 'M' ou None)
+    """
+    nomes, pesos, sexos = [], [], []
+    with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+        for numero, linha in enumerate(csv.reader(arquivo)):
+            if not linha or not linha[0].strip():
+                continue
+            try:
+                peso = float(linha[1]) if len(linha) > 1 and linha[1].strip() else 1.0
+            except ValueError:
+                if numero == 0:
+                    continue  # cabeçalho
+                raise
+            nome = linha[0].strip()
+            nomes.append(nome.title() if nome.isupper() else nome)
+            pesos.append(peso)
+            sexos.append((linha[2].strip().upper() or None) if len(linha) > 2 else None)
+    return nomes, pesos, sexos
+
+
+class TabelaAlias:
+    """
+    Sorteio ponderado em O(1) pelo método de alias (Vose): cada posição
+    guarda a probabilidade de ficar com o próprio índice e o índice
+    alternativo, de modo que um único número aleatório basta por sorteio.
+
+    Args:
+        pesos: Peso (frequência) de cada índice
+    """
+
+    def __init__(self, pesos: Sequence[float]):
+        n = len(pesos)
+        total = float(sum(pesos))
+        if n == 0 or total <= 0:
+            raise ValueError('A tabela de alias precisa de ao menos um peso positivo')
+
+        escalados = [peso * n / total for peso in pesos]
+        self.probabilidades: List[float] = [1.0] * n
+        self.aliases: List[int] = list(range(n))
+        pequenos = [i for i, peso in enumerate(escalados) if peso < 1.0]
+        grandes = [i for i, peso in enumerate(escalados) if peso >= 1.0]
+        while pequenos and grandes:
+            pequeno, grande = pequenos.pop(), grandes.pop()
+            self.probabilidades[pequeno] = escalados[pequeno]
+            self.aliases[pequeno] = grande
+            escalados[grande] -= 1.0 - escalados[pequeno]
+            (pequenos if escalados[grande] < 1.0 else grandes).append(grande)
+
+    def __len__(self) -> int:
+        return len(self.probabilidades)
+
+    def sortear(self, rng=random) -> int:
+        """Sorteia um índice (a parte inteira escolhe a posição, a fração decide o alias)."""
+        u = rng.random() * len(self.probabilidades)
+        i = int(u)
+        return i if u - i < self.probabilidades[i] else self.aliases[i]
+
+
+class TabelaNomes:
+    """
+    Nomes, sobrenomes e provedores de e-mail prontos para sorteio.
+
+    Args:
+        nomes: Prenomes
+        sobrenomes: Sobrenomes (ao menos 3)
+        provedores_email: Domínios de e-mail
+        pesos_nomes: Frequência de cada prenome (uniforme se None)
+        pesos_sobrenomes: Frequência de cada sobrenome (uniforme se None)
+        sexos_nomes: Sexo de cada prenome; nomes compostos só juntam prenomes do mesmo sexo
+        max_tamanho: Tamanho máximo do nome completo
+        prob_nome_composto: Chance de um segundo prenome (p.ex. "Maria Eduarda")
+    """
+
+    def __init__(self, nomes: Sequence[str], sobrenomes: Sequence[str], provedores_email: Sequence[str],
+                 pesos_nomes: Optional[Sequence[float]] = None,
+                 pesos_sobrenomes: Optional[Sequence[float]] = None,
+                 sexos_nomes: Optional[Sequence[Optional[str]]] = None,
+                 max_tamanho: int = 60, prob_nome_composto: float = 0.0):
+        self.nomes: Tuple[str, ...] = tuple(nomes)
+        self.sobrenomes: Tuple[str, ...] = tuple(sobrenomes)
+        self.provedores_email: Tuple[str, ...] = tuple(provedores_email)
+        self.sexos_nomes: Tuple[Optional[str], ...] = (
+            tuple(sexos_nomes) if sexos_nomes is not None else (None,) * len(self.nomes)
+        )
+        self.max_tamanho = max_tamanho
+        self.prob_nome_composto = prob_nome_composto
+
+        self.nomes_email: Tuple[str, ...] = tuple(normalizar_para_email(nome) for nome in self.nomes)
+        self.sobrenomes_email: Tuple[str, ...] = tuple(normalizar_para_email(s) for s in self.sobrenomes)
+        if not all(self.nomes_email) or not all(self.sobrenomes_email):
+            raise ValueError('Há nomes sem nenhuma letra ASCII')
+
+        self.tamanhos_nomes: Tuple[int, ...] = tuple(len(nome) for nome in self.nomes)
+        self.tamanhos_sobrenomes: Tuple[int, ...] = tuple(len(s) for s in self.sobrenomes)
+
+        pesos_nomes = list(pesos_nomes) if pesos_nomes is not None else [1.0] * len(self.nomes)
+        pesos_sobrenomes = list(pesos_sobrenomes) if pesos_sobrenomes is not None else [1.0] * len(self.sobrenomes)
+        if sum(1 for peso in pesos_sobrenomes if peso > 0) < 3:
+            raise ValueError('A tabela precisa de ao menos 3 sobrenomes com frequência positiva')
+        self.alias_nomes = TabelaAlias(pesos_nomes)
+        self.alias_sobrenomes = TabelaAlias(pesos_sobrenomes)
+
+        # Prenomes de cada sexo (índices na lista geral) com tabelas de alias próprias
+        indices_por_sexo: Dict[Optional[str], List[int]] = {}
+        for indice, sexo in enumerate(self.sexos_nomes):
+            indices_por_sexo.setdefault(sexo, []).append(indice)
+        self.indices_por_sexo: Dict[Optional[str], Tuple[int, ...]] = {
+            sexo: tuple(indices) for sexo, indices in indices_por_sexo.items()
+            if any(pesos_nomes[i] > 0 for i in indices)
+        }
+        self.alias_por_sexo: Dict[Optional[str], TabelaAlias] = {
+            sexo: TabelaAlias([pesos_nomes[i] for i in indices])
+            for sexo, indices in self.indices_por_sexo.items()
+        }
+
+    def sortear_indice_nome(self, rng=random, sexo: Optional[str] = None) -> int:
+        """Sorteia o índice de um prenome, de qualquer sexo ou do sexo pedido."""
+        if sexo is None:
+            return self.alias_nomes.sortear(rng)
+        if sexo not in self.alias_por_sexo:
+            raise ValueError(f"Não há prenomes do sexo {sexo!r}")
+        return self.indices_por_sexo[sexo][self.alias_por_sexo[sexo].sortear(rng)]
+
+    def _sortear_sobrenomes(self, rng, quantidade: int) -> List[str]:
+        """Sorteia ``quantidade`` sobrenomes distintos."""
+        escolhidos: List[str] = []
+        while len(escolhidos) < quantidade:
+            sobrenome = self.sobrenomes[self.alias_sobrenomes.sortear(rng)]
+            if sobrenome not in escolhidos:
+                escolhidos.append(sobrenome)
+        return escolhidos
+
+    def _sortear_prenomes(self, rng, sexo: Optional[str]) -> List[str]:
+        """Sorteia o prenome e, às vezes, um segundo prenome do mesmo sexo."""
+        primeiro = self.sortear_indice_nome(rng, sexo)
+        prenomes = [self.nomes[primeiro]]
+        if self.prob_nome_composto and rng.random() < self.prob_nome_composto:
+            segundo = self.sortear_indice_nome(rng, self.sexos_nomes[primeiro])
+            if segundo != primeiro:
+                prenomes.append(self.nomes[segundo])
+        return prenomes
+
+    def sortear_nome(self, rng=random, sexo: Optional[str] = None) -> str:
+        """
+        Sorteia um nome completo com 1 a 3 sobrenomes distintos.
+
+        Args:
+            rng: Fonte de aleatoriedade
+            sexo: 'F' ou 'M' para restringir o prenome (qualquer se None)
+        """
+        while True:
+            partes = self._sortear_prenomes(rng, sexo)
+            partes += self._sortear_sobrenomes(rng, rng.randrange(1, 4))
+            nome = ' '.join(partes)
+            if len(nome) <= self.max_tamanho:
+                return nome
+
+    def sortear_email(self, rng=random, numero: Optional[int] = None) -> str:
+        """
+        Sorteia um e-mail. O modelo é escolhido primeiro e só as partes que
+        ele usa são sorteadas e formatadas.
+
+        Args:
+            rng: Fonte de aleatoriedade
+            numero: Se informado, é o número de todos os modelos (no lugar do
+                sorteado). Como nomes não têm dígitos, números distintos dão
+                e-mails distintos (modo único)
+        """
+        modelo = rng.randrange(4)
+        nome = self.nomes_email[self.alias_nomes.sortear(rng)]
+        if numero is not None:
+            if modelo == 0:
+                local = f"{nome}{numero}"
+            else:
+                sobrenome = self.sobrenomes_email[self.alias_sobrenomes.sortear(rng)]
+                if modelo == 1:
+                    local = f"{nome}.{sobrenome}{numero}"
+                elif modelo == 2:
+                    local = f"{nome}{sobrenome[0]}{numero}"
+                else:
+                    local = f"{sobrenome}{nome[0]}{numero}"
+        elif modelo == 0:
+            local = f"{nome}{rng.randint(1, 99)}"
+        else:
+            sobrenome = self.sobrenomes_email[self.alias_sobrenomes.sortear(rng)]
+            if modelo == 1:
+                local = f"{nome}.{sobrenome}"
+            elif modelo == 2:
+                local = f"{nome}{sobrenome[0]}{rng.randint(10, 99)}"
+            else:
+                local = f"{sobrenome}{nome[0]}{rng.randint(1, 99)}"
+        return f"{local}@{rng.choice(self.provedores_email)}"
+
+
+def carregar_tabela_nomes(caminho_nomes: Union[str, Path, None] = None,
+                          caminho_sobrenomes: Union[str, Path, None] = None,
+                          **opcoes) -> TabelaNomes:
+    """
+    Monta a tabela a partir dos arquivos de prenomes e sobrenomes.
+
+    Args:
+        caminho_nomes: CSV de prenomes (padrão: ``dados/nomes.csv``)
+        caminho_sobrenomes: CSV de sobrenomes (padrão: ``dados/sobrenomes.csv``)
+        **opcoes: Repassadas para ``TabelaNomes`` (provedores_email, max_tamanho...)
+
+    Returns:
+        TabelaNomes: Tabela pronta para sorteio
+    """
+    nomes, pesos_nomes, sexos = ler_lista_nomes(caminho_nomes or CAMINHO_NOMES)
+    sobrenomes, pesos_sobrenomes, _ = ler_lista_nomes(caminho_sobrenomes or CAMINHO_SOBRENOMES)
+    return TabelaNomes(nomes, sobrenomes, pesos_nomes=pesos_nomes, pesos_sobrenomes=pesos_sobrenomes,
+                       sexos_nomes=sexos, **opcoes)
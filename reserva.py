@@ -0,0 +1,187 @@
+"""
+Reserva de pessoas pré-geradas para as requisições pequenas.
+
+Sem semente, ``/api/gerar-pessoa`` e ``/api/gerar-multiplas`` não precisam
+de pessoas específicas, só de pessoas novas: em vez de gerá-las (e, no modo
+online, consultar os CEPs) durante a requisição, retiram-nas de uma reserva
+que uma thread em segundo plano mantém abastecida. Quando a reserva cai
+abaixo de ``RESERVA_MINIMO`` a thread gera pessoas até ``RESERVA_MAXIMO``;
+se ela se esgota, a requisição gera o que faltar como antes.
+
+Cada pessoa sai da reserva uma única vez. A thread e o conteúdo são do
+processo: depois do fork de um worker a reserva recomeça vazia, para que
+dois workers não entreguem as mesmas pessoas.
+"""
+
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from functools import lru_cache
+from typing import List, Optional
+
+import gerador
+import metricas
+
+# Com a reserva abaixo do mínimo, a thread gera pessoas até o máximo (0 desativa)
+RESERVA_MINIMO = int(os.getenv('RESERVA_MINIMO', '200'))
+RESERVA_MAXIMO = int(os.getenv('RESERVA_MAXIMO', '1000'))
+# Pessoas geradas por rodada (no modo online, CEPs resolvidos juntos)
+RESERVA_TAMANHO_LOTE = int(os.getenv('RESERVA_TAMANHO_LOTE', '50'))
+# Pausa (s) antes de tentar de novo quando a geração falha
+_ESPERA_APOS_FALHA = 1.0
+
+
+# Reservas vivas do processo, esvaziadas no filho após o fork (um único hook para todas)
+_reservas: "weakref.WeakSet[ReservaPessoas]" = weakref.WeakSet()
+
+
+def _reiniciar_apos_fork() -> None:
+    for reserva in list(_reservas):
+        reserva._apos_fork()
+
+
+os.register_at_fork(after_in_child=_reiniciar_apos_fork)
+
+
+class ReservaPessoas:
+    """
+    Pessoas completas (registros gerador.Pessoa) prontas para entrega.
+
+    Args:
+        minimo: Abaixo deste nível a reserva é reabastecida
+        maximo: Nível até onde a reserva é reabastecida (0 desativa a reserva)
+        tamanho_lote: Pessoas geradas por rodada de reabastecimento
+    """
+
+    def __init__(self, minimo: int = RESERVA_MINIMO, maximo: int = RESERVA_MAXIMO,
+                 tamanho_lote: int = RESERVA_TAMANHO_LOTE):
+        if maximo and not 0 <= minimo <= maximo:
+            raise ValueError('O mínimo da reserva deve estar entre 0 e o máximo')
+        self.minimo = minimo
+        self.maximo = maximo
+        self.tamanho_lote = max(1, tamanho_lote)
+        self._pessoas: deque = deque()
+        self._condicao = threading.Condition()
+        # Criada no primeiro uso: threads não sobrevivem ao fork dos workers
+        self._thread: Optional[threading.Thread] = None
+        _reservas.add(self)
+
+    @property
+    def ativa(self) -> bool:
+        return self.maximo > 0
+
+    def __len__(self) -> int:
+        return len(self._pessoas)
+
+    def _apos_fork(self) -> None:
+        """No processo filho a reserva recomeça vazia e sem thread."""
+        self._pessoas = deque()
+        self._condicao = threading.Condition()
+        self._thread = None
+
+    def _abaixo_do_minimo(self) -> bool:
+        return len(self._pessoas) < self.minimo or not self._pessoas
+
+    def _iniciar(self) -> None:
+        """Inicia a thread de reabastecimento, se ainda não estiver rodando."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._reabastecer, name='reserva-pessoas', daemon=True)
+            self._thread.start()
+
+    def _gerar(self, quantidade: int) -> List[gerador.Pessoa]:
+        """Gera pessoas completas; no modo online os endereços são resolvidos em paralelo."""
+        if gerador.CEP_ONLINE:
+            enderecos = gerador.gerar_enderecos_online(quantidade)
+        else:
+            enderecos = [None] * quantidade
+        pessoas = [gerador.gerar_registro(endereco) for endereco in enderecos]
+        metricas.PESSOAS.inc('reserva', valor=quantidade)
+        return pessoas
+
+    def _reabastecer(self) -> None:
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(self._abaixo_do_minimo)
+                faltam = self.maximo - len(self._pessoas)
+            while faltam > 0:
+                try:
+                    pessoas = self._gerar(min(faltam, self.tamanho_lote))
+                except Exception:
+                    # Falhas (p.ex. de rede) não derrubam a thread; a requisição gera o que faltar
+                    pessoas = []
+                with self._condicao:
+                    self._pessoas.extend(pessoas)
+                    faltam = self.maximo - len(self._pessoas)
+                    self._condicao.notify_all()
+                if not pessoas:
+                    time.sleep(_ESPERA_APOS_FALHA)
+                    break
+
+    def aguardar(self, quantidade: int, timeout: Optional[float] = None) -> bool:
+        """
+        Inicia a reserva (se preciso) e espera até ter ``quantidade`` pessoas.
+
+        Returns:
+            bool: True se o nível foi atingido dentro do prazo
+        """
+        if not self.ativa:
+            return False
+        with self._condicao:
+            self._iniciar()
+            return self._condicao.wait_for(lambda: len(self._pessoas) >= quantidade, timeout)
+
+    def retirar(self, quantidade: int = 1) -> List[gerador.Pessoa]:
+        """
+        Retira até ``quantidade`` pessoas da reserva, sem esperar.
+
+        Args:
+            quantidade: Pessoas desejadas
+
+        Returns:
+            List[Pessoa]: Pessoas retiradas; menos que o pedido se a reserva
+            estiver esgotada (ou desativada)
+        """
+        if not self.ativa:
+            return []
+        with self._condicao:
+            self._iniciar()
+            pessoas = [self._pessoas.popleft() for _ in range(min(quantidade, len(self._pessoas)))]
+            if self._abaixo_do_minimo():
+                self._condicao.notify_all()
+        metricas.RESERVA.inc('atendida', valor=len(pessoas))
+        if len(pessoas) < quantidade:
+            metricas.RESERVA.inc('esgotada', valor=quantidade - len(pessoas))
+        return pessoas
+
+
+def obter_pessoas(quantidade: int, campos: Optional[List[str]] = None) -> List[gerador.Pessoa]:
+    """
+    Pessoas aleatórias (sem semente) da reserva, completando com pessoas
+    geradas na hora se ela não tiver o bastante.
+
+    Args:
+        quantidade: Número de pessoas
+        campos: Colunas que serão usadas; as geradas na hora só têm estas
+
+    Returns:
+        List[Pessoa]: Registros; ``plano(campos)`` ou ``aninhado(campos)`` dão a projeção
+    """
+    pessoas = obter_reserva().retirar(quantidade)
+    faltam = quantidade - len(pessoas)
+    if faltam:
+        if gerador.CEP_ONLINE and gerador.precisa_endereco(campos):
+            enderecos = gerador.gerar_enderecos_online(faltam, random)
+        else:
+            enderecos = [None] * faltam
+        pessoas.extend(gerador.gerar_registro(endereco, campos=campos) for endereco in enderecos)
+        metricas.PESSOAS.inc('registro', valor=faltam)
+    return pessoas
+
+
+@lru_cache(maxsize=None)
+def obter_reserva() -> ReservaPessoas:
+    """Reserva de pessoas compartilhada pelo processo."""
+    return ReservaPessoas()
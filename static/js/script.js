@@ -23,6 +23,8 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Variável global para armazenar dados gerados
     let dadosGerados = [];
+    // Id do lote guardado no servidor: as exportações reaproveitam os mesmos dados
+    let loteId = null;
 
     // ========================================
     // FUNÇÕES AUXILIARES
@@ -179,6 +181,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
                 if (data.success) {
                     dadosGerados = [data.data];
+                    loteId = data.lote_id;
                     resultadosDiv.innerHTML = '';
                     resultadosDiv.appendChild(criarCardPessoa(data.data, 0));
                     atualizarEstatisticas();
@@ -220,6 +223,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
                 if (data.success) {
                     dadosGerados = data.data;
+                    loteId = data.lote_id;
                     resultadosDiv.innerHTML = '';
                     
                     data.data.forEach((pessoa, index) => {
@@ -256,7 +260,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 const response = await fetch('/api/exportar-excel', {
                     method:  'POST',
                     headers: { 'Content-Type':  'application/json' },
-                    body: JSON.stringify({ quantidade: dadosGerados.length })
+                    body: JSON.stringify({ lote_id: loteId })
                 });
 
                 if (response.ok) {
@@ -267,12 +271,14 @@ document.addEventListener('DOMContentLoaded', function() {
                     a.download = `dados_${Date.now()}.xlsx`;
                     a.click();
                     mostrarNotificacao('✅ Excel baixado!', 'success');
+                } else if (response.status === 404) {
+                    throw new Error('Os dados expiraram no servidor; gere novamente');
                 } else {
                     throw new Error('Erro ao exportar');
                 }
             } catch (error) {
                 console.error('Erro:', error);
-                mostrarNotificacao('❌ Erro ao exportar Excel', 'error');
+                mostrarNotificacao('❌ Erro ao exportar Excel: ' + error.message, 'error');
             } finally {
                 setLoading(this, false);
             }
@@ -295,7 +301,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 const response = await fetch('/api/exportar-csv', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ quantidade: dadosGerados. length })
+                    body: JSON.stringify({ lote_id: loteId })
                 });
 
                 if (response.ok) {
@@ -306,12 +312,14 @@ document.addEventListener('DOMContentLoaded', function() {
                     a.download = `dados_${Date.now()}.csv`;
                     a.click();
                     mostrarNotificacao('✅ CSV baixado!', 'success');
+                } else if (response.status === 404) {
+                    throw new Error('Os dados expiraram no servidor; gere novamente');
                 } else {
                     throw new Error('Erro ao exportar');
                 }
             } catch (error) {
                 console.error('Erro:', error);
-                mostrarNotificacao('❌ Erro ao exportar CSV', 'error');
+                mostrarNotificacao('❌ Erro ao exportar CSV: ' + error.message, 'error');
             } finally {
                 setLoading(this, false);
             }
@@ -365,6 +373,7 @@ document.addEventListener('DOMContentLoaded', function() {
     if (btnLimpar) {
         btnLimpar.addEventListener('click', function() {
             dadosGerados = [];
+            loteId = null;
             if (resultadosDiv) resultadosDiv.innerHTML = '';
             if (validacaoResultado) validacaoResultado.innerHTML = '';
             if (estatisticasDiv) estatisticasDiv.style.display = 'none';
@@ -1,8 +1,23 @@
 """
 Testes para a aplicação Flask
 """
+import io
+import tempfile
 import unittest
 import json
+import time
+from unittest.mock import patch
+
+import pandas as pd
+from openpyxl import load_workbook
+
+import app as modulo_app
+import cep_disjuntor
+import gerador
+import gerador_lote
+import jobs
+import lotes
+import reserva
 from app import app
 
 class TestApp(unittest.TestCase):
@@ -11,6 +26,14 @@ class TestApp(unittest.TestCase):
         """Configura o cliente de teste"""
         self.app = app.test_client()
         self.app.testing = True
+        # Endereços sempre do índice offline, mesmo com CEP_ONLINE=1 no ambiente
+        sem_rede = patch.object(gerador, 'CEP_ONLINE', False)
+        sem_rede.start()
+        self.addCleanup(sem_rede.stop)
+        # Lotes só em memória: os testes não gravam em dados_gerados/lotes.sqlite3
+        sem_disco = patch.object(lotes, 'obter_armazem', return_value=lotes.ArmazemLotes(None))
+        sem_disco.start()
+        self.addCleanup(sem_disco.stop)
     
     def test_index_route(self):
         """Testa se a rota principal carrega"""
@@ -27,6 +50,22 @@ class TestApp(unittest.TestCase):
         self.assertIn('data', data)
         self.assertIn('Nome Completo', data['data'])
     
+    def test_gerar_da_reserva(self):
+        """Testa se requisições sem seed saem da reserva, sem gerar na hora"""
+        self.assertTrue(reserva.obter_reserva().aguardar(10, timeout=10))
+        with patch.object(gerador, 'gerar_dados_pessoa', side_effect=AssertionError):
+            pessoa = self.app.post('/api/gerar-pessoa', json={'campos': ['CPF']}).get_json()
+            pessoas = self.app.post('/api/gerar-multiplas', json={'quantidade': 3}).get_json()
+        self.assertEqual(list(pessoa['data']), ['CPF'])
+        self.assertEqual([set(p) for p in pessoas['data']], [set(gerador.COLUNAS_ORDEM)] * 3)
+    
+    def test_saude_cep(self):
+        """Testa o endpoint de estado dos web services de CEP"""
+        cep_disjuntor.obter_disjuntor('viacep')
+        data = self.app.get('/api/cep/saude').get_json()
+        self.assertTrue(data['success'])
+        self.assertIn(data['servicos']['viacep']['estado'], ('fechado', 'aberto', 'meio_aberto'))
+    
     def test_validar_cpf_valido(self):
         """Testa validação de CPF válido"""
         response = self.app.post('/api/validar-cpf',
@@ -39,6 +78,232 @@ class TestApp(unittest.TestCase):
         response = self.app.post('/api/gerar-multiplas',
                                 json={'quantidade': 101})
         self.assertEqual(response.status_code, 400)
+    
+    def test_exportar_csv_em_fluxo(self):
+        """Testa o download CSV gerado em blocos"""
+        response = self.app.post('/api/exportar-csv', json={'quantidade': 250})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        linhas = response.get_data().decode('utf-8-sig').splitlines()
+        self.assertTrue(linhas[0].startswith('Nome Completo,CPF'))
+        self.assertEqual(len(linhas), 251)
+    
+    def test_exportar_excel(self):
+        """Testa o download Excel gravado em blocos"""
+        response = self.app.post('/api/exportar-excel', json={'quantidade': 30})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[:2], b'PK')
+        response.close()
+    
+    def test_gerar_pessoa_com_seed(self):
+        """Testa se a mesma semente devolve a mesma pessoa"""
+        primeira = self.app.post('/api/gerar-pessoa', json={'seed': 42}).get_json()
+        segunda = self.app.post('/api/gerar-pessoa', json={'seed': 42}).get_json()
+        self.assertEqual(primeira['data'], segunda['data'])
+        multiplas = self.app.post('/api/gerar-multiplas', json={'quantidade': 2, 'seed': 42}).get_json()
+        listagem = self.app.get('/api/pessoas?seed=42&limit=1').get_json()
+        plana = gerador.achatar_dicionario(primeira['data'])
+        self.assertEqual(plana, multiplas['data'][0])
+        self.assertEqual(plana, listagem['data'][0])
+    
+    def test_mesma_semente_em_todos_os_caminhos(self):
+        """Testa se exportação, fluxo, job, listagem e gerar-multiplas dão as mesmas linhas para a semente"""
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        gerenciador = jobs.GerenciadorJobs(diretorio.name, workers=1, tamanho_bloco=2500)
+        with patch.object(modulo_app, 'TAMANHO_BLOCO_STREAM', 3000), \
+                patch.object(modulo_app, 'TAMANHO_BLOCO_NDJSON', 700), \
+                patch.object(jobs, 'obter_gerenciador', return_value=gerenciador), \
+                patch.object(gerador, 'CEP_ONLINE', True):
+            resposta = self.app.post('/api/exportar-csv', json={'quantidade': 12000, 'seed': 7})
+            csv = pd.read_csv(io.BytesIO(resposta.get_data()), dtype=str, encoding='utf-8-sig')
+            resposta.close()
+            fluxo = self.app.get('/api/gerar-stream?quantidade=12000&seed=7').get_data(as_text=True)
+            job_id = self.app.post('/api/jobs', json={'quantidade': 12000, 'seed': 7}).get_json()['data']['id']
+            pagina = self.app.get('/api/pessoas?seed=7&offset=4990&limit=20').get_json()['data']
+            multiplas = self.app.post('/api/gerar-multiplas', json={'quantidade': 100, 'seed': 7}).get_json()['data']
+            pessoa = self.app.post('/api/gerar-pessoa', json={'seed': 7}).get_json()['data']
+        
+        cpfs = list(csv['CPF'])
+        self.assertEqual(len(cpfs), 12000)
+        self.assertEqual([json.loads(linha)['CPF'] for linha in fluxo.splitlines()], cpfs)
+        self.assertEqual([registro['CPF'] for registro in pagina], cpfs[4990:5010])
+        self.assertEqual([registro['CPF'] for registro in multiplas], cpfs[:100])
+        self.assertEqual(pessoa['CPF'], cpfs[0])
+        esperado = gerador_lote.gerar_faixa(7, 0, 12000)
+        self.assertEqual(list(csv['Nome Completo']), list(esperado['Nome Completo']))
+        
+        for _ in range(600):
+            job = gerenciador.obter(job_id)
+            if job['status'] in ('concluido', 'erro'):
+                break
+            time.sleep(0.05)
+        self.assertEqual(job['status'], 'concluido')
+        resultado = pd.read_csv(gerenciador.caminho_resultado(job), dtype=str, encoding='utf-8-sig')
+        self.assertEqual(list(resultado['CPF']), cpfs)
+    
+    def test_projecao_de_campos(self):
+        """Testa o parâmetro campos nos endpoints de geração e exportação"""
+        pessoa = self.app.post('/api/gerar-pessoa', json={'campos': ['CPF']}).get_json()['data']
+        self.assertEqual(list(pessoa), ['CPF'])
+        pessoas = self.app.post('/api/gerar-multiplas',
+                                json={'quantidade': 3, 'campos': 'Celular,Nome Completo'}).get_json()['data']
+        self.assertEqual([list(p) for p in pessoas], [['Celular', 'Nome Completo']] * 3)
+        response = self.app.post('/api/exportar-csv', json={'quantidade': 5, 'campos': ['Email']})
+        self.assertEqual(response.get_data().decode('utf-8-sig').splitlines()[0], 'Email')
+        response = self.app.post('/api/exportar-parquet', json={'quantidade': 5, 'campos': 'Email'})
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        response = self.app.post('/api/gerar-multiplas', json={'quantidade': 3, 'campos': ['Idade']})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_esquema_declarativo(self):
+        """Testa o parâmetro esquema nos endpoints"""
+        definicao = {'campos': [{'nome': 'documento', 'gerador': 'cpf', 'formato': 'mascarado'},
+                                {'nome': 'uf', 'caminho': 'endereco.uf', 'gerador': 'estado'}]}
+        pessoas = self.app.post('/api/gerar-multiplas',
+                                json={'quantidade': 3, 'seed': 1, 'esquema': definicao}).get_json()['data']
+        self.assertEqual(len(pessoas), 3)
+        self.assertEqual(list(pessoas[0]['endereco']), ['uf'])
+        self.assertEqual(len(pessoas[0]['documento']), 14)
+        response = self.app.post('/api/exportar-csv', json={'quantidade': 5, 'esquema': definicao})
+        self.assertEqual(response.get_data().decode('utf-8-sig').splitlines()[0], 'documento,uf')
+        response = self.app.get('/api/gerar-stream?quantidade=2&esquema=' + json.dumps(definicao))
+        self.assertEqual(list(json.loads(response.get_data(as_text=True).splitlines()[0])), ['documento', 'uf'])
+        response = self.app.post('/api/exportar-csv',
+                                 json={'quantidade': 5, 'esquema': definicao, 'campos': ['CPF']})
+        self.assertEqual(response.status_code, 400)
+        response = self.app.post('/api/exportar-csv', json={'quantidade': 5, 'esquema': 'esquemas/clientes.yaml'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_exportar_lote_gerado(self):
+        """Testa se a exportação por lote_id devolve as mesmas pessoas, sem gerar de novo"""
+        resposta = self.app.post('/api/gerar-multiplas', json={'quantidade': 4}).get_json()
+        with patch.object(gerador_lote, 'iterar_lotes', side_effect=AssertionError):
+            response = self.app.post('/api/exportar-csv', json={'lote_id': resposta['lote_id']})
+            linhas = response.get_data().decode('utf-8-sig').splitlines()
+            self.assertEqual(len(linhas), 5)
+            self.assertIn(resposta['data'][0]['Email'], linhas[1])
+            response = self.app.post('/api/exportar-arrow', json={'lote_id': resposta['lote_id']})
+            self.assertEqual(response.status_code, 200)
+            response.close()
+        lote_id = self.app.post('/api/gerar-pessoa', json={'campos': ['CPF']}).get_json()['lote_id']
+        response = self.app.post('/api/exportar-excel', json={'lote_id': lote_id})
+        planilha = load_workbook(io.BytesIO(response.data), read_only=True).active
+        self.assertEqual([linha[0] for linha in planilha.iter_rows(values_only=True)][0], 'CPF')
+        response.close()
+        response = self.app.post('/api/exportar-csv', json={'lote_id': 'f' * 32})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_seed_invalida(self):
+        """Testa a validação da semente"""
+        response = self.app.post('/api/gerar-multiplas', json={'quantidade': 2, 'seed': -1})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_exportar_parquet_e_arrow(self):
+        """Testa os downloads Parquet e Arrow"""
+        response = self.app.post('/api/exportar-parquet', json={'quantidade': 20, 'tamanho_row_group': 8})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[:4], b'PAR1')
+        response.close()
+        
+        response = self.app.post('/api/exportar-arrow', json={'quantidade': 20, 'feather': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[:6], b'ARROW1')
+        response.close()
+    
+    def test_validar_cpfs_em_lote(self):
+        """Testa a validação em lote (JSON e texto com um CPF por linha)"""
+        cpfs = ['529.982.247-25', '11111111111', '12345678900', '123']
+        data = self.app.post('/api/validar-cpfs', json=cpfs).get_json()
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(data['validos'], 1)
+        self.assertEqual(data['invalidos'], 3)
+        self.assertEqual([r['valido'] for r in data['resultados']], [True, False, False, False])
+        
+        response = self.app.post('/api/validar-cpfs', data='\n'.join(cpfs), content_type='text/plain')
+        self.assertEqual(response.get_json()['validos'], 1)
+    
+    def test_listar_pessoas_paginado(self):
+        """Testa se páginas do conjunto virtual se encaixam e independem do tamanho da página"""
+        pagina = self.app.get('/api/pessoas?seed=3&offset=999999998&limit=4').get_json()
+        self.assertEqual(len(pagina['data']), 4)
+        self.assertEqual(pagina['proximo_offset'], 1000000002)
+        metade = self.app.get('/api/pessoas?seed=3&offset=1000000000&limit=2').get_json()
+        self.assertEqual(pagina['data'][2:], metade['data'])
+        cpfs = self.app.get('/api/pessoas?seed=3&offset=999999998&limit=4&campos=CPF').get_json()['data']
+        self.assertEqual(cpfs, [gerador.gerar_pessoa(999999998 + i, 3, campos=['CPF']).plano(['CPF']) for i in range(4)])
+        for url in ('/api/pessoas', '/api/pessoas?seed=3&limit=0', '/api/pessoas?seed=3&offset=-1',
+                    '/api/pessoas?seed=x', '/api/pessoas?seed=3&campos=Idade'):
+            self.assertEqual(self.app.get(url).status_code, 400, url)
+        with patch.object(gerador, 'gerar_multiplas_pessoas', side_effect=RuntimeError('falha')):
+            response = self.app.get('/api/pessoas?seed=3')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.get_json(), {'success': False, 'error': 'falha'})
+    
+    def test_gerar_stream_ndjson_e_sse(self):
+        """Testa o fluxo NDJSON com projeção de campos, o SSE e o fluxo sem fim"""
+        response = self.app.get('/api/gerar-stream?quantidade=3&seed=5&campos=Nome Completo,CPF')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        registros = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(registros), 3)
+        self.assertEqual(list(registros[0]), ['Nome Completo', 'CPF'])
+        
+        response = self.app.post('/api/gerar-stream', json={'quantidade': 3, 'seed': 5, 'formato': 'sse',
+                                                             'campos': ['Nome Completo', 'CPF']})
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        eventos = response.get_data(as_text=True).split('\n\n')[:-1]
+        self.assertEqual(json.loads(eventos[0][len('data: '):])['CPF'], registros[0]['CPF'])
+        
+        response = self.app.get('/api/gerar-stream', buffered=False)
+        linhas = 0
+        for trecho in response.response:
+            linhas += trecho.count(b'\n')
+            if linhas >= 2500:
+                break
+        response.close()
+        self.assertGreaterEqual(linhas, 2500)
+        
+        self.assertEqual(self.app.get('/api/gerar-stream?campos=Idade').status_code, 400)
+        self.assertEqual(self.app.get('/api/gerar-stream?unico=true').status_code, 400)
+    
+    def test_metricas_prometheus(self):
+        """Testa o endpoint /metrics depois de algumas requisições"""
+        self.app.post('/api/exportar-parquet', json={'quantidade': 10}).close()
+        response = self.app.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        texto = response.get_data(as_text=True)
+        self.assertIn('# TYPE gerador_lote_etapa_segundos histogram', texto)
+        self.assertIn('exportacao_linhas_total{formato="parquet"}', texto)
+        self.assertIn('http_requisicoes_total{endpoint="/api/exportar-parquet",status="200"}', texto)
+    
+    def test_job_em_segundo_plano(self):
+        """Testa o ciclo de vida de um job: criação, progresso e resultado"""
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        gerenciador = patch.object(jobs, 'obter_gerenciador',
+                                   return_value=jobs.GerenciadorJobs(diretorio.name, workers=1))
+        gerenciador.start()
+        self.addCleanup(gerenciador.stop)
+        
+        response = self.app.post('/api/jobs', json={'quantidade': 500, 'seed': 3})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['data']['id']
+        
+        for _ in range(600):
+            job = self.app.get(f'/api/jobs/{job_id}').get_json()['data']
+            if job['status'] in ('concluido', 'erro'):
+                break
+            time.sleep(0.05)
+        self.assertEqual(job['status'], 'concluido')
+        self.assertEqual(job['linhas'], 500)
+        
+        response = self.app.get(f'/api/jobs/{job_id}/result')
+        linhas = response.get_data().decode('utf-8-sig').splitlines()
+        self.assertEqual(len(linhas), 501)
+        response.close()
+        
+        self.assertEqual(self.app.get('/api/jobs/inexistente').status_code, 404)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
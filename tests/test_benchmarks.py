@@ -0,0 +1,56 @@
+"""
+Testes para o harness de benchmarks
+"""
+import unittest
+
+import gerador
+from benchmarks import executar
+
+class TestBenchmarks(unittest.TestCase):
+    
+    def test_medir(self):
+        """Testa as medidas de vazão e de memória de um caso"""
+        caso = executar.Caso('lista', 1000, lambda: (lambda: [0] * 100_000))
+        resultado = executar.medir(caso, repeticoes=1)
+        self.assertGreater(resultado['linhas_por_segundo'], 0)
+        self.assertGreaterEqual(resultado['pico_memoria_kb'], 700)
+    
+    def test_comparar(self):
+        """Testa a detecção de regressões de vazão e de memória"""
+        baseline = {'a': {'linhas_por_segundo': 1000, 'pico_memoria_kb': 4000},
+                    'b': {'linhas_por_segundo': 1000, 'pico_memoria_kb': 10}}
+        resultados = {'a': {'linhas_por_segundo': 600, 'pico_memoria_kb': 4500},
+                      'b': {'linhas_por_segundo': 500, 'pico_memoria_kb': 900},
+                      'novo': {'linhas_por_segundo': 1, 'pico_memoria_kb': 1}}
+        self.assertEqual(executar.comparar(resultados, baseline), [])
+        resultados['a']['pico_memoria_kb'] = 5100
+        resultados['b']['linhas_por_segundo'] = 499
+        regressoes = executar.comparar(resultados, baseline)
+        self.assertEqual(len(regressoes), 2)
+        self.assertTrue(regressoes[0].startswith('a: pico'))
+        self.assertTrue(regressoes[1].startswith('b: 499'))
+        self.assertEqual(executar.comparar(resultados, baseline, tolerancia_velocidade=None), regressoes[:1])
+        self.assertEqual(executar.comparar(resultados, baseline, tolerancia_memoria=None), regressoes[1:])
+    
+    def test_comparar_escala_pela_referencia(self):
+        """Testa se a vazão da baseline é escalada pela razão entre as referências"""
+        referencia = executar.CASO_REFERENCIA
+        baseline = {referencia: {'linhas_por_segundo': 1000, 'pico_memoria_kb': 10},
+                    'a': {'linhas_por_segundo': 1000, 'pico_memoria_kb': 10}}
+        # Máquina 4x mais lenta: 300 linhas/s está acima de 50% de 250
+        resultados = {referencia: {'linhas_por_segundo': 250, 'pico_memoria_kb': 10},
+                      'a': {'linhas_por_segundo': 300, 'pico_memoria_kb': 10}}
+        self.assertEqual(executar.comparar(resultados, baseline), [])
+        resultados['a']['linhas_por_segundo'] = 100
+        self.assertEqual(len(executar.comparar(resultados, baseline)), 1)
+    
+    def test_casos_sem_rede(self):
+        """Testa se a consulta de CEP fica desligada durante os benchmarks"""
+        self.assertEqual(len({caso.nome for caso in executar.CASOS}), len(executar.CASOS))
+        with executar.sem_consulta_cep():
+            self.assertFalse(gerador.CEP_ONLINE)
+            with self.assertRaises(RuntimeError):
+                gerador.buscar_cep_com_cache('01001000')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Testes para o resolvedor concorrente de CEPs, contra um servidor HTTP local
+"""
+import asyncio
+import unittest
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+
+import cep_async
+from cep_cache import CacheCEP
+from cep_disjuntor import ABERTO, FECHADO, Disjuntor
+
+ATRASO = {'viacep': 0.2, 'apicep': 0.2}
+INEXISTENTE = '99999999'
+FORA_DO_AR = set()
+
+class StubCEP(BaseHTTPRequestHandler):
+    """Imita ViaCEP (/viacep/<cep>/json/) e ApiCEP (/apicep/<cep>.json)"""
+    
+    def do_GET(self):
+        _, servico, resto = self.path.split('/', 2)
+        cep = resto[:8]
+        time.sleep(ATRASO[servico])
+        if servico in FORA_DO_AR:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if servico == 'viacep':
+            corpo = {'erro': True} if cep == INEXISTENTE else {
+                'cep': cep, 'logradouro': 'Rua Via', 'bairro': 'Centro',
+                'localidade': 'São Paulo', 'uf': 'SP'}
+        else:
+            corpo = {'status': 404} if cep == INEXISTENTE else {
+                'status': 200, 'code': cep, 'address': 'Rua Api', 'district': 'Centro',
+                'city': 'São Paulo', 'state': 'SP'}
+        dados = json.dumps(corpo).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+    
+    def log_message(self, *args):
+        pass
+
+class TestCepAsync(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), StubCEP)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{cls.servidor.server_port}'
+        cls.servicos = [
+            cep_async.Servico('viacep', base + '/viacep/{}/json/', cep_async._interpretar_viacep),
+            cep_async.Servico('apicep', base + '/apicep/{}.json', cep_async._interpretar_apicep),
+        ]
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+    
+    def setUp(self):
+        ATRASO.update(viacep=0.2, apicep=0.2)
+        FORA_DO_AR.clear()
+    
+    def resolver(self, ceps, **kwargs):
+        kwargs.setdefault('cache', CacheCEP(None))
+        kwargs.setdefault('disjuntores', {servico.nome: Disjuntor(servico.nome) for servico in self.servicos})
+        kwargs.setdefault('taxa_por_servico', 0)
+        return cep_async.resolver_ceps(ceps, servicos=self.servicos, **kwargs)
+    
+    def test_lote_em_paralelo(self):
+        """Testa se o tempo do lote é o da consulta mais lenta, não a soma"""
+        ceps = [f'0100{i:04d}' for i in range(20)]
+        inicio = time.monotonic()
+        resultado = self.resolver(ceps, concorrencia=20)
+        self.assertLess(time.monotonic() - inicio, 2.0)
+        self.assertEqual([e['cep'] for e in resultado], ceps)
+    
+    def test_corrida_entre_servicos(self):
+        """Testa se vale a resposta do serviço mais rápido e se fechar espera a consulta perdedora"""
+        ATRASO.update(viacep=1.5, apicep=0.0)
+        with cep_async.ResolvedorCEP(self.servicos, cache=CacheCEP(None), taxa_por_servico=0,
+                                     disjuntores={s.nome: Disjuntor(s.nome) for s in self.servicos}) as resolvedor:
+            inicio = time.monotonic()
+            resultado = asyncio.run(resolvedor.resolver_lote(['01001000']))
+            self.assertLess(time.monotonic() - inicio, 1.0)
+            self.assertEqual(resultado[0]['logradouro'], 'Rua Api')
+            ativas = []
+            threads = resolvedor._executor._threads
+            with patch.object(resolvedor._sessao, 'close',
+                              side_effect=lambda: ativas.append(any(t.is_alive() for t in threads))):
+                resolvedor.fechar()
+        self.assertGreaterEqual(time.monotonic() - inicio, 1.5)
+        self.assertEqual(ativas, [False])
+    
+    def test_resolvedor_do_processo(self):
+        """Testa se as chamadas sem opções compartilham o resolvedor e se ele é recriado após fork"""
+        with patch.object(cep_async, '_resolvedor', None), patch.object(cep_async, 'ResolvedorCEP') as classe:
+            classe.return_value.resolver_lote.side_effect = lambda ceps: asyncio.sleep(0, [None] * len(ceps))
+            self.assertEqual(cep_async.resolver_ceps(['01001000']), [None])
+            cep_async.resolver_ceps(['01001000', '01002000'])
+            self.assertEqual(classe.call_count, 1)
+            with patch('cep_async.os.getpid', return_value=-1):
+                cep_async.resolver_ceps(['01001000'])
+            self.assertEqual(classe.call_count, 2)
+    
+    def test_cep_inexistente_vai_para_cache_negativo(self):
+        """Testa o cache negativo quando os dois serviços negam o CEP"""
+        cache = CacheCEP(None)
+        self.assertEqual(self.resolver([INEXISTENTE], cache=cache), [None])
+        self.assertEqual(cache.obter(INEXISTENTE), (True, None))
+    
+    def test_limite_de_taxa(self):
+        """Testa o espaçamento das requisições por serviço"""
+        ATRASO.update(viacep=0.0, apicep=0.0)
+        inicio = time.monotonic()
+        self.resolver([f'0200{i:04d}' for i in range(5)], taxa_por_servico=10)
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.35)
+
+    def test_disjuntor_tira_servico_fora_do_ar(self):
+        """Testa se um serviço fora do ar deixa de ser consultado depois de algumas falhas"""
+        ATRASO.update(viacep=0.0, apicep=0.0)
+        FORA_DO_AR.add('viacep')
+        disjuntores = {servico.nome: Disjuntor(servico.nome, falhas=3) for servico in self.servicos}
+        with patch.object(cep_async.metricas.CEP_CONSULTAS, 'inc') as contar:
+            resultado = self.resolver([f'0300{i:04d}' for i in range(10)], concorrencia=1,
+                                      disjuntores=disjuntores)
+        self.assertTrue(all(endereco['logradouro'] == 'Rua Api' for endereco in resultado))
+        self.assertEqual(disjuntores['viacep'].estado, ABERTO)
+        self.assertEqual(disjuntores['apicep'].estado, FECHADO)
+        consultas = [chamada.args for chamada in contar.call_args_list if chamada.args[0] == 'viacep']
+        self.assertEqual(consultas.count(('viacep', 'erro')), 3)
+        self.assertEqual(consultas.count(('viacep', 'desligado')), 7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Testes para o cache de CEP em dois níveis
+"""
+import unittest
+from unittest.mock import patch
+import tempfile
+from pathlib import Path
+
+from brazilcep.exceptions import CEPNotFound
+from cep_cache import CacheCEP
+import gerador
+
+ENDERECO = {'cep': '01001000', 'logradouro': 'Praça da Sé', 'bairro': 'Sé',
+            'cidade': 'São Paulo', 'estado': 'SP'}
+
+class TestCacheCEP(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.caminho = Path(self.tmp.name) / 'cache.sqlite3'
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_persistencia_entre_instancias(self):
+        """Testa se uma nova instância lê o que outra gravou em disco"""
+        CacheCEP(self.caminho).guardar('01001000', ENDERECO)
+        encontrado, endereco = CacheCEP(self.caminho).obter('01001000')
+        self.assertTrue(encontrado)
+        self.assertEqual(endereco, ENDERECO)
+    
+    def test_cache_negativo(self):
+        """Testa se CEP inexistente é lembrado como tal"""
+        cache = CacheCEP(self.caminho)
+        cache.guardar('00000000', None)
+        self.assertEqual(cache.obter('00000000'), (True, None))
+        self.assertEqual(cache.obter('11111111'), (False, None))
+    
+    def test_expiracao_ttl(self):
+        """Testa se entradas expiradas são descartadas"""
+        cache = CacheCEP(self.caminho, ttl=-1)
+        cache.guardar('01001000', ENDERECO)
+        self.assertEqual(cache.obter('01001000'), (False, None))
+    
+    def test_lru_em_memoria(self):
+        """Testa o limite de capacidade do nível em memória"""
+        cache = CacheCEP(None, tamanho=2)
+        for cep in ('1', '2', '3'):
+            cache.guardar(cep, ENDERECO)
+        self.assertEqual(cache.obter('1'), (False, None))
+        self.assertTrue(cache.obter('3')[0])
+    
+    def test_buscar_cep_com_cache_consulta_uma_vez(self):
+        """Testa se a segunda busca do mesmo CEP não vai à rede"""
+        cache = CacheCEP(self.caminho)
+        with patch.object(gerador, 'obter_cache_cep', return_value=cache), \
+             patch.object(gerador, 'get_address_from_cep',
+                          return_value={'street': 'Praça da Sé', 'district': 'Sé',
+                                        'city': 'São Paulo', 'uf': 'SP'}) as consulta:
+            gerador.buscar_cep_com_cache('01001000')
+            endereco = gerador.buscar_cep_com_cache('01001000')
+        self.assertEqual(consulta.call_count, 1)
+        self.assertEqual(endereco['cidade'], 'São Paulo')
+    
+    def test_buscar_cep_inexistente_entra_no_cache_negativo(self):
+        """Testa o cache negativo a partir da resposta dos serviços"""
+        cache = CacheCEP(self.caminho)
+        with patch.object(gerador, 'obter_cache_cep', return_value=cache), \
+             patch.object(gerador, 'get_address_from_cep', side_effect=CEPNotFound()):
+            self.assertIsNone(gerador.buscar_cep_com_cache('99999999'))
+        self.assertEqual(cache.obter('99999999'), (True, None))
+
+if __name__ == '__main__':
+    unittest.main()
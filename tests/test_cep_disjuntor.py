@@ -0,0 +1,100 @@
+"""
+Testes para o disjuntor e o timeout adaptativo dos web services de CEP
+"""
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from brazilcep import WebService
+
+import cep_disjuntor
+import gerador
+from cep_cache import CacheCEP
+from cep_disjuntor import ABERTO, FECHADO, MEIO_ABERTO, Disjuntor
+
+
+class TestDisjuntor(unittest.TestCase):
+
+    def setUp(self):
+        self.agora = 1000.0
+        relogio = patch('cep_disjuntor.time.monotonic', side_effect=lambda: self.agora)
+        relogio.start()
+        self.addCleanup(relogio.stop)
+
+    def test_abre_testa_e_fecha(self):
+        """Testa a sequência fechado → aberto → meio aberto → fechado"""
+        disjuntor = Disjuntor('viacep', falhas=3, espera=30)
+        for _ in range(3):
+            self.assertTrue(disjuntor.permitir())
+            disjuntor.registrar_falha()
+        self.assertEqual(disjuntor.estado, ABERTO)
+        self.assertFalse(disjuntor.permitir())
+        self.assertFalse(disjuntor.disponivel())
+
+        self.agora += 31
+        self.assertTrue(disjuntor.disponivel())
+        self.assertTrue(disjuntor.permitir())
+        self.assertEqual(disjuntor.estado, MEIO_ABERTO)
+        self.assertFalse(disjuntor.permitir())  # só uma consulta de teste
+
+        disjuntor.registrar_falha()
+        self.assertEqual(disjuntor.estado, ABERTO)
+        self.agora += 31
+        self.assertTrue(disjuntor.permitir())
+        disjuntor.registrar_sucesso(0.1)
+        self.assertEqual(disjuntor.estado, FECHADO)
+        self.assertEqual(disjuntor.falhas_seguidas, 0)
+
+    def test_teste_sem_resultado_nao_trava(self):
+        """Testa se uma consulta de teste que nunca termina libera outra depois"""
+        disjuntor = Disjuntor('viacep', falhas=1, espera=10, timeout_maximo=2)
+        disjuntor.registrar_falha()
+        self.agora += 11
+        self.assertTrue(disjuntor.permitir())
+        self.assertFalse(disjuntor.permitir())
+        self.agora += 5
+        self.assertTrue(disjuntor.permitir())
+
+    def test_timeout_adaptativo(self):
+        """Testa se o timeout acompanha a latência, dobra com falhas e respeita os limites"""
+        disjuntor = Disjuntor('viacep', falhas=5, timeout_minimo=0.3, timeout_maximo=2)
+        self.assertEqual(disjuntor.timeout(), 2)
+        for _ in range(50):
+            disjuntor.registrar_sucesso(0.05)
+        self.assertEqual(disjuntor.timeout(), 0.3)
+        for _ in range(50):
+            disjuntor.registrar_sucesso(0.5)
+        self.assertAlmostEqual(disjuntor.timeout(), 0.5, delta=0.05)
+        disjuntor.registrar_falha()
+        self.assertAlmostEqual(disjuntor.timeout(), 1.0, delta=0.1)
+        disjuntor.registrar_falha()
+        disjuntor.registrar_falha()
+        self.assertEqual(disjuntor.timeout(), 2)
+
+    def test_servicos_fora_do_ar_recorrem_ao_offline(self):
+        """Testa se, com os serviços fora do ar, a geração para de consultá-los e usa o índice offline"""
+        disjuntores = {nome: Disjuntor(nome, falhas=2) for nome in gerador.SERVICOS_CEP}
+        with patch.dict(cep_disjuntor._disjuntores, disjuntores, clear=True), \
+                patch.object(gerador, 'obter_cache_cep', return_value=CacheCEP(None)), \
+                patch.object(gerador, 'get_address_from_cep', side_effect=ConnectionError) as consulta, \
+                patch('builtins.print'):
+            for _ in range(3):
+                endereco = gerador.gerar_cep_e_endereco(online=True)
+                self.assertIsNotNone(endereco['cidade'])
+            self.assertEqual(consulta.call_count, 4)
+            self.assertEqual({nome: resumo['estado'] for nome, resumo in cep_disjuntor.resumo().items()},
+                             {'viacep': ABERTO, 'apicep': ABERTO})
+            self.assertIsNone(gerador._buscar_endereco_por_cep('01001000', WebService.VIACEP))
+
+    def test_request_timeout_fracionario(self):
+        """Testa se REQUEST_TIMEOUT aceita segundos fracionários e vale o mesmo em todos os módulos"""
+        codigo = ('import gerador, cep_async, cep_disjuntor; '
+                  'print(gerador.REQUEST_TIMEOUT, cep_async.REQUEST_TIMEOUT, cep_disjuntor.REQUEST_TIMEOUT)')
+        saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True,
+                               env={**os.environ, 'REQUEST_TIMEOUT': '1.5'}).stdout
+        self.assertEqual(saida.split(), ['1.5'] * 3)
+
+if __name__ == '__main__':
+    unittest.main()
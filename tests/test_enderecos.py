@@ -0,0 +1,48 @@
+"""
+Testes para o índice offline de endereços
+"""
+import unittest
+from unittest.mock import patch
+import random
+
+import enderecos
+import gerador
+
+class TestEnderecos(unittest.TestCase):
+    
+    def setUp(self):
+        self.indice = enderecos.carregar_indice()
+    
+    def test_sortear_endereco_completo(self):
+        """Testa se o endereço sorteado tem todos os campos preenchidos"""
+        endereco = enderecos.sortear_endereco()
+        for campo in ('cep', 'logradouro', 'bairro', 'cidade', 'estado'):
+            self.assertTrue(endereco[campo])
+        self.assertRegex(endereco['cep'], r'^\d{8}$')
+    
+    def test_cep_pertence_a_uf_da_cidade(self):
+        """Testa se as faixas das cidades estão dentro das faixas da UF"""
+        rng = random.Random(42)
+        for _ in range(500):
+            endereco = self.indice.sortear_endereco(rng)
+            self.assertEqual(self.indice.uf_do_cep(endereco['cep']), endereco['estado'])
+    
+    def test_uf_do_cep_invalido(self):
+        """Testa CEP malformado"""
+        self.assertIsNone(self.indice.uf_do_cep('123'))
+    
+    def test_gerar_cep_e_endereco_offline_sem_rede(self):
+        """Testa se o modo padrão não consulta os web services"""
+        with patch.object(gerador, '_buscar_endereco_por_cep') as buscar:
+            endereco = gerador.gerar_cep_e_endereco(online=False)
+        buscar.assert_not_called()
+        self.assertIsNotNone(endereco)
+    
+    def test_gerar_cep_e_endereco_online_fallback(self):
+        """Testa se o modo online recorre ao índice quando a rede falha"""
+        with patch.object(gerador, 'buscar_cep_com_cache', return_value=None):
+            endereco = gerador.gerar_cep_e_endereco(online=True)
+        self.assertIsNotNone(endereco['cidade'])
+
+if __name__ == '__main__':
+    unittest.main()
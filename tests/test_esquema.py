@@ -0,0 +1,108 @@
+"""
+Testes para os esquemas declarativos
+"""
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import esquema
+import exportacao
+import gerador
+import gerador_lote
+
+CAMINHO_EXEMPLO = Path(__file__).parent.parent / 'esquemas' / 'clientes.yaml'
+
+class TestEsquema(unittest.TestCase):
+
+    def test_padrao_igual_ao_gerador_em_lote(self):
+        """Testa se o esquema padrão reproduz a saída e o aninhamento padrão"""
+        padrao = esquema.compilar(esquema.definicao_padrao())
+        self.assertEqual(padrao.colunas, gerador.COLUNAS_ORDEM)
+        df = padrao.gerar_lote(50, seed=3)
+        pd.testing.assert_frame_equal(df, gerador_lote.gerar_lote(50, seed=3))
+        registro = padrao.registros(df)[0]
+        self.assertEqual(list(registro), list(gerador.gerar_dados_pessoa(rng=gerador.criar_rng(0))))
+        self.assertEqual(registro['Endereço']['Cidade'], df['Endereço - Cidade'][0])
+
+    def test_exemplo_yaml(self):
+        """Testa formatos, constante e aninhamento do esquema de exemplo"""
+        clientes = esquema.compilar(CAMINHO_EXEMPLO)
+        with patch.object(gerador_lote, '_gerar_numeros_e_complementos', side_effect=AssertionError):
+            blocos = list(clientes.iterar_lotes(250, 100, seed=1, unico=True))
+        df = pd.concat(blocos, ignore_index=True)
+        self.assertEqual(list(df.columns), clientes.colunas)
+        self.assertTrue(df['documento'].str.match(r'^\d{3}\.\d{3}\.\d{3}-\d{2}$').all())
+        self.assertTrue(df['documento'].is_unique)
+        self.assertTrue(df['nascimento'].str.match(r'^\d{4}-\d{2}-\d{2}$').all())
+        self.assertTrue(df['telefone'].str.match(r'^\(9[6-9]\) \d{5}-\d{4}$').all())
+        self.assertTrue((df['origem'] == 'homologacao').all())
+        registro = clientes.registros(df)[0]
+        self.assertEqual(set(registro['contato']), {'email', 'telefone'})
+        self.assertEqual(registro['endereco']['uf'], df['uf'][0])
+
+    def test_definicoes_invalidas(self):
+        """Testa a validação da definição"""
+        invalidas = [
+            {},
+            {'campos': []},
+            {'campos': [{'nome': 'x', 'gerador': 'idade'}]},
+            {'campos': [{'nome': 'x', 'gerador': 'cpf', 'formato': 'br'}]},
+            {'campos': [{'nome': 'x', 'gerador': 'nome', 'formato': 'iso'}]},
+            {'campos': [{'nome': 'x', 'gerador': 'constante'}]},
+            {'campos': [{'nome': 'x', 'gerador': 'cpf', 'tamanho': 3}]},
+            {'campos': [{'nome': 'x', 'gerador': 'cpf'}, {'nome': 'x', 'gerador': 'email'}]},
+            {'campos': [{'nome': 'a', 'gerador': 'cpf'}, {'nome': 'b', 'caminho': 'a.b', 'gerador': 'email'}]},
+        ]
+        for definicao in invalidas:
+            with self.assertRaises(ValueError, msg=definicao):
+                esquema.compilar(definicao)
+
+    def test_esquema_so_de_constantes(self):
+        """Testa se um esquema só com constantes gera a quantidade pedida de linhas"""
+        constantes = esquema.compilar({'campos': [{'nome': 'origem', 'gerador': 'constante', 'valor': 'teste'}]})
+        self.assertEqual(constantes.origens, [])
+        self.assertEqual(len(constantes.gerar_lote(3, seed=1)), 3)
+        blocos = list(constantes.iterar_lotes(25, 10, seed=1))
+        self.assertEqual([len(bloco) for bloco in blocos], [10, 10, 5])
+        self.assertEqual(constantes.registros(blocos[-1]), [{'origem': 'teste'}] * 5)
+        # Sem semente e com CEP online: nenhuma coluna de origem, nada a consultar
+        with patch.object(gerador, 'CEP_ONLINE', True), \
+                patch.object(gerador, 'gerar_multiplas_pessoas', side_effect=AssertionError):
+            blocos = list(constantes.iterar_lotes(25, 10))
+        self.assertEqual([len(bloco) for bloco in blocos], [10, 10, 5])
+        self.assertEqual(constantes.registros(blocos[0]), [{'origem': 'teste'}] * 10)
+
+    def test_exportacao_com_tipos(self):
+        """Testa se os formatos Arrow mantêm inteiros e dicionários nas colunas renomeadas"""
+        definicao = {'campos': [{'nome': 'numero', 'gerador': 'numero'}, {'nome': 'uf', 'gerador': 'estado'},
+                                {'nome': 'cep', 'gerador': 'cep', 'formato': 'mascarado'}]}
+        compilado = esquema.compilar(definicao)
+        saida = io.BytesIO()
+        exportacao.escrever('parquet', compilado.iterar_lotes(30, 10, seed=2), saida,
+                            **compilado.opcoes_exportacao('parquet'))
+        tabela = pq.read_table(io.BytesIO(saida.getvalue()))
+        self.assertEqual(tabela.column_names, ['numero', 'uf', 'cep'])
+        self.assertEqual(tabela.schema.field('numero').type, pa.int64())
+        self.assertTrue(pa.types.is_dictionary(tabela.schema.field('uf').type))
+        self.assertTrue(all(len(cep) == 9 and cep[5] == '-' for cep in tabela.column('cep').to_pylist()))
+
+    def test_cli_com_esquema(self):
+        """Testa o --schema da linha de comando com partes mescladas"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            self.assertEqual(gerador.executar_cli(['generate', '--count', '120', '--workers', '2',
+                                                   '--chunk-size', '50', '--format', 'csv', '--merge',
+                                                   '--out', diretorio, '--seed', '4',
+                                                   '--schema', str(CAMINHO_EXEMPLO)]), 0)
+            arquivo = next(Path(diretorio).glob('*.csv'))
+            gerado = pd.read_csv(arquivo, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        esperado = pd.concat(esquema.compilar(CAMINHO_EXEMPLO).iterar_lotes(120, 50, seed=4), ignore_index=True)
+        pd.testing.assert_frame_equal(gerado, esperado)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Testes para os escritores em fluxo
+"""
+import unittest
+import io
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import exportacao
+import gerador
+import gerador_lote
+
+class TestExportacao(unittest.TestCase):
+    
+    def blocos(self, quantidade, tamanho):
+        return gerador_lote.iterar_lotes(quantidade, tamanho, np.random.default_rng(7))
+    
+    def test_iterar_csv(self):
+        """Testa se o CSV em blocos tem um único cabeçalho"""
+        texto = ''.join(exportacao.iterar_csv(self.blocos(25, 10)))
+        self.assertTrue(texto.startswith(exportacao.BOM_UTF8))
+        df = pd.read_csv(io.StringIO(texto[1:]), dtype=str)
+        self.assertEqual(list(df.columns), gerador.COLUNAS_ORDEM)
+        self.assertEqual(len(df), 25)
+    
+    def test_excel_divide_em_planilhas(self):
+        """Testa a quebra em novas planilhas ao atingir o limite de linhas"""
+        saida = io.BytesIO()
+        estatisticas = exportacao.escrever_excel(self.blocos(25, 10), saida, linhas_por_planilha=10)
+        self.assertEqual(estatisticas['linhas'], 25)
+        self.assertEqual(estatisticas['planilhas'], 3)
+        
+        workbook = load_workbook(io.BytesIO(saida.getvalue()), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Dados Pessoais', 'Dados Pessoais 2', 'Dados Pessoais 3'])
+        linhas = list(workbook['Dados Pessoais 3'].iter_rows(values_only=True))
+        self.assertEqual(list(linhas[0]), gerador.COLUNAS_ORDEM)
+        self.assertEqual(len(linhas), 6)
+    
+    def test_excel_vazio_tem_cabecalho(self):
+        """Testa a exportação sem linhas"""
+        saida = io.BytesIO()
+        estatisticas = exportacao.escrever_excel([], saida)
+        self.assertEqual(estatisticas['linhas'], 0)
+        workbook = load_workbook(io.BytesIO(saida.getvalue()), read_only=True)
+        self.assertEqual(len(list(workbook.active.iter_rows())), 1)
+    
+    def test_parquet_row_groups_e_dicionario(self):
+        """Testa o tamanho dos row groups e a codificação de dicionário"""
+        saida = io.BytesIO()
+        estatisticas = exportacao.escrever_parquet(self.blocos(25, 7), saida, tamanho_row_group=10)
+        self.assertEqual(estatisticas['row_groups'], 3)
+        arquivo = pq.ParquetFile(io.BytesIO(saida.getvalue()))
+        self.assertEqual([arquivo.metadata.row_group(i).num_rows for i in range(3)], [10, 10, 5])
+        df = arquivo.read().to_pandas()
+        self.assertEqual(str(df['Endereço - Estado'].dtype), 'category')
+        esperado = pd.concat(self.blocos(25, 7), ignore_index=True)
+        self.assertEqual(list(df['Endereço - Cidade'].astype(object)), list(esperado['Endereço - Cidade']))
+    
+    def test_projecao_de_campos(self):
+        """Testa se os escritores gravam só as colunas pedidas"""
+        campos = ['CPF', 'Endereço - Estado']
+        blocos = list(gerador_lote.iterar_lotes(30, 10, seed=2, campos=campos))
+        self.assertTrue(''.join(exportacao.iterar_csv(blocos, campos)).startswith('\ufeffCPF,Endereço - Estado\n'))
+        saida = io.BytesIO()
+        exportacao.escrever_parquet(iter(blocos), saida, campos=campos)
+        tabela = pq.read_table(io.BytesIO(saida.getvalue()))
+        self.assertEqual(tabela.column_names, campos)
+        self.assertEqual(tabela.num_rows, 30)
+        saida = io.BytesIO()
+        exportacao.escrever_excel(iter(blocos), saida, campos=campos)
+        planilha = load_workbook(io.BytesIO(saida.getvalue()), read_only=True).active
+        self.assertEqual(next(planilha.iter_rows(values_only=True)), tuple(campos))
+    
+    def test_arrow_com_dicionario_crescente(self):
+        """Testa o Arrow IPC com dicionários que crescem entre blocos"""
+        saida = io.BytesIO()
+        exportacao.escrever_arrow(self.blocos(25, 7), saida)
+        tabela = pa.ipc.open_file(io.BytesIO(saida.getvalue())).read_all()
+        esperado = pd.concat(self.blocos(25, 7), ignore_index=True)
+        self.assertEqual(tabela.column('CPF').to_pylist(), list(esperado['CPF']))
+        self.assertEqual(tabela.column('Endereço - Estado').to_pylist(), list(esperado['Endereço - Estado']))
+
+if __name__ == '__main__':
+    unittest.main()
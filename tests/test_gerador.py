@@ -5,9 +5,15 @@ import unittest
 from gerador import (
     gerar_nome, gerar_cpf, gerar_email, 
     gerar_celular, gerar_data_nascimento,
-    achatar_dicionario
+    achatar_dicionario, criar_rng, gerar_multiplas_pessoas
 )
 import re
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+import pandas as pd
+import gerador
+import gerador_lote
 
 class TestGerador(unittest. TestCase):
     
@@ -24,6 +30,17 @@ class TestGerador(unittest. TestCase):
         self.assertEqual(len(cpf), 11)
         self.assertTrue(cpf.isdigit())
     
+    def test_validar_cpfs(self):
+        """Testa a validação em lote dos dígitos verificadores"""
+        cpfs = [gerar_cpf() for _ in range(50)]
+        self.assertTrue(all(r['valido'] for r in gerador.validar_cpfs(cpfs)))
+        
+        resultados = gerador.validar_cpfs(['52998224726', '000.000.000-00', '5299822472a', None])
+        self.assertEqual([r['valido'] for r in resultados], [False, False, False, False])
+        self.assertEqual(resultados[1]['mensagem'], 'CPF inválido (todos os dígitos iguais)')
+        self.assertEqual(resultados[2]['mensagem'], 'CPF deve conter 11 dígitos numéricos')
+        self.assertTrue(gerador.validar_cpf('529.982.247-25')['valido'])
+    
     def test_gerar_email_formato(self):
         """Testa se o email tem formato válido"""
         email = gerar_email()
@@ -54,6 +71,74 @@ class TestGerador(unittest. TestCase):
         resultado = achatar_dicionario(dados)
         self.assertIn("Endereço - Rua", resultado)
         self.assertEqual(resultado["Endereço - Rua"], "Teste")
+    
+    def test_registro_compacto(self):
+        """Testa se o registro plano reproduz o dicionário aninhado e o achatado"""
+        registro = gerador.gerar_registro(rng=criar_rng(4))
+        aninhado = gerador.gerar_dados_pessoa(rng=criar_rng(4))
+        self.assertEqual(registro.aninhado(), aninhado)
+        self.assertEqual(registro.plano(), achatar_dicionario(aninhado))
+        self.assertEqual(list(registro.plano(['Celular', 'CPF'])), ['Celular', 'CPF'])
+        
+        with patch.object(gerador, 'CEP_ONLINE', False):
+            compactos = gerar_multiplas_pessoas(5, verbose=False, seed=2, compacto=True)
+            planos = gerar_multiplas_pessoas(5, verbose=False, seed=2)
+        pd.testing.assert_frame_equal(pd.DataFrame(compactos, columns=gerador.COLUNAS_ORDEM), pd.DataFrame(planos))
+    
+    def test_rng_semeado_reprodutivel(self):
+        """Testa se a mesma semente gera os mesmos dados"""
+        self.assertEqual(gerar_cpf(criar_rng(1)), gerar_cpf(criar_rng(1)))
+        self.assertNotEqual(gerar_cpf(criar_rng(1, 0)), gerar_cpf(criar_rng(1, 1)))
+    
+    def test_multiplas_pessoas_fatias_identicas(self):
+        """Testa se uma fatia gerada à parte é igual à geração completa"""
+        completo = gerar_multiplas_pessoas(10, verbose=False, seed=99)
+        fatia = gerar_multiplas_pessoas(4, verbose=False, seed=99, inicio=6)
+        self.assertEqual(completo[6:], fatia)
+    
+    def test_gerar_pessoa_por_indice(self):
+        """Testa se a pessoa de um índice é a mesma da fatia que o contém, online ou não"""
+        with patch.object(gerador, 'CEP_ONLINE', False):
+            fatia = gerar_multiplas_pessoas(3, verbose=False, seed=5, inicio=10 ** 8, unico=True)
+        with patch.object(gerador, 'gerar_enderecos_online', side_effect=AssertionError), \
+                patch.object(gerador, 'CEP_ONLINE', True):
+            por_indice = [gerador.gerar_pessoa(10 ** 8 + i, 5, unico=True).plano() for i in range(3)]
+            self.assertEqual(gerador.gerar_pessoa(3, 5, campos='CPF').plano(['CPF']),
+                             {'CPF': gerador.gerar_pessoa(3, 5, campos='CPF').cpf})
+        self.assertEqual(por_indice, fatia)
+        with self.assertRaises(ValueError):
+            gerador.gerar_pessoa(-1, 5)
+    
+    def test_dividir_em_partes(self):
+        """Testa a divisão dos blocos entre workers"""
+        self.assertEqual(gerador.dividir_em_partes(250, 100, 2), [(0, 200), (2, 50)])
+        self.assertEqual(gerador.dividir_em_partes(50, 100, 4), [(0, 50)])
+    
+    def test_gerar_em_paralelo_igual_ao_sequencial(self):
+        """Testa se as partes mescladas reproduzem a geração sequencial"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            arquivos = gerador.gerar_em_paralelo(250, 3, 'csv', Path(diretorio), seed=8,
+                                                 tamanho_lote=50, mesclar=True)
+            self.assertEqual(len(arquivos), 1)
+            gerado = pd.read_csv(arquivos[0], dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        esperado = pd.concat(gerador_lote.iterar_lotes(250, 50, seed=8), ignore_index=True)
+        self.assertEqual(list(gerado['CPF']), list(esperado['CPF']))
+
+    def test_projecao_de_campos(self):
+        """Testa se só os campos pedidos são gerados, sem consultar o CEP"""
+        with patch.object(gerador, 'gerar_cep_e_endereco', side_effect=AssertionError), \
+                patch.object(gerador, 'gerar_enderecos_online', side_effect=AssertionError), \
+                patch.object(gerador, 'CEP_ONLINE', True):
+            pessoa = gerador.gerar_dados_pessoa(rng=criar_rng(3), campos=['CPF', 'Endereço - Número'])
+            pessoas = gerar_multiplas_pessoas(5, verbose=False, seed=3, campos='CPF,Nome Completo')
+        self.assertEqual(set(pessoa), {'CPF', 'Endereço'})
+        self.assertEqual(list(pessoa['Endereço']), ['Número'])
+        self.assertEqual([list(p) for p in pessoas], [['CPF', 'Nome Completo']] * 5)
+        self.assertEqual(pessoas, gerar_multiplas_pessoas(5, verbose=False, seed=3, campos=['CPF', 'Nome Completo']))
+        with self.assertRaises(ValueError):
+            gerador.normalizar_campos(['CPF', 'Idade'])
+        with self.assertRaises(ValueError):
+            gerador.normalizar_campos(' , ')
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Testes para o gerador vetorizado em lote
+"""
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+import gerador
+import gerador_lote
+
+def cpf_valido(cpf):
+    digitos = [int(d) for d in cpf]
+    for tamanho in (9, 10):
+        resto = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos[:tamanho])) % 11
+        if digitos[tamanho] != (0 if resto < 2 else 11 - resto):
+            return False
+    return True
+
+class TestGeradorLote(unittest.TestCase):
+    
+    def setUp(self):
+        self.df = gerador_lote.gerar_lote(500, np.random.default_rng(123))
+    
+    def test_colunas_na_ordem(self):
+        """Testa se o DataFrame segue a ordem de exportação"""
+        self.assertEqual(list(self.df.columns), gerador.COLUNAS_ORDEM)
+        self.assertEqual(len(self.df), 500)
+    
+    def test_cpfs_validos(self):
+        """Testa os dígitos verificadores calculados em matriz"""
+        self.assertTrue(all(len(cpf) == 11 and cpf_valido(cpf) for cpf in self.df['CPF']))
+    
+    def test_formatos(self):
+        """Testa os formatos de celular, data, e-mail e CEP"""
+        self.assertTrue(self.df['Celular'].str.match(r'^9[6-9]\d{9}$').all())
+        self.assertTrue(self.df['Data de Nascimento'].str.match(r'^\d{2}/\d{2}/\d{4}$').all())
+        self.assertTrue(self.df['Email'].str.match(r'^[a-z0-9.]+@[a-z0-9]+\.[a-z]+$').all())
+        self.assertTrue(self.df['Endereço - CEP'].str.match(r'^\d{8}$').all())
+        self.assertTrue(self.df['Endereço - Número'].between(1, 2000).all())
+        self.assertTrue((self.df['Nome Completo'].str.len() <= gerador.MAX_NAME_LENGTH).all())
+    
+    def test_reprodutivel_com_mesmo_rng(self):
+        """Testa se a mesma semente gera o mesmo lote"""
+        outro = gerador_lote.gerar_lote(500, np.random.default_rng(123))
+        self.assertTrue(self.df.equals(outro))
+    
+    def test_iterar_lotes(self):
+        """Testa a divisão em blocos"""
+        tamanhos = [len(df) for df in gerador_lote.iterar_lotes(250, tamanho_lote=100)]
+        self.assertEqual(tamanhos, [100, 100, 50])
+        
+        sem_fim = gerador_lote.iterar_lotes(None, tamanho_lote=100, seed=5)
+        self.assertEqual([len(next(sem_fim)) for _ in range(4)], [100] * 4)
+        with self.assertRaises(ValueError):
+            next(gerador_lote.iterar_lotes(None, tamanho_lote=100, seed=5, unico=True))
+    
+    def test_blocos_semeados_independentes_da_divisao(self):
+        """Testa se blocos gerados à parte (outro processo) saem idênticos"""
+        sequencial = list(gerador_lote.iterar_lotes(300, 100, seed=5))
+        terceiro = next(gerador_lote.iterar_lotes(100, 100, seed=5, bloco_inicial=2))
+        self.assertTrue(sequencial[2].equals(terceiro))
+        self.assertFalse(sequencial[0].equals(sequencial[1]))
+    
+    def test_semente_independente_do_tamanho_do_bloco(self):
+        """Testa se a semente define as mesmas linhas com qualquer tamanho de bloco, online ou não"""
+        total = gerador_lote.BLOCO_SEMENTE * 2 + 10
+        referencia = gerador_lote.gerar_faixa(7, 0, total, unico=True)
+        for tamanho in (999, gerador_lote.BLOCO_SEMENTE, total + 1):
+            blocos = list(gerador_lote.iterar_lotes(total, tamanho, seed=7, unico=True))
+            self.assertEqual(max(len(df) for df in blocos), min(tamanho, total))
+            pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), referencia)
+        with patch.object(gerador, 'CEP_ONLINE', True):
+            online = pd.concat(gerador_lote.iterar_lotes(total, 3000, seed=7, unico=True), ignore_index=True)
+        pd.testing.assert_frame_equal(online, referencia)
+        faixa = gerador_lote.gerar_faixa(7, gerador_lote.BLOCO_SEMENTE - 5, 10, unico=True)
+        pd.testing.assert_frame_equal(faixa, referencia.iloc[gerador_lote.BLOCO_SEMENTE - 5:][:10]
+                                      .reset_index(drop=True))
+        pessoa = gerador.gerar_pessoa(gerador_lote.BLOCO_SEMENTE, 7, unico=True)
+        self.assertEqual(pessoa.plano(), referencia.iloc[gerador_lote.BLOCO_SEMENTE].to_dict())
+
+    def test_projecao_de_campos(self):
+        """Testa se só as colunas pedidas são geradas, na ordem pedida"""
+        campos = ['Email', 'Nome Completo', 'Endereço - Complemento']
+        with patch.object(gerador_lote, '_gerar_enderecos', side_effect=AssertionError), \
+                patch.object(gerador_lote, '_gerar_cpfs', side_effect=AssertionError):
+            df = gerador_lote.gerar_lote(100, seed=1, campos=campos)
+            blocos = list(gerador_lote.iterar_lotes(150, 100, seed=1, unico=True, campos=campos))
+        self.assertEqual(list(df.columns), campos)
+        self.assertEqual([list(bloco.columns) for bloco in blocos], [campos] * 2)
+        self.assertTrue(pd.concat(blocos)['Email'].is_unique)
+
+if __name__ == '__main__':
+    unittest.main()
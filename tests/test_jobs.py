@@ -0,0 +1,92 @@
+"""
+Testes para os jobs de geração em segundo plano
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+import gerador_lote
+from jobs import GerenciadorJobs
+
+
+class TestJobs(unittest.TestCase):
+    
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.gerenciador = GerenciadorJobs(self.diretorio.name, workers=1, tamanho_bloco=100)
+    
+    def tearDown(self):
+        self.diretorio.cleanup()
+    
+    def aguardar(self, job_id, gerenciador=None):
+        gerenciador = gerenciador or self.gerenciador
+        for _ in range(600):  # inclui a partida do processo do pool
+            job = gerenciador.obter(job_id)
+            if job['status'] in ('concluido', 'erro'):
+                return job
+            time.sleep(0.05)
+        self.fail('Job não terminou')
+    
+    def test_job_concluido_reprodutivel(self):
+        """Testa o resultado e o progresso de um job com semente"""
+        job = self.gerenciador.enviar(250, 'parquet', seed=9)
+        self.assertEqual(job['status'], 'na_fila')
+        job = self.aguardar(job['id'])
+        self.assertEqual(job['status'], 'concluido')
+        self.assertEqual(job['linhas'], 250)
+        self.assertEqual(job['progresso'], 1.0)
+        
+        df = pd.read_parquet(self.gerenciador.caminho_resultado(job))
+        esperado = pd.concat(gerador_lote.iterar_lotes(250, 100, seed=9), ignore_index=True)
+        self.assertEqual(list(df['CPF']), list(esperado['CPF']))
+    
+    def test_estado_visivel_por_outro_processo(self):
+        """Testa se outro gerenciador (outro worker) lê o estado salvo em disco"""
+        job = self.aguardar(self.gerenciador.enviar(50)['id'])
+        outro = GerenciadorJobs(self.diretorio.name)
+        self.assertEqual(outro.obter(job['id'])['status'], 'concluido')
+        self.assertIsNone(outro.obter('../../etc/passwd'))
+    
+    def test_job_orfao_marcado_como_erro(self):
+        """Testa se um job executando num processo que morreu é marcado como erro"""
+        processo = subprocess.Popen([sys.executable, '-c', 'pass'])
+        processo.wait()
+        job = self.aguardar(self.gerenciador.enviar(10)['id'])
+        job.update(status='executando', pid=processo.pid, concluido_em=None)
+        with open(os.path.join(self.diretorio.name, f"{job['id']}.json"), 'w', encoding='utf-8') as arquivo:
+            json.dump(job, arquivo)
+        
+        job = GerenciadorJobs(self.diretorio.name).obter(job['id'])
+        self.assertEqual(job['status'], 'erro')
+        self.assertIn('interrompido', job['erro'])
+        self.assertEqual(self.gerenciador.obter(job['id'])['status'], 'erro')
+    
+    def test_limpeza_de_jobs_terminados(self):
+        """Testa se jobs expirados ou além do máximo são apagados e somem da consulta"""
+        primeiro = self.aguardar(self.gerenciador.enviar(10)['id'])
+        segundo = self.aguardar(self.gerenciador.enviar(10)['id'])
+        
+        limitado = GerenciadorJobs(self.diretorio.name, workers=1, maximo=1)
+        terceiro = limitado.enviar(10)
+        self.assertIsNone(self.gerenciador.obter(primeiro['id']))
+        self.assertFalse(os.path.exists(self.gerenciador.caminho_resultado(primeiro)))
+        self.assertEqual(self.gerenciador.obter(segundo['id'])['status'], 'concluido')
+        self.aguardar(terceiro['id'], limitado)
+        
+        self.assertIsNone(GerenciadorJobs(self.diretorio.name, ttl=-1).obter(segundo['id']))
+        self.assertEqual([nome for nome in os.listdir(self.diretorio.name) if nome.startswith(segundo['id'])], [])
+    
+    def test_formato_invalido(self):
+        """Testa a validação do formato"""
+        with self.assertRaises(ValueError):
+            self.gerenciador.enviar(10, 'txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Testes para o armazém de lotes gerados
+"""
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+import gerador_lote
+from lotes import ArmazemLotes
+
+
+class TestLotes(unittest.TestCase):
+    
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, 'lotes.sqlite3')
+        self.dados = gerador_lote.gerar_lote(20, seed=1)
+        self.pessoas = self.dados.to_dict('records')
+    
+    def tearDown(self):
+        self.diretorio.cleanup()
+    
+    def test_lote_visivel_em_outro_processo(self):
+        """Testa se um lote gravado por um worker é lido por outro"""
+        lote = ArmazemLotes(self.caminho).guardar(self.pessoas, list(self.dados.columns),
+                                                         {'CPF': 'categoria'})
+        outro = ArmazemLotes(self.caminho).obter(lote.id)
+        pd.testing.assert_frame_equal(outro.dataframe(), self.dados)
+        self.assertEqual(outro.tipos, {'CPF': 'categoria'})
+        self.assertIsNone(ArmazemLotes(self.caminho).obter('0' * 32))
+        self.assertIsNone(ArmazemLotes(self.caminho).obter('../lotes'))
+    
+    def test_validade_e_limite(self):
+        """Testa a expiração por TTL e o descarte dos lotes mais antigos"""
+        limpar_sempre = patch('lotes._GRAVACOES_ENTRE_LIMPEZAS', 1)
+        limpar_sempre.start()
+        self.addCleanup(limpar_sempre.stop)
+        armazem = ArmazemLotes(self.caminho, ttl=60, maximo=2, tamanho_memoria=1)
+        ids = []
+        for deslocamento in (-90, -20, -10):
+            with patch('lotes.time.time', return_value=time.time() + deslocamento):
+                ids.append(armazem.guardar(self.pessoas, list(self.dados.columns)).id)
+        armazem.guardar(self.pessoas, list(self.dados.columns))
+        self.assertIsNone(armazem.obter(ids[0]))
+        self.assertIsNone(armazem.obter(ids[1]))
+        self.assertIsNotNone(armazem.obter(ids[2]))
+        
+        with patch('lotes.time.time', return_value=time.time() + 120):
+            self.assertIsNone(armazem.obter(ids[2]))
+    
+    def test_lote_adiado(self):
+        """Testa se um lote adiado é visível de imediato e chega ao disco em segundo plano"""
+        armazem = ArmazemLotes(self.caminho, tamanho_memoria=1)
+        lote = armazem.guardar(self.pessoas[:1], list(self.dados.columns), adiado=True)
+        armazem.guardar(self.pessoas, list(self.dados.columns))  # tira o adiado do LRU
+        self.assertEqual(armazem.obter(lote.id).pessoas, self.pessoas[:1])
+        
+        armazem.gravar_pendentes()
+        self.assertEqual(ArmazemLotes(self.caminho).obter(lote.id).pessoas, self.pessoas[:1])
+        outro = armazem.guardar(self.pessoas[:2], list(self.dados.columns), adiado=True)
+        for _ in range(200):
+            if ArmazemLotes(self.caminho).obter(outro.id) is not None:
+                break
+            time.sleep(0.01)
+        self.assertIsNotNone(ArmazemLotes(self.caminho).obter(outro.id))
+
+if __name__ == '__main__':
+    unittest.main()
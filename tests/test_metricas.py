@@ -0,0 +1,91 @@
+"""
+Testes para as métricas no formato do Prometheus
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+import exportacao
+import gerador_lote
+import metricas
+from cep_cache import CacheCEP
+from metricas import Registro
+
+class TestMetricas(unittest.TestCase):
+    
+    def setUp(self):
+        self.registro = Registro()
+        self.histograma = self.registro.histograma('teste_segundos', 'Teste', ('etapa',), baldes=(0.1, 1.0))
+        self.contador = self.registro.contador('teste_total', 'Teste', ('servico', 'resultado'))
+    
+    def test_formato_prometheus(self):
+        """Testa baldes acumulados, soma e contagem do histograma e o contador"""
+        for valor in (0.05, 0.1, 0.5, 3.0):
+            self.histograma.observar(valor, 'nome')
+        self.contador.inc('viacep', 'ok')
+        self.contador.inc('viacep', 'ok', valor=2)
+        texto = self.registro.exportar_prometheus()
+        self.assertIn('# TYPE teste_segundos histogram', texto)
+        self.assertIn('teste_segundos_bucket{etapa="nome",le="0.1"} 2', texto)
+        self.assertIn('teste_segundos_bucket{etapa="nome",le="1.0"} 3', texto)
+        self.assertIn('teste_segundos_bucket{etapa="nome",le="+Inf"} 4', texto)
+        self.assertIn('teste_segundos_sum{etapa="nome"} 3.65', texto)
+        self.assertIn('teste_segundos_count{etapa="nome"} 4', texto)
+        self.assertIn('teste_total{servico="viacep",resultado="ok"} 3', texto)
+    
+    def test_instantaneos_de_varios_processos(self):
+        """Testa a soma dos instantâneos gravados por processos diferentes"""
+        self.histograma.observar(0.5, 'cpf')
+        self.contador.inc('apicep', 'erro')
+        with tempfile.TemporaryDirectory() as diretorio:
+            self.registro.gravar(Path(diretorio), forcar=True)
+            (Path(diretorio) / '1.json').write_text((Path(diretorio) / f'{os.getpid()}.json')
+                                                    .read_text(encoding='utf-8'), encoding='utf-8')
+            texto = self.registro.exportar_prometheus(self.registro.ler_instantaneos(Path(diretorio)))
+        self.assertIn('teste_segundos_count{etapa="cpf"} 2', texto)
+        self.assertIn('teste_total{servico="apicep",resultado="erro"} 2', texto)
+        
+        outro = Registro()
+        outro.histograma('teste_segundos', 'Teste', ('etapa',), baldes=(0.1, 1.0))
+        outro.mesclar(self.registro.instantaneo())
+        self.assertEqual(outro.metricas['teste_segundos'].total('cpf'), 1)
+    
+    def test_metricas_desativadas(self):
+        """Testa que METRICAS=0 não registra nada"""
+        with patch.object(metricas, 'METRICAS_ATIVAS', False):
+            self.histograma.observar(0.5, 'nome')
+            self.contador.inc('viacep', 'ok')
+            self.assertIsInstance(metricas.cronometro(), metricas._CronometroInativo)
+        self.assertEqual(self.histograma.total('nome'), 0)
+        self.assertEqual(self.contador.valor('viacep', 'ok'), 0)
+    
+    def test_instrumentacao(self):
+        """Testa as métricas do cache de CEP, do gerador em lote e da exportação"""
+        antes = {
+            'memoria': metricas.CEP_CACHE.valor('memoria'),
+            'falta': metricas.CEP_CACHE.valor('falta'),
+            'lote': metricas.PESSOAS.valor('lote'),
+            'csv': metricas.EXPORTACAO_LINHAS.valor('csv'),
+            'cpf': metricas.ETAPAS_LOTE.total('cpf'),
+        }
+        cache = CacheCEP(None)
+        cache.obter('01001000')
+        cache.guardar('01001000', {'cep': '01001000'})
+        cache.obter('01001000')
+        with tempfile.TemporaryDirectory() as diretorio:
+            blocos = gerador_lote.iterar_lotes(30, 10, np.random.default_rng(1))
+            exportacao.escrever('csv', blocos, Path(diretorio) / 'a.csv')
+        
+        self.assertEqual(metricas.CEP_CACHE.valor('falta') - antes['falta'], 1)
+        self.assertEqual(metricas.CEP_CACHE.valor('memoria') - antes['memoria'], 1)
+        self.assertEqual(metricas.PESSOAS.valor('lote') - antes['lote'], 30)
+        self.assertEqual(metricas.EXPORTACAO_LINHAS.valor('csv') - antes['csv'], 30)
+        self.assertEqual(metricas.ETAPAS_LOTE.total('cpf') - antes['cpf'], 3)
+        self.assertIn('Etapas do lote', metricas.resumo())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Testes para as tabelas de nomes e sobrenomes
+"""
+import unittest
+from unittest.mock import patch
+import random
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import gerador
+import gerador_lote
+import nomes
+
+class TestNomes(unittest.TestCase):
+    
+    def setUp(self):
+        self.tabela = nomes.TabelaNomes(
+            ['João', 'Maria Clara', 'Zé'], ['Conceição', "D'Ávila", 'Araújo', 'Nunca'],
+            ['gmail.com'], pesos_sobrenomes=[5, 3, 2, 0], max_tamanho=30
+        )
+    
+    def test_normalizar_para_email(self):
+        """Testa a remoção de acentos, espaços e pontuação"""
+        self.assertEqual(nomes.normalizar_para_email('Maria Clara'), 'mariaclara')
+        self.assertEqual(nomes.normalizar_para_email("D'Ávila"), 'davila')
+    
+    def test_ler_lista_nomes_csv(self):
+        """Testa a leitura de uma lista no formato nome,frequencia com cabeçalho"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = Path(diretorio) / 'nomes.csv'
+            caminho.write_text('nome,frequencia,sexo\nMARIA,11734129,F\nJOSE,5754529,m\n', encoding='utf-8')
+            self.assertEqual(nomes.ler_lista_nomes(caminho),
+                             (['Maria', 'Jose'], [11734129.0, 5754529.0], ['F', 'M']))
+    
+    def test_tabela_alias_segue_pesos(self):
+        """Testa se o sorteio por alias reproduz as frequências"""
+        alias = nomes.TabelaAlias([6, 3, 1, 0])
+        rng = random.Random(7)
+        contagem = [0] * 4
+        for _ in range(20000):
+            contagem[alias.sortear(rng)] += 1
+        self.assertEqual(contagem[3], 0)
+        for observado, esperado in zip(contagem, (0.6, 0.3, 0.1)):
+            self.assertAlmostEqual(observado / 20000, esperado, delta=0.02)
+    
+    def test_nome_composto_do_mesmo_sexo(self):
+        """Testa se o segundo prenome é do mesmo sexo do primeiro"""
+        tabela = nomes.TabelaNomes(
+            ['Maria', 'Eduarda', 'João', 'Pedro'], ['Silva', 'Santos', 'Lima'], ['gmail.com'],
+            sexos_nomes=['F', 'F', 'M', 'M'], prob_nome_composto=1.0
+        )
+        sexo = {'Maria': 'F', 'Eduarda': 'F', 'João': 'M', 'Pedro': 'M'}
+        rng = random.Random(3)
+        for _ in range(200):
+            partes = tabela.sortear_nome(rng).split(' ')
+            if partes[1] in sexo:
+                self.assertEqual(sexo[partes[0]], sexo[partes[1]])
+        self.assertIn(tabela.sortear_nome(rng, sexo='M').split(' ')[0], ('João', 'Pedro'))
+        
+        gerador_lote._tabela_nomes.cache_clear()
+        try:
+            with patch.object(gerador, 'obter_tabela_nomes', return_value=tabela):
+                lote = gerador_lote._gerar_nomes(np.random.default_rng(4), 500)
+        finally:
+            gerador_lote._tabela_nomes.cache_clear()
+        for nome in lote:
+            partes = nome.split(' ')
+            if partes[1] in sexo:
+                self.assertEqual(sexo[partes[0]], sexo[partes[1]])
+    
+    def test_tabela_empacotada(self):
+        """Testa os arquivos de nomes e sobrenomes empacotados"""
+        tabela = nomes.carregar_tabela_nomes(provedores_email=['gmail.com'])
+        self.assertGreater(len(tabela.nomes), 100)
+        self.assertGreater(len(tabela.sobrenomes), 100)
+        self.assertEqual(set(tabela.alias_por_sexo), {'F', 'M'})
+    
+    def test_nomes_respeitam_pesos_e_tamanho(self):
+        """Testa sobrenomes distintos, peso zero nunca sorteado e tamanho máximo"""
+        rng = random.Random(1)
+        for _ in range(300):
+            nome = self.tabela.sortear_nome(rng)
+            self.assertLessEqual(len(nome), 30)
+            self.assertNotIn('Nunca', nome)
+            self.assertEqual(len(set(nome.split(' '))), len(nome.split(' ')))
+    
+    def test_emails_ascii(self):
+        """Testa se os e-mails saem sem acentos mesmo com nomes acentuados"""
+        rng = random.Random(2)
+        for _ in range(300):
+            self.assertRegex(self.tabela.sortear_email(rng), r'^[a-z0-9.]+@gmail\.com$')
+    
+    def test_lote_com_tabela_ponderada(self):
+        """Testa o gerador em lote com uma tabela carregada de arquivo"""
+        gerador_lote._tabela_nomes.cache_clear()
+        try:
+            with patch.object(gerador, 'obter_tabela_nomes', return_value=self.tabela):
+                rng = np.random.default_rng(3)
+                nomes_lote = gerador_lote._gerar_nomes(rng, 2000)
+                emails = gerador_lote._gerar_emails(rng, 2000)
+        finally:
+            gerador_lote._tabela_nomes.cache_clear()
+        for nome in nomes_lote:
+            partes = nome.split(' ')
+            self.assertLessEqual(len(nome), 30)
+            self.assertNotIn('Nunca', nome)
+            self.assertEqual(len(set(partes)), len(partes))
+        self.assertTrue(all(e.endswith('@gmail.com') and e.isascii() for e in emails))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Testes para a reserva de pessoas pré-geradas
+"""
+import gc
+import unittest
+import weakref
+from unittest.mock import patch
+
+import gerador
+import reserva
+from reserva import ReservaPessoas
+
+
+class TestReserva(unittest.TestCase):
+
+    def setUp(self):
+        sem_rede = patch.object(gerador, 'CEP_ONLINE', False)
+        sem_rede.start()
+        self.addCleanup(sem_rede.stop)
+
+    def test_reabastece_entre_minimo_e_maximo(self):
+        """Testa se a thread enche a reserva até o máximo e repõe abaixo do mínimo"""
+        pool = ReservaPessoas(minimo=20, maximo=50, tamanho_lote=10)
+        self.assertTrue(pool.aguardar(50, timeout=10))
+        self.assertEqual(len(pool), 50)
+
+        pessoas = pool.retirar(25)
+        self.assertEqual(len(pessoas), 25)
+        self.assertIsInstance(pessoas[0], gerador.Pessoa)
+        self.assertIsNotNone(pessoas[0].cidade)
+        self.assertEqual(len(pool), 25)  # acima do mínimo: não reabastece
+
+        pool.retirar(10)
+        self.assertTrue(pool.aguardar(50, timeout=10))
+        self.assertEqual(len({pessoa.cpf for pessoa in pessoas + pool.retirar(50)}), 75)
+
+    def test_esgotada_e_desativada(self):
+        """Testa se a reserva entrega o que tem sem esperar e se pode ser desativada"""
+        pool = ReservaPessoas(minimo=0, maximo=5)
+        with patch.object(pool, '_iniciar'):
+            self.assertEqual(pool.retirar(3), [])
+        self.assertEqual(ReservaPessoas(maximo=0).retirar(3), [])
+        with self.assertRaises(ValueError):
+            ReservaPessoas(minimo=10, maximo=5)
+
+    def test_fork_esvazia_sem_prender_instancias(self):
+        """Testa se o hook de fork esvazia as reservas vivas e não impede que sejam descartadas"""
+        pool = ReservaPessoas(minimo=0, maximo=5)
+        self.assertTrue(pool.aguardar(5, timeout=10))
+        with patch.object(reserva, '_reservas', weakref.WeakSet([pool])):  # só esta, não a do processo
+            reserva._reiniciar_apos_fork()
+        self.assertEqual(len(pool), 0)
+        self.assertIsNone(pool._thread)
+        
+        descartada = weakref.ref(ReservaPessoas(maximo=0))
+        gc.collect()
+        self.assertIsNone(descartada())
+    
+    def test_obter_pessoas_completa_e_projeta(self):
+        """Testa se obter_pessoas completa o que faltar e a visão projetada"""
+        pool = ReservaPessoas(minimo=0, maximo=5)
+        self.assertTrue(pool.aguardar(5, timeout=10))
+        with patch.object(reserva, 'obter_reserva', return_value=pool), patch.object(pool, '_iniciar'):
+            pessoas = reserva.obter_pessoas(8, ['CPF', 'Endereço - Cidade'])
+        self.assertEqual(len(pessoas), 8)
+        for pessoa in pessoas:
+            self.assertTrue(pessoa.cpf and pessoa.cidade)
+            self.assertEqual(pessoa.aninhado(['CPF', 'Endereço - Cidade']),
+                             {'CPF': pessoa.cpf, 'Endereço': {'Cidade': pessoa.cidade}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Testes para o modo único (CPF, e-mail e celular sem repetição)
+"""
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import gerador
+import gerador_lote
+import unicidade
+
+class TestUnicidade(unittest.TestCase):
+
+    def test_permutacao_e_bijecao(self):
+        """Testa se a permutação cobre todo o espaço, inclusive com cycle-walking"""
+        for tamanho in (1, 7, 1000, 1 << 12):
+            permutacao = unicidade.Permutacao(tamanho, [11, 22, 33, 44])
+            valores = permutacao.aplicar(np.arange(tamanho))
+            self.assertEqual(sorted(valores.tolist()), list(range(tamanho)))
+            self.assertEqual(permutacao.aplicar(tamanho - 1), valores[-1])
+        with self.assertRaises(ValueError):
+            permutacao.aplicar(tamanho)
+
+    def test_bases_de_cpf_sem_repdigitos(self):
+        """Testa se as bases de 9 dígitos nunca têm todos os dígitos iguais"""
+        unicos = unicidade.ValoresUnicos(5)
+        bases = unicos.base_cpf(np.arange(200_000))
+        self.assertTrue((bases >= 0).all() and (bases < 10 ** 9).all())
+        self.assertFalse(np.isin(bases, np.arange(10) * 111_111_111).any())
+        self.assertEqual(len(np.unique(bases)), len(bases))
+
+    def test_lotes_sem_repeticao_entre_shards(self):
+        """Testa se faixas de blocos geradas à parte seguem sem colisões e iguais à sequencial"""
+        sequencial = pd.concat(gerador_lote.iterar_lotes(3000, 500, seed=9, unico=True))
+        shards = pd.concat(list(gerador_lote.iterar_lotes(1500, 500, seed=9, unico=True))
+                           + list(gerador_lote.iterar_lotes(1500, 500, seed=9, bloco_inicial=3, unico=True)))
+        pd.testing.assert_frame_equal(sequencial.reset_index(drop=True), shards.reset_index(drop=True))
+        for coluna in ('CPF', 'Email', 'Celular'):
+            self.assertTrue(sequencial[coluna].is_unique, coluna)
+        resultados = gerador.validar_cpfs(sequencial['CPF'].tolist())
+        self.assertTrue(all(r['valido'] for r in resultados))
+        self.assertTrue(sequencial['Celular'].str.match(r'^9[6-9]\d{9}$').all())
+
+    def test_pessoas_sem_repeticao(self):
+        """Testa o modo único no gerador por registro"""
+        with patch.object(gerador, 'CEP_ONLINE', False):
+            pessoas = gerador.gerar_multiplas_pessoas(500, verbose=False, seed=4, unico=True)
+        for campo in ('CPF', 'Email', 'Celular'):
+            self.assertEqual(len({p[campo] for p in pessoas}), 500, campo)
+        with self.assertRaises(ValueError):
+            gerador.gerar_multiplas_pessoas(1, verbose=False, inicio=unicidade.MAX_UNICOS, unico=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Valores únicos (CPF, celular, e-mail) sem estado compartilhado.
+
+No modo único, cada pessoa é identificada pelo seu índice global no conjunto
+(o mesmo que escolhe o sub-fluxo da semente). CPF, celular e o número do
+e-mail são obtidos aplicando ao índice uma permutação pseudoaleatória do
+espaço de valores, chaveada pela semente (rede de Feistel com cycle-walking).
+Como permutação é bijeção, índices distintos nunca colidem: não há bitmap,
+filtro de Bloom nem trava central, a memória é O(1) e shards paralelos que
+cobrem faixas disjuntas de índices continuam sem colisões entre si.
+"""
+
+from typing import Sequence, Union
+
+import numpy as np
+
+# Bases de CPF (9 dígitos) menos as 10 com todos os dígitos iguais
+ESPACO_CPF = 10 ** 9 - 10
+# Celulares 9[6-9]XXXXXXXX
+ESPACO_CELULAR = 4 * 10 ** 9
+# Números acrescentados à parte local dos e-mails
+ESPACO_EMAIL = 10 ** 9
+# Maior quantidade de pessoas com valores únicos, arredondada para baixo a um
+# múltiplo de 10 mil: os blocos da semente (gerador_lote.BLOCO_SEMENTE) são
+# gerados inteiros, então o último também precisa caber no espaço
+MAX_UNICOS = min(ESPACO_CPF, ESPACO_CELULAR, ESPACO_EMAIL) // 10_000 * 10_000
+
+_REPDIGITO = 111_111_111
+_MASCARA_64 = 0xFFFFFFFFFFFFFFFF
+# Sub-fluxo das chaves, separado dos sub-fluxos por bloco/pessoa
+_FLUXO_CHAVES = 0x756E69636F
+
+Indices = Union[int, np.ndarray]
+
+
+class Permutacao:
+    """
+    Permutação pseudoaleatória de ``[0, tamanho)`` (Feistel de 4 rodadas
+    sobre o menor domínio 2^2k que contém ``tamanho``, com cycle-walking).
+    Aceita um inteiro ou um array NumPy de índices.
+
+    Args:
+        tamanho: Tamanho do espaço permutado
+        chaves: Uma chave de 64 bits por rodada
+    """
+
+    def __init__(self, tamanho: int, chaves: Sequence[int]):
+        self.tamanho = tamanho
+        bits = max(2, (tamanho - 1).bit_length())
+        self._meio = (bits + 1) // 2
+        self._mascara = (1 << self._meio) - 1
+        self._chaves = tuple(int(chave) for chave in chaves)
+
+    def _rodada(self, x, chave: int):
+        x = ((x ^ chave) * 0x9E3779B97F4A7C15) & _MASCARA_64
+        x ^= x >> 32
+        return x & self._mascara
+
+    def _embaralhar(self, x):
+        esquerda, direita = x >> self._meio, x & self._mascara
+        for chave in self._chaves:
+            esquerda, direita = direita, esquerda ^ self._rodada(direita, chave)
+        return (esquerda << self._meio) | direita
+
+    def aplicar(self, indices: Indices) -> Indices:
+        """
+        Aplica a permutação.
+
+        Raises:
+            ValueError: Se algum índice estiver fora de ``[0, tamanho)``
+        """
+        if isinstance(indices, np.ndarray):
+            if len(indices) and (indices.min() < 0 or indices.max() >= self.tamanho):
+                raise ValueError(f'Índices devem estar entre 0 e {self.tamanho - 1}')
+            x = self._embaralhar(indices.astype(np.uint64))
+            fora = np.flatnonzero(x >= self.tamanho)
+            while len(fora):
+                x[fora] = self._embaralhar(x[fora])
+                fora = fora[x[fora] >= self.tamanho]
+            return x.astype(np.int64)
+
+        if not 0 <= indices < self.tamanho:
+            raise ValueError(f'Índices devem estar entre 0 e {self.tamanho - 1}')
+        x = self._embaralhar(indices)
+        while x >= self.tamanho:
+            x = self._embaralhar(x)
+        return x
+
+
+def _chaves(seed: int, campo: int) -> Sequence[int]:
+    estado = np.random.SeedSequence(seed, spawn_key=(_FLUXO_CHAVES, campo)).generate_state(4, np.uint64)
+    return [int(chave) for chave in estado]
+
+
+class ValoresUnicos:
+    """
+    Valores únicos por índice global para uma semente.
+
+    Args:
+        seed: Semente do conjunto (a mesma em todos os shards)
+    """
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self._cpf = Permutacao(ESPACO_CPF, _chaves(seed, 0))
+        self._celular = Permutacao(ESPACO_CELULAR, _chaves(seed, 1))
+        self._email = Permutacao(ESPACO_EMAIL, _chaves(seed, 2))
+
+    def base_cpf(self, indices: Indices) -> Indices:
+        """Nove primeiros dígitos do CPF (como inteiro), nunca todos iguais."""
+        valor = self._cpf.aplicar(indices)
+        # Pula as bases 000000000, 111111111, ..., 999999999
+        return valor + 1 + valor // (_REPDIGITO - 1)
+
+    def celular(self, indices: Indices) -> Indices:
+        """Celular de 11 dígitos (como inteiro) no formato 9[6-9]XXXXXXXX."""
+        return 96 * 10 ** 9 + self._celular.aplicar(indices)
+
+    def numero_email(self, indices: Indices) -> Indices:
+        """Número acrescentado à parte local do e-mail."""
+        return self._email.aplicar(indices)
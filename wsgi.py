@@ -0,0 +1,24 @@
+"""
+Ponto de entrada WSGI para produção (gunicorn).
+
+Com ``preload_app`` o módulo é importado uma única vez no processo mestre:
+as tabelas de nomes, e-mails, datas e endereços são montadas aqui e herdadas
+pelos workers via fork (copy-on-write), em vez de reconstruídas em cada um.
+"""
+
+from pathlib import Path
+
+import enderecos
+import gerador_lote
+import metricas
+from app import app
+
+enderecos.carregar_indice()
+gerador_lote.preaquecer()
+
+# Instantâneos de métricas de execuções anteriores (workers que já não existem)
+if metricas.METRICAS_DIR:
+    for instantaneo in Path(metricas.METRICAS_DIR).glob('*.json'):
+        instantaneo.unlink()
+
+application = app